@@ -0,0 +1,157 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from employees.models import Employee, Department
+from tasks.models import Task
+from leaves.models import Leave
+from attendance.models import Attendance
+from analytics.services import DashboardStatsService
+from analytics.rollups import rebuild_rollups
+
+User = get_user_model()
+
+
+def legacy_dashboard_counts(date):
+    """Per-counter COUNT(*) queries, as dashboard_stats used to run them."""
+    return {
+        'pending_tasks': Task.objects.filter(status='PENDING').count(),
+        'completed_tasks': Task.objects.filter(status='COMPLETED').count(),
+        'high_priority': Task.objects.filter(priority='HIGH', status='PENDING').count(),
+        'attendance_today': Attendance.objects.filter(date=date, status='PRESENT').count(),
+        'total_employees': User.objects.filter(role='EMPLOYEE').count(),
+        'leaves_pending': Leave.objects.filter(status='PENDING').count(),
+        'leaves_approved': Leave.objects.filter(status='APPROVED').count(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks dashboard_stats: query count and p50/p95 latency, legacy raw counts vs rollup aggregates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--populate', action='store_true', help='Insert synthetic rows before measuring')
+        parser.add_argument('--tasks', type=int, default=100_000)
+        parser.add_argument('--attendance', type=int, default=1_000_000)
+        parser.add_argument('--days', type=int, default=365, help='Attendance history length per employee')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['populate']:
+            self.populate(options)
+
+        today = timezone.now().date()
+        legacy = self.measure(lambda: legacy_dashboard_counts(today), options['iterations'])
+        engine = self.measure(lambda: DashboardStatsService.get_counts(today), options['iterations'])
+
+        if legacy['result'] != engine['result']:
+            self.stdout.write(self.style.ERROR(f"Counter mismatch: legacy={legacy['result']} engine={engine['result']}"))
+
+        self.stdout.write(f"Rows: tasks={Task.objects.count()} attendance={Attendance.objects.count()}")
+        for name, stats in (('legacy', legacy), ('engine', engine)):
+            self.stdout.write(
+                f"{name:<7} queries={stats['queries']:<3} "
+                f"p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms"
+            )
+
+    def measure(self, func, iterations):
+        timings = []
+        result = None
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+        queries = len(ctx.captured_queries)
+
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95_index = max(int(len(timings) * 0.95) - 1, 0)
+        return {
+            'result': result,
+            'queries': queries,
+            'p50': statistics.median(timings),
+            'p95': timings[p95_index],
+        }
+
+    def populate(self, options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        days = max(options['days'], 1)
+        today = timezone.now().date()
+        employee_count = max((options['attendance'] + days - 1) // days, 1)
+        password = make_password('password123')
+
+        self.stdout.write(f"Populating {employee_count} employees, {options['tasks']} tasks, {options['attendance']} attendance rows...")
+
+        with transaction.atomic():
+            department, _ = Department.objects.get_or_create(name='Benchmark')
+            run_id = int(time.time())
+            users = User.objects.bulk_create([
+                User(
+                    username=f"bench-{run_id}-{i}",
+                    email=f"bench-{run_id}-{i}@example.com",
+                    password=password,
+                    role='EMPLOYEE',
+                    two_factor_auth_type='NONE',
+                )
+                for i in range(employee_count)
+            ], batch_size=batch_size)
+            employees = Employee.objects.bulk_create([
+                Employee(
+                    user=user,
+                    department=department,
+                    designation='Benchmark',
+                    joining_date=today,
+                    employee_id=f"BEN-{run_id}-{i}",
+                )
+                for i, user in enumerate(users)
+            ], batch_size=batch_size)
+
+            statuses = [choice for choice, _ in Task.Status.choices] + ['PENDING']
+            priorities = [choice for choice, _ in Task.Priority.choices]
+            now = timezone.now()
+            Task.objects.bulk_create((
+                Task(
+                    assigned_to=rng.choice(employees),
+                    assigned_by=users[0],
+                    title=f"Benchmark task {i}",
+                    description='',
+                    due_date=now,
+                    status=rng.choice(statuses),
+                    priority=rng.choice(priorities),
+                )
+                for i in range(options['tasks'])
+            ), batch_size=batch_size)
+
+            attendance_statuses = [choice for choice, _ in Attendance.Status.choices]
+            remaining = options['attendance']
+            rows = []
+            for employee in employees:
+                for offset in range(min(days, remaining)):
+                    rows.append(Attendance(
+                        employee=employee,
+                        date=today - timedelta(days=offset),
+                        status=rng.choice(attendance_statuses),
+                    ))
+                    if len(rows) >= batch_size:
+                        Attendance.objects.bulk_create(rows, batch_size=batch_size)
+                        rows = []
+                remaining -= min(days, remaining)
+                if remaining <= 0:
+                    break
+            if rows:
+                Attendance.objects.bulk_create(rows, batch_size=batch_size)
+
+            # bulk_create bypasses the rollup signals
+            rebuild_rollups()
+
+        self.stdout.write(self.style.SUCCESS('Synthetic data ready.'))
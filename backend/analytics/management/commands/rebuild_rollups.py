@@ -0,0 +1,26 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from analytics.rollups import ROLLUPS, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Backfills or rebuilds the daily analytics rollup tables from raw attendance, task and leave rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Defaults to the beginning of history.')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD). Defaults to today and beyond.')
+        parser.add_argument(
+            '--only', action='append', choices=[spec.name for spec in ROLLUPS.values()],
+            help='Restrict the rebuild to one rollup table (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.date.fromisoformat(options['start']) if options['start'] else None
+            end = datetime.date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        results = rebuild_rollups(start=start, end=end, names=options['only'])
+        for name, rows in results.items():
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {name} rollup: {rows} rows"))
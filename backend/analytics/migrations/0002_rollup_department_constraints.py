@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:40
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    """
+    Folds the duplicate no-department buckets concurrent writers could create into one row.
+    """
+    for model_name, fields in [('AttendanceDailyRollup', ['date', 'status']),
+                               ('LeaveDailyRollup', ['date', 'status', 'leave_type'])]:
+        model = apps.get_model('analytics', model_name)
+        duplicates = (
+            model.objects.filter(department__isnull=True).values(*fields)
+            .annotate(rows=Count('id'), keep=Min('id'), total=Sum('count')).filter(rows__gt=1)
+        )
+        for bucket in duplicates:
+            key = {field: bucket[field] for field in fields}
+            model.objects.filter(pk=bucket['keep']).update(count=bucket['total'])
+            model.objects.filter(department__isnull=True, **key).exclude(pk=bucket['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='attendancedailyrollup',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leavedailyrollup',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', False)), fields=('date', 'status', 'department'), name='attendance_rollup_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('date', 'status'), name='attendance_rollup_no_dept_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='leavedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', False)), fields=('date', 'status', 'leave_type', 'department'), name='leave_rollup_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='leavedailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('department__isnull', True)), fields=('date', 'status', 'leave_type'), name='leave_rollup_no_dept_unique'),
+        ),
+    ]
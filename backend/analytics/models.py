@@ -1,3 +1,67 @@
 from django.db import models
+from employees.models import Department, Employee
 
-# Create your models here.
+
+def unique_per_department(name, *fields):
+    """
+    Unique on ``fields`` plus the nullable department. NULLs are distinct in a plain unique
+    constraint, so rows without a department get their own partial constraint.
+    """
+    return [
+        models.UniqueConstraint(
+            fields=[*fields, 'department'], condition=models.Q(department__isnull=False), name=f'{name}_unique'
+        ),
+        models.UniqueConstraint(
+            fields=list(fields), condition=models.Q(department__isnull=True), name=f'{name}_no_dept_unique'
+        ),
+    ]
+
+
+class AttendanceDailyRollup(models.Model):
+    """
+    Number of attendance records per day, department and status.
+    """
+    date = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = unique_per_department('attendance_rollup', 'date', 'status')
+
+    def __str__(self):
+        return f"{self.date} - {self.department} - {self.status}: {self.count}"
+
+class TaskDailyRollup(models.Model):
+    """
+    Number of tasks created per day and assignee, split by current status and priority.
+    The department is denormalized from the assignee so department views need no join.
+    """
+    date = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20)
+    priority = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'employee', 'status', 'priority')
+
+    def __str__(self):
+        return f"{self.date} - {self.employee_id} - {self.status}/{self.priority}: {self.count}"
+
+class LeaveDailyRollup(models.Model):
+    """
+    Number of leave requests per start day, department, status and leave type.
+    """
+    date = models.DateField()
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20)
+    leave_type = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = unique_per_department('leave_rollup', 'date', 'status', 'leave_type')
+
+    def __str__(self):
+        return f"{self.date} - {self.department} - {self.status}/{self.leave_type}: {self.count}"
@@ -0,0 +1,206 @@
+import datetime
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateTimeField, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from employees.models import Employee
+from attendance.models import Attendance
+from tasks.models import Task
+from leaves.models import Leave
+from .models import AttendanceDailyRollup, TaskDailyRollup, LeaveDailyRollup
+
+
+class RollupDriftError(Exception):
+    """
+    A row left a bucket that does not exist: the rollup no longer matches its source table.
+    """
+
+
+class RollupSpec:
+    """
+    Describes how rows of a source model are bucketed into a daily rollup table.
+
+    A bucket key is the rollup date, the department of the related employee
+    and the values of ``dimensions`` (plus the employee itself when
+    ``keep_employee`` is set). Saves move one unit of ``count`` from the
+    previous bucket to the current one; ``move_department`` re-buckets an
+    employee's rows when they change department; ``rebuild`` recomputes a
+    date range from scratch.
+    """
+
+    def __init__(self, name, source, rollup, date_field, employee_field, dimensions, keep_employee=False):
+        self.name = name
+        self.source = source
+        self.rollup = rollup
+        self.date_field = date_field
+        self.employee_field = employee_field
+        self.dimensions = dimensions
+        self.keep_employee = keep_employee
+        self.date_is_datetime = isinstance(source._meta.get_field(date_field), DateTimeField)
+
+    @staticmethod
+    def _to_date(value):
+        if isinstance(value, datetime.datetime):
+            return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        if isinstance(value, str):
+            return datetime.date.fromisoformat(value)
+        return value
+
+    def _build_key(self, date, employee_id, department_id, dimension_values):
+        if date is None or employee_id is None:
+            return None
+        key = {'date': self._to_date(date), 'department_id': department_id}
+        if self.keep_employee:
+            key['employee_id'] = employee_id
+        key.update(dimension_values)
+        return key
+
+    def key_from_instance(self, instance):
+        employee_id = getattr(instance, f'{self.employee_field}_id')
+        field = self.source._meta.get_field(self.employee_field)
+        if field.is_cached(instance):
+            employee = getattr(instance, self.employee_field)
+            department_id = employee.department_id if employee else None
+        else:
+            department_id = Employee.objects.filter(pk=employee_id).values_list('department_id', flat=True).first()
+        return self._build_key(
+            getattr(instance, self.date_field),
+            employee_id,
+            department_id,
+            {dimension: getattr(instance, dimension) for dimension in self.dimensions},
+        )
+
+    def key_from_db(self, pk):
+        employee_id_field = f'{self.employee_field}_id'
+        department_field = f'{self.employee_field}__department_id'
+        row = self.source.objects.filter(pk=pk).values(
+            self.date_field, employee_id_field, department_field, *self.dimensions
+        ).first()
+        if row is None:
+            return None
+        return self._build_key(
+            row[self.date_field],
+            row[employee_id_field],
+            row[department_field],
+            {dimension: row[dimension] for dimension in self.dimensions},
+        )
+
+    def apply_delta(self, key, delta):
+        if key is None or not delta:
+            return
+        updated = self.rollup.objects.filter(**key).update(count=F('count') + delta)
+        if updated:
+            return
+        if delta < 0:
+            raise RollupDriftError(
+                f"{self.name} rollup has no bucket {key} to take {-delta} from; run rebuild_rollups"
+            )
+        try:
+            with transaction.atomic():
+                self.rollup.objects.create(count=delta, **key)
+        except IntegrityError:
+            # Another transaction created the bucket first
+            if not self.rollup.objects.filter(**key).update(count=F('count') + delta):
+                raise RollupDriftError(f"{self.name} rollup bucket {key} clashes with an existing row; run rebuild_rollups")
+
+    def apply_created(self, instances):
+        """
+        Counts rows inserted with bulk_create (no signals), one update per bucket.
+        """
+        deltas = Counter()
+        for instance in instances:
+            key = self.key_from_instance(instance)
+            if key is not None:
+                deltas[tuple(sorted(key.items()))] += 1
+        for key, delta in deltas.items():
+            self.apply_delta(dict(key), delta)
+
+    def move_department(self, old_department_id, new_department_id, **employees):
+        """
+        Moves the rows of the employees matching ``employees`` (Employee lookups) from the
+        ``old_department_id`` buckets to the ``new_department_id`` ones, one update per bucket.
+        Source rows are bucketed through the employee's current department, so this must
+        run whenever that changes.
+        """
+        if old_department_id == new_department_id:
+            return
+        if self.keep_employee:
+            # The department is denormalized onto each employee's own buckets
+            self.rollup.objects.filter(
+                department_id=old_department_id, employee__in=Employee.objects.filter(**employees)
+            ).update(department_id=new_department_id)
+            return
+        date_expr = TruncDate(self.date_field) if self.date_is_datetime else F(self.date_field)
+        grouped = (
+            self.source.objects.filter(**{f'{self.employee_field}__{lookup}': value for lookup, value in employees.items()})
+            .annotate(rollup_date=date_expr).values('rollup_date', *self.dimensions).annotate(row_count=Count('id')).order_by()
+        )
+        for row in grouped:
+            key = {'date': self._to_date(row['rollup_date'])}
+            key.update({dimension: row[dimension] for dimension in self.dimensions})
+            self.apply_delta({**key, 'department_id': old_department_id}, -row['row_count'])
+            self.apply_delta({**key, 'department_id': new_department_id}, row['row_count'])
+
+    def rebuild(self, start=None, end=None):
+        """
+        Recomputes all buckets between ``start`` and ``end`` (inclusive) from the source table.
+        Returns the number of rollup rows written.
+        """
+        date_expr = TruncDate(self.date_field) if self.date_is_datetime else F(self.date_field)
+        rows = self.source.objects.annotate(rollup_date=date_expr)
+        rollups = self.rollup.objects.all()
+        if start:
+            rows = rows.filter(rollup_date__gte=start)
+            rollups = rollups.filter(date__gte=start)
+        if end:
+            rows = rows.filter(rollup_date__lte=end)
+            rollups = rollups.filter(date__lte=end)
+
+        employee_id_field = f'{self.employee_field}_id'
+        department_field = f'{self.employee_field}__department_id'
+        group_by = ['rollup_date', employee_id_field, department_field, *self.dimensions] if self.keep_employee \
+            else ['rollup_date', department_field, *self.dimensions]
+        grouped = rows.values(*group_by).annotate(row_count=Count('id')).order_by()
+
+        objects = []
+        for row in grouped.iterator():
+            key = {'date': self._to_date(row['rollup_date']), 'department_id': row[department_field]}
+            if self.keep_employee:
+                key['employee_id'] = row[employee_id_field]
+            key.update({dimension: row[dimension] for dimension in self.dimensions})
+            objects.append(self.rollup(count=row['row_count'], **key))
+
+        with transaction.atomic():
+            rollups.delete()
+            self.rollup.objects.bulk_create(objects, batch_size=1000)
+        return len(objects)
+
+
+ROLLUPS = {
+    Attendance: RollupSpec(
+        'attendance', Attendance, AttendanceDailyRollup,
+        date_field='date', employee_field='employee', dimensions=['status'],
+    ),
+    Task: RollupSpec(
+        'tasks', Task, TaskDailyRollup,
+        date_field='created_at', employee_field='assigned_to', dimensions=['status', 'priority'],
+        keep_employee=True,
+    ),
+    Leave: RollupSpec(
+        'leaves', Leave, LeaveDailyRollup,
+        date_field='start_date', employee_field='employee', dimensions=['status', 'leave_type'],
+    ),
+}
+
+
+def rebuild_rollups(start=None, end=None, names=None):
+    """
+    Rebuilds the selected rollup tables (all by default). Returns {name: rows_written}.
+    """
+    results = {}
+    for spec in ROLLUPS.values():
+        if names and spec.name not in names:
+            continue
+        results[spec.name] = spec.rebuild(start, end)
+    return results
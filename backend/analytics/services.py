@@ -0,0 +1,88 @@
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from users.models import User
+from .models import AttendanceDailyRollup, TaskDailyRollup, LeaveDailyRollup
+
+
+def _sum_count(**filters):
+    return Coalesce(Sum('count', filter=Q(**filters)), Value(0))
+
+
+class DashboardStatsService:
+    """
+    Computes the dashboard counters with conditional aggregation.
+    Task, attendance and leave counters are summed from the daily rollup
+    tables, and every table is read at most once, so a dashboard load costs
+    one aggregate query per table instead of one COUNT(*) per counter.
+    """
+
+    @staticmethod
+    def task_counts():
+        return TaskDailyRollup.objects.filter(status__in=['PENDING', 'COMPLETED']).aggregate(
+            pending_tasks=_sum_count(status='PENDING'),
+            completed_tasks=_sum_count(status='COMPLETED'),
+            high_priority=_sum_count(status='PENDING', priority='HIGH'),
+        )
+
+    @staticmethod
+    def attendance_counts(date):
+        return AttendanceDailyRollup.objects.filter(date=date, status='PRESENT').aggregate(
+            attendance_today=Coalesce(Sum('count'), Value(0)),
+        )
+
+    @staticmethod
+    def employee_counts():
+        return User.objects.filter(role='EMPLOYEE').aggregate(
+            total_employees=Count('id'),
+        )
+
+    @staticmethod
+    def leave_counts():
+        return LeaveDailyRollup.objects.filter(status__in=['PENDING', 'APPROVED']).aggregate(
+            leaves_pending=_sum_count(status='PENDING'),
+            leaves_approved=_sum_count(status='APPROVED'),
+        )
+
+    @classmethod
+    def get_counts(cls, date=None):
+        """
+        Returns the raw counters as a flat dict.
+        """
+        date = date or timezone.now().date()
+        counts = {}
+        counts.update(cls.task_counts())
+        counts.update(cls.attendance_counts(date))
+        counts.update(cls.employee_counts())
+        counts.update(cls.leave_counts())
+        return counts
+
+    @staticmethod
+    def build_payload(counts):
+        """
+        Shapes the counters into the JSON structure expected by the frontend.
+        """
+        total_employees = counts['total_employees']
+        attendance_today = counts['attendance_today']
+        attendance_percentage = (attendance_today / total_employees * 100) if total_employees > 0 else 0
+
+        # Finance (Mock/Real)
+        pending_expenses = 0
+
+        return {
+            "pendingTasks": counts['pending_tasks'],
+            "completedTasks": counts['completed_tasks'],
+            "highPriorityTasks": counts['high_priority'],
+            "attendancePercentage": round(attendance_percentage, 1),
+            "activeEmployees": attendance_today,
+            "totalEmployees": total_employees,
+            "leavesPending": counts['leaves_pending'],
+            "leavesApproved": counts['leaves_approved'],
+            "pendingApprovals": counts['leaves_pending'] + pending_expenses, # Approx
+            "teamSize": total_employees, # Simplify for now
+            "pendingExpenses": pending_expenses
+        }
+
+    @classmethod
+    def get_dashboard_stats(cls, date=None):
+        return cls.build_payload(cls.get_counts(date))
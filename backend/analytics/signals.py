@@ -0,0 +1,63 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from employees.models import Department, Employee
+from .rollups import ROLLUPS
+
+# Keep the daily rollup tables in step with saves and deletes of their source rows.
+# Bulk operations (queryset.update, bulk_create) bypass these; run rebuild_rollups after them.
+
+def capture_previous_bucket(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    spec = ROLLUPS[sender]
+    instance._rollup_previous_key = spec.key_from_db(instance.pk) if instance.pk else None
+
+def move_to_current_bucket(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    spec = ROLLUPS[sender]
+    previous = getattr(instance, '_rollup_previous_key', None)
+    current = spec.key_from_instance(instance)
+    if previous != current:
+        spec.apply_delta(previous, -1)
+        spec.apply_delta(current, 1)
+    instance._rollup_previous_key = None
+
+def capture_deleted_bucket(sender, instance, **kwargs):
+    # Resolved before the delete so the employee/department is still reachable
+    instance._rollup_deleted_key = ROLLUPS[sender].key_from_instance(instance)
+
+def remove_from_bucket(sender, instance, **kwargs):
+    ROLLUPS[sender].apply_delta(getattr(instance, '_rollup_deleted_key', None), -1)
+
+# Source rows are bucketed by their employee's current department, so when that changes
+# the employee's rows move buckets with it.
+
+def capture_previous_department(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not instance.pk or (update_fields is not None and 'department' not in update_fields):
+        instance._rollup_previous_department = instance.department_id
+        return
+    instance._rollup_previous_department = (
+        Employee.objects.filter(pk=instance.pk).values_list('department_id', flat=True).first()
+    )
+
+def move_to_current_department(sender, instance, created=False, raw=False, **kwargs):
+    previous = getattr(instance, '_rollup_previous_department', instance.department_id)
+    if raw or created or previous == instance.department_id:
+        return
+    for spec in ROLLUPS.values():
+        spec.move_department(previous, instance.department_id, pk=instance.pk)
+
+def release_department_buckets(sender, instance, **kwargs):
+    # The department's buckets cascade away and its employees are set to no department
+    for spec in ROLLUPS.values():
+        spec.move_department(instance.pk, None, department_id=instance.pk)
+
+pre_save.connect(capture_previous_department, sender=Employee, dispatch_uid='rollup_pre_save_employee_department')
+post_save.connect(move_to_current_department, sender=Employee, dispatch_uid='rollup_post_save_employee_department')
+pre_delete.connect(release_department_buckets, sender=Department, dispatch_uid='rollup_pre_delete_department')
+
+for model in ROLLUPS:
+    pre_save.connect(capture_previous_bucket, sender=model, dispatch_uid=f'rollup_pre_save_{model.__name__}')
+    post_save.connect(move_to_current_bucket, sender=model, dispatch_uid=f'rollup_post_save_{model.__name__}')
+    pre_delete.connect(capture_deleted_bucket, sender=model, dispatch_uid=f'rollup_pre_delete_{model.__name__}')
+    post_delete.connect(remove_from_bucket, sender=model, dispatch_uid=f'rollup_post_delete_{model.__name__}')
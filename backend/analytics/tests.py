@@ -1,3 +1,184 @@
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from employees.models import Employee, Department
+from tasks.models import Task
+from leaves.models import Leave
+from attendance.models import Attendance
+from analytics.services import DashboardStatsService
+from analytics.models import AttendanceDailyRollup, TaskDailyRollup, LeaveDailyRollup
+from analytics.rollups import ROLLUPS, RollupDriftError, rebuild_rollups
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
-# Create your tests here.
+User = get_user_model()
+
+class DashboardStatsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.department = Department.objects.create(name='Engineering')
+
+        self.manager = User.objects.create_user(
+            username='manager',
+            email='manager@test.com',
+            password='password123',
+            role='MANAGER'
+        )
+        self.employee_user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+            role='EMPLOYEE'
+        )
+        self.employee = Employee.objects.create(
+            user=self.employee_user,
+            department=self.department,
+            designation='Dev',
+            joining_date=timezone.now().date()
+        )
+
+        for task_status, priority in [('PENDING', 'HIGH'), ('PENDING', 'LOW'), ('COMPLETED', 'HIGH'), ('TODO', 'HIGH')]:
+            Task.objects.create(
+                title=f"{task_status} {priority}",
+                description="Desc",
+                assigned_to=self.employee,
+                assigned_by=self.manager,
+                due_date=timezone.now(),
+                status=task_status,
+                priority=priority
+            )
+
+        today = timezone.now().date()
+        Attendance.objects.create(employee=self.employee, date=today, status='PRESENT')
+        for leave_status in ['PENDING', 'PENDING', 'APPROVED', 'REJECTED']:
+            Leave.objects.create(
+                employee=self.employee,
+                leave_type='SICK',
+                start_date=today,
+                end_date=today,
+                reason='Flu',
+                status=leave_status
+            )
+
+    def test_counts_use_one_query_per_table(self):
+        with self.assertNumQueries(4):
+            counts = DashboardStatsService.get_counts()
+
+        self.assertEqual(counts, {
+            'pending_tasks': 2,
+            'completed_tasks': 1,
+            'high_priority': 1,
+            'attendance_today': 1,
+            'total_employees': 1,
+            'leaves_pending': 2,
+            'leaves_approved': 1,
+        })
+
+    def test_dashboard_stats_response_shape(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get('/api/analytics/dashboard-stats/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            "pendingTasks": 2,
+            "completedTasks": 1,
+            "highPriorityTasks": 1,
+            "attendancePercentage": 100.0,
+            "activeEmployees": 1,
+            "totalEmployees": 1,
+            "leavesPending": 2,
+            "leavesApproved": 1,
+            "pendingApprovals": 2,
+            "teamSize": 1,
+            "pendingExpenses": 0
+        })
+
+    def test_rollups_follow_status_changes_and_deletes(self):
+        task = Task.objects.get(title='PENDING HIGH')
+        task.status = 'COMPLETED'
+        task.save()
+        Leave.objects.filter(status='PENDING').first().delete()
+
+        counts = DashboardStatsService.get_counts()
+        self.assertEqual(counts['pending_tasks'], 1)
+        self.assertEqual(counts['completed_tasks'], 2)
+        self.assertEqual(counts['high_priority'], 0)
+        self.assertEqual(counts['leaves_pending'], 1)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        incremental = DashboardStatsService.get_counts()
+        rows_before = {
+            name: sorted(model.objects.filter(count__gt=0).values_list('date', 'department_id', 'status', 'count'))
+            for name, model in [('attendance', AttendanceDailyRollup), ('tasks', TaskDailyRollup), ('leaves', LeaveDailyRollup)]
+        }
+
+        rebuild_rollups()
+
+        self.assertEqual(DashboardStatsService.get_counts(), incremental)
+        for name, model in [('attendance', AttendanceDailyRollup), ('tasks', TaskDailyRollup), ('leaves', LeaveDailyRollup)]:
+            self.assertEqual(
+                sorted(model.objects.values_list('date', 'department_id', 'status', 'count')),
+                rows_before[name]
+            )
+
+    def test_buckets_without_a_department_are_unique(self):
+        key = {'date': timezone.now().date() - timezone.timedelta(days=400), 'department': None, 'status': 'PRESENT'}
+        ROLLUPS[Attendance].apply_delta(key, 1)
+        # The IntegrityError fallback in apply_delta relies on this for concurrent first writes
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AttendanceDailyRollup.objects.create(count=1, **key)
+
+        ROLLUPS[Attendance].apply_delta(key, 2)
+        self.assertEqual(list(AttendanceDailyRollup.objects.filter(**key).values_list('count', flat=True)), [3])
+
+    def rollup_rows(self):
+        return {
+            model: sorted(model.objects.filter(count__gt=0).values_list('date', 'department_id', 'status', 'count'))
+            for model in [AttendanceDailyRollup, TaskDailyRollup, LeaveDailyRollup]
+        }
+
+    def test_rollups_follow_an_employee_into_another_department(self):
+        research = Department.objects.create(name='Research')
+        self.employee.department = research
+        self.employee.save()
+
+        attendance = Attendance.objects.get(employee=self.employee)
+        attendance.status = 'ABSENT'
+        attendance.save()
+        Task.objects.get(title='TODO HIGH').delete()
+        Leave.objects.filter(status='REJECTED').delete()
+
+        live = self.rollup_rows()
+        self.assertEqual(live[AttendanceDailyRollup], [(timezone.now().date(), research.pk, 'ABSENT', 1)])
+        self.assertEqual({row[1] for rows in live.values() for row in rows}, {research.pk})
+        rebuild_rollups()
+        self.assertEqual(self.rollup_rows(), live)
+
+    def test_deleting_a_department_moves_its_rows_to_no_department(self):
+        self.department.delete()
+
+        Leave.objects.filter(status='APPROVED').delete()
+
+        live = self.rollup_rows()
+        self.assertEqual({row[1] for rows in live.values() for row in rows}, {None})
+        rebuild_rollups()
+        self.assertEqual(self.rollup_rows(), live)
+
+    def test_taking_from_a_missing_bucket_fails(self):
+        AttendanceDailyRollup.objects.all().delete()
+
+        with self.assertRaises(RollupDriftError):
+            Attendance.objects.get(employee=self.employee).delete()
+
+    def test_trends_and_performance_read_rollups(self):
+        self.client.force_authenticate(user=self.manager)
+
+        trends = self.client.get('/api/analytics/attendance_trends/')
+        self.assertEqual(trends.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['count'] for row in trends.data], [1])
+
+        performance = self.client.get('/api/analytics/task_performance/')
+        self.assertEqual(performance.status_code, status.HTTP_200_OK)
+        self.assertEqual(performance.data[0]['completed_count'], 1)
+        self.assertIn('assigned_to__user__first_name', performance.data[0])
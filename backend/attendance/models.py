@@ -22,6 +22,9 @@ class Attendance(TimeStampedModel):
 
     class Meta:
         unique_together = ('employee', 'date')
+        indexes = [
+            models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.employee} - {self.date}"
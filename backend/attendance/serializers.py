@@ -8,6 +8,7 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = '__all__'
         read_only_fields = ['employee', 'status']
+        select_related = ['employee__user']
 
 class AttendanceClockInSerializer(serializers.ModelSerializer):
     class Meta:
@@ -3,8 +3,9 @@ from rest_framework.response import Response
 from django.utils import timezone
 from .models import Attendance
 from .serializers import AttendanceSerializer
+from core.prefetch import SerializerRelationsMixin
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
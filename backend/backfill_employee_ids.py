@@ -6,6 +6,7 @@ import sys
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
+from employees import identifiers
 from employees.models import Employee
 
 print("\n--- Backfilling Employee IDs ---")
@@ -33,4 +34,7 @@ for emp in employees:
     else:
         print(f"Skipping {emp.user.email} (Already has ID: {emp.employee_id})")
 
+# New hires must be numbered after the ids assigned here
+identifiers.resync()
+
 print(f"\nSuccessfully backfilled {count} employees.")
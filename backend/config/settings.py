@@ -26,6 +26,7 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',') + ['testserver', 'loc
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne', # Serves config.asgi (HTTP + WebSockets) under runserver
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -70,6 +71,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.CurrentUserMiddleware',
+    'core.middleware.AuditBatchMiddleware',
     'core.middleware.SessionSecurityMiddleware',
 ]
 
@@ -114,6 +116,12 @@ if os.getenv('DATABASE_URL'):
     except Exception as e:
         print(f"Error configuring database: {e}")
 
+# Tests on SQLite use a file-backed database: the in-memory one is shared-cache, which fails
+# lock conflicts instead of waiting, so concurrency tests (employees.tests) could not run on it
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', str(BASE_DIR / 'test_db.sqlite3'))
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault('timeout', 20)
+
 
 
 # Password validation
@@ -142,6 +150,9 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded files. A directory of their own, so nginx can be given read access to them and nothing else
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(BASE_DIR / 'media'))
+
 # Session Security
 # Session Security (Relaxed per user request)
 SESSION_COOKIE_AGE = 1209600 # 2 Weeks (Default)
@@ -151,6 +162,31 @@ SESSION_SAVE_EVERY_REQUEST = False # Reset timer on activity (Optional)
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Build trigger: remove encrypted_model_fields completely
 
+# Audit Log
+# Buffered audit entries are written with bulk_create once this many are pending (or at the end of the request)
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', 500))
+# Months of audit history kept in the live (partitioned) table; older months are moved to segment files
+AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', 12))
+AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', str(BASE_DIR / 'audit_archive'))
+
+# Channels (real-time notification push)
+ASGI_APPLICATION = 'config.asgi.application'
+# Redis lets every ASGI worker reach every socket; the in-memory layer only works in a single process (dev, tests)
+if os.getenv('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.getenv('REDIS_URL')]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+    }
+
+# Notifications fanned out by NotificationService.notify_many are inserted this many rows at a time
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.getenv('NOTIFICATION_FANOUT_CHUNK_SIZE', 1000))
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -179,6 +215,10 @@ REST_FRAMEWORK = {
 # CORS
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5173,http://127.0.0.1:5173,http://localhost:5174,http://127.0.0.1:5174').split(',')
 CORS_ALLOW_CREDENTIALS = True
+# Upload-Offset is sent and read by the resumable recording upload
+from corsheaders.defaults import default_headers
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset')
+CORS_EXPOSE_HEADERS = ['Upload-Offset']
 
 # JWT Settings
 SIMPLE_JWT = {
@@ -201,6 +241,70 @@ else:
     # Fallback to console for dev if no SMTP config is present
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Email outbox (drained by `manage.py send_outbox_emails`)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 100))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 6))
+# Retry n waits base * 2**(n-1) seconds, capped at an hour
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_BASE_SECONDS', 30))
+# A batch left in SENDING this long (worker crashed) is handed out again
+EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS = int(os.getenv('EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS', 600))
+
+# Uploads are stored once per distinct content (core.storage); unreferenced blobs are removed by
+# `manage.py gc_blobs` after this grace period
+BLOB_GC_GRACE_HOURS = int(os.getenv('BLOB_GC_GRACE_HOURS', 24))
+
+# Protected downloads (core.downloads): with a prefix set, files are handed to nginx through
+# X-Accel-Redirect to an `internal` location aliased to MEDIA_ROOT; otherwise they stream from Python
+DOWNLOAD_ACCEL_REDIRECT_PREFIX = os.getenv('DOWNLOAD_ACCEL_REDIRECT_PREFIX', '')
+# Lifetime of the signed download links returned by the API
+DOWNLOAD_LINK_MAX_AGE = int(os.getenv('DOWNLOAD_LINK_MAX_AGE', 3600))
+
+# Document full-text index (documents.search), filled by `manage.py index_documents`
+DOCUMENT_INDEX_BATCH_SIZE = int(os.getenv('DOCUMENT_INDEX_BATCH_SIZE', 20))
+# Extracted text past this many characters is not indexed (PostgreSQL caps a tsvector at 1MB)
+DOCUMENT_INDEX_MAX_CHARS = int(os.getenv('DOCUMENT_INDEX_MAX_CHARS', 250000))
+# A document left RUNNING this long (worker died) is queued again
+DOCUMENT_INDEX_LOCK_TIMEOUT_SECONDS = int(os.getenv('DOCUMENT_INDEX_LOCK_TIMEOUT_SECONDS', 600))
+
+# Virus scanning through clamd: tcp://host:3310 or unix:///run/clamav/clamd.ctl (unset: uploads are not scanned,
+# which `manage.py check --deploy` reports as an error unless DEBUG is on)
+CLAMD_ADDRESS = os.getenv('CLAMD_ADDRESS', '')
+CLAMD_TIMEOUT = float(os.getenv('CLAMD_TIMEOUT', 30))
+CLAMD_CHUNK_SIZE = int(os.getenv('CLAMD_CHUNK_SIZE', 64 * 1024))
+# Clean verdicts are cached by content hash this long, then rechecked against newer signatures
+VIRUS_SCAN_CACHE_HOURS = int(os.getenv('VIRUS_SCAN_CACHE_HOURS', 24))
+
+# Meeting processing (transcription + analysis, run by `manage.py process_meeting_jobs`)
+# 'openai', 'fake' (offline, deterministic) or a dotted path to a meetings.ai_utils.MeetingAIProvider subclass
+MEETING_AI_PROVIDER = os.getenv('MEETING_AI_PROVIDER', 'openai')
+MEETING_AI_FAKE_LATENCY = float(os.getenv('MEETING_AI_FAKE_LATENCY', 0))
+MEETING_JOB_MAX_ATTEMPTS = int(os.getenv('MEETING_JOB_MAX_ATTEMPTS', 3))
+# Long recordings are transcribed in overlapping chunks, several at a time
+MEETING_TRANSCRIBE_CHUNK_SECONDS = int(os.getenv('MEETING_TRANSCRIBE_CHUNK_SECONDS', 600))
+MEETING_TRANSCRIBE_OVERLAP_SECONDS = int(os.getenv('MEETING_TRANSCRIBE_OVERLAP_SECONDS', 5))
+MEETING_TRANSCRIBE_WORKERS = int(os.getenv('MEETING_TRANSCRIBE_WORKERS', 4))
+MEETING_TRANSCRIBE_CHUNK_RETRIES = int(os.getenv('MEETING_TRANSCRIBE_CHUNK_RETRIES', 2))
+# A job RUNNING longer than this (worker died) is queued again
+MEETING_JOB_TIMEOUT_SECONDS = int(os.getenv('MEETING_JOB_TIMEOUT_SECONDS', 3600))
+# Transcripts and analyses are cached by input hash; least recently used entries go past this size
+MEETING_AI_CACHE_MAX_BYTES = int(os.getenv('MEETING_AI_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# Resumable recording uploads: partial files live here (default MEDIA_ROOT/recordings/partial)
+MEETING_UPLOAD_TEMP_DIR = os.getenv('MEETING_UPLOAD_TEMP_DIR', '')
+MEETING_UPLOAD_MAX_BYTES = int(os.getenv('MEETING_UPLOAD_MAX_BYTES', 4 * 1024 * 1024 * 1024))
+MEETING_UPLOAD_CHUNK_BYTES = int(os.getenv('MEETING_UPLOAD_CHUNK_BYTES', 8 * 1024 * 1024))
+# A chunk still being written after this long (its request died) no longer blocks the upload
+MEETING_UPLOAD_CHUNK_LEASE_SECONDS = int(os.getenv('MEETING_UPLOAD_CHUNK_LEASE_SECONDS', 600))
+# Unfinished uploads idle this long are removed by `manage.py purge_recording_uploads`
+MEETING_UPLOAD_EXPIRY_HOURS = int(os.getenv('MEETING_UPLOAD_EXPIRY_HOURS', 24))
+
+# Bulk employee import (employees.imports), run by `manage.py process_employee_imports`:
+# passwords are hashed in this many worker processes
+EMPLOYEE_IMPORT_HASH_WORKERS = int(os.getenv('EMPLOYEE_IMPORT_HASH_WORKERS', os.cpu_count() or 1))
+EMPLOYEE_IMPORT_MAX_ROWS = int(os.getenv('EMPLOYEE_IMPORT_MAX_ROWS', 10000))
+EMPLOYEE_IMPORT_BATCH_SIZE = int(os.getenv('EMPLOYEE_IMPORT_BATCH_SIZE', 1000))
+# An import RUNNING longer than this (worker died) is queued again
+EMPLOYEE_IMPORT_TIMEOUT_SECONDS = int(os.getenv('EMPLOYEE_IMPORT_TIMEOUT_SECONDS', 3600))
+
 # Content Security Policy (CSP)
 CSP_ON = True
 CONTENT_SECURITY_POLICY = {
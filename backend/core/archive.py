@@ -0,0 +1,181 @@
+import gzip
+import json
+import hashlib
+import datetime
+import logging
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from . import partitions
+from .models import AuditLog, AuditArchiveSegment
+from .search import ParsedQuery, parse_query
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+SEGMENT_FETCH_SIZE = 5000
+
+
+def archive_root():
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def _isoformat(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    return value.isoformat()
+
+
+def write_segment(table_name, month, connection=default_connection):
+    """
+    Exports a detached month table to a gzip-compressed JSONL segment file and records it.
+    Rows are written newest first, the order the API pages through them. Rows carry the user's email and full name so archived entries stay readable after
+    the user is deleted.
+    """
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(column) for column in partitions.COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT DISTINCT {qn('user_id')} FROM {qn(table_name)}")
+        user_ids = [user_id for (user_id,) in cursor.fetchall() if user_id is not None]
+    users = {
+        user.pk: user for user in User.objects.filter(pk__in=user_ids).only('id', 'email', 'first_name', 'last_name')
+    }
+
+    part = AuditArchiveSegment.objects.filter(month=month).count() + 1
+    relative_path = Path(f"{month:%Y}") / f"auditlog-{month:%Y-%m}-{part:03d}.jsonl.gz"
+    path = archive_root() / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+
+    digest = hashlib.sha256()
+    row_count = 0
+    first_timestamp = last_timestamp = None
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as segment, connection.cursor() as cursor:
+        cursor.execute(f"SELECT {columns} FROM {qn(table_name)} ORDER BY {qn('timestamp')} DESC, {qn('id')} DESC")
+        while True:
+            batch = cursor.fetchmany(SEGMENT_FETCH_SIZE)
+            if not batch:
+                break
+            for values in batch:
+                row = dict(zip(partitions.COLUMNS, values))
+                user = users.get(row['user_id'])
+                timestamp = _isoformat(row['timestamp'])
+                line = json.dumps({
+                    'id': row['id'],
+                    'user': row['user_id'],
+                    'user_email': user.email if user else None,
+                    'user_full_name': user.get_full_name() if user else None,
+                    'action': row['action'],
+                    'model_name': row['model_name'],
+                    'object_id': row['object_id'],
+                    'details': row['details'],
+                    'ip_address': row['ip_address'],
+                    'timestamp': timestamp,
+                }, separators=(',', ':'))
+                digest.update(line.encode('utf-8'))
+                segment.write(line + '\n')
+                row_count += 1
+                last_timestamp = last_timestamp or timestamp
+                first_timestamp = timestamp
+    tmp_path.replace(path)
+
+    return AuditArchiveSegment.objects.create(
+        month=month,
+        file=relative_path.as_posix(),
+        row_count=row_count,
+        sha256=digest.hexdigest(),
+        first_timestamp=parse_datetime(first_timestamp) if first_timestamp else None,
+        last_timestamp=parse_datetime(last_timestamp) if last_timestamp else None,
+        newest_first=True,
+    )
+
+
+def archive_month(month, connection=default_connection):
+    """
+    Detaches one month from the live audit log, writes it to a segment file and drops the month table.
+    """
+    table_name = partitions.detach_month(month, connection)
+    # Recording the segment and dropping the table commit together, so an interrupted
+    # run leaves the detached table behind and the next run exports it again
+    with transaction.atomic(using=connection.alias):
+        segment = write_segment(table_name, month, connection)
+        partitions.drop_month_table(table_name, connection)
+    logger.info("Archived %s audit log rows for %s to %s", segment.row_count, f"{month:%Y-%m}", segment.file)
+    return segment
+
+
+def months_to_archive(retention_months, today=None, connection=default_connection):
+    """
+    Months strictly older than the retention window that still have live rows, attached
+    partitions or leftover detached month tables.
+    """
+    cutoff = partitions.add_months(partitions.month_start(today or timezone.now().date()), -retention_months)
+    cutoff_timestamp = datetime.datetime(cutoff.year, cutoff.month, 1, tzinfo=datetime.timezone.utc)
+    months = {
+        partitions.month_start(day)
+        for day in AuditLog.objects.filter(timestamp__lt=cutoff_timestamp).dates('timestamp', 'month')
+    }
+    for name in partitions.attached_partitions(connection) + partitions.detached_partitions(connection):
+        month = partitions.partition_month(name)
+        if month < cutoff:
+            months.add(month)
+    return sorted(months)
+
+
+def archive_older_than(retention_months, today=None, connection=default_connection):
+    return [archive_month(month, connection) for month in months_to_archive(retention_months, today, connection)]
+
+
+def read_segment(segment):
+    """
+    Yields the archived entries of a segment as dicts, newest first, decompressing as it goes.
+    Segments written oldest first (before newest_first existed) are read whole and reversed.
+    """
+    with gzip.open(archive_root() / segment.file, 'rt', encoding='utf-8') as f:
+        lines = f if segment.newest_first else reversed(f.readlines())
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def search_segment(segment, action=None, model_name=None, user=None, object_id=None, search=None):
+    """
+    Filters a segment with the same fields and search syntax the live audit API supports
+    (see core.search.parse_query). Yields matches newest first, lazily: a caller that stops
+    after one page leaves the rest of the file unread. The segment file is opened on the
+    first ``next()``.
+    """
+    parsed = parse_query(search) if search else ParsedQuery()
+    action = parsed.filters.get('action', action)
+    model_name = parsed.filters.get('model', model_name)
+    user = parsed.filters.get('user', user)
+    object_id = parsed.filters.get('object', parsed.filters.get('id', object_id))
+    after, before = parsed.filters.get('after'), parsed.filters.get('before')
+    terms = [term.lower() for term in parsed.terms]
+
+    for entry in read_segment(segment):
+        if action and entry['action'] != action:
+            continue
+        if model_name and entry['model_name'].lower() != model_name.lower():
+            continue
+        if user and str(user) not in (str(entry['user']), entry['user_email']):
+            continue
+        if object_id and entry['object_id'] != object_id:
+            continue
+        if after or before:
+            timestamp = parse_datetime(entry['timestamp'])
+            if (after and timestamp < after) or (before and timestamp >= before):
+                continue
+        if terms:
+            text = ' '.join(entry[field] or '' for field in ('details', 'object_id', 'model_name', 'user_email', 'user_full_name')).lower()
+            if not all(term in text for term in terms):
+                continue
+        yield entry
@@ -0,0 +1,268 @@
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+# Models whose auditing is suspended in the current thread/task (see AuditRegistry.suspended)
+_suspended = contextvars.ContextVar('audit_suspended', default=frozenset())
+
+
+def _buffer():
+    if not hasattr(_state, 'entries'):
+        _state.entries = []
+        _state.depth = 0
+    return _state
+
+
+def _max_buffer_size():
+    return getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 500)
+
+
+class AuditLogWriter:
+    """
+    Buffers AuditLog rows and writes them with a single bulk_create.
+
+    Entries are only added to the buffer once the transaction they were
+    recorded in commits (via ``transaction.on_commit``), so rows saved in a
+    transaction or savepoint that rolls back never produce audit entries.
+    If a batch insert fails, its entries are retried one by one and only the
+    ones the database still rejects are logged and dropped, so one bad entry
+    neither blocks later flushes nor lets the buffer grow without bound.
+
+    Inside an ``audit_batch()`` block (every request, via AuditBatchMiddleware)
+    the buffer is flushed when the block exits. Outside a batch, entries are
+    written as soon as their transaction commits. Either way the buffer is
+    bounded: reaching AUDIT_LOG_BATCH_SIZE forces a synchronous flush.
+    """
+
+    @staticmethod
+    def record(**fields):
+        from .models import AuditLog
+        fields.setdefault('timestamp', timezone.now())
+        entry = AuditLog(**fields)
+        transaction.on_commit(lambda: AuditLogWriter._enqueue(entry))
+        return entry
+
+    @staticmethod
+    def _enqueue(entry):
+        state = _buffer()
+        state.entries.append(entry)
+        if state.depth == 0 or len(state.entries) >= _max_buffer_size():
+            AuditLogWriter.flush()
+
+    @staticmethod
+    def pending():
+        return len(_buffer().entries)
+
+    @staticmethod
+    def flush():
+        """
+        Writes all committed, buffered entries. Returns the number of rows written.
+        """
+        from .models import AuditLog
+        state = _buffer()
+        if not state.entries:
+            return 0
+
+        entries, state.entries = state.entries, []
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(entries, batch_size=_max_buffer_size())
+            return len(entries)
+        except Exception:
+            logger.warning("Batch write of %s audit log entries failed; retrying one by one", len(entries), exc_info=True)
+
+        written = 0
+        for entry in entries:
+            # Keys assigned by the rolled-back batch are not valid
+            entry.pk = None
+            try:
+                with transaction.atomic():
+                    AuditLog.objects.bulk_create([entry])
+                written += 1
+            except Exception:
+                logger.exception(
+                    "Dropping audit log entry %s %s %s", entry.action, entry.model_name, entry.object_id
+                )
+        return written
+
+
+@contextmanager
+def audit_batch():
+    """
+    Collects audit entries committed inside the block and writes them in one batch on exit.
+    Blocks can be nested; only the outermost one flushes.
+    """
+    state = _buffer()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if state.depth == 0:
+            AuditLogWriter.flush()
+
+
+class AuditRegistry:
+    """
+    Explicit registry of audited models.
+
+    Receivers are connected with ``sender=model`` for registered models only,
+    so saves of untracked models (sessions, OTP devices, notifications...)
+    never reach the audit code. Updates record which fields actually
+    changed; saves that change nothing are logged without a diff. Fields listed in
+    ``redact`` are reported as changed without their values, and fields in
+    ``exclude`` (plus ``auto_now`` timestamps) are ignored.
+
+    Usage::
+
+        @audit_registry.register(redact=['salary'])
+        class Employee(models.Model):
+            ...
+    """
+
+    def __init__(self):
+        self._options = {}
+
+    def register(self, model=None, *, exclude=(), redact=()):
+        def decorator(model):
+            self._register(model, exclude, redact)
+            return model
+        if model is not None:
+            return decorator(model)
+        return decorator
+
+    def _register(self, model, exclude, redact):
+        self._options[model] = {'exclude': set(exclude), 'redact': set(redact), 'fields': None}
+        uid = f'audit_{model._meta.label_lower}'
+        post_init.connect(self._snapshot, sender=model, weak=False, dispatch_uid=f'{uid}_init')
+        post_save.connect(self._log_save, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(self._log_delete, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
+
+    def unregister(self, model):
+        self._options.pop(model, None)
+        uid = f'audit_{model._meta.label_lower}'
+        post_init.disconnect(sender=model, dispatch_uid=f'{uid}_init')
+        post_save.disconnect(sender=model, dispatch_uid=f'{uid}_save')
+        post_delete.disconnect(sender=model, dispatch_uid=f'{uid}_delete')
+
+    @contextmanager
+    def suspended(self, model):
+        """
+        Temporarily stops auditing ``model`` (used by benchmarks and bulk maintenance jobs).
+        Only saves made by the current thread or task are skipped; the receivers stay
+        connected, so other requests are still audited.
+        """
+        token = _suspended.set(_suspended.get() | {model})
+        try:
+            yield
+        finally:
+            _suspended.reset(token)
+
+    @staticmethod
+    def _is_suspended(model):
+        return model in _suspended.get()
+
+    def is_registered(self, model):
+        return model in self._options
+
+    def _tracked_fields(self, model):
+        # Resolved lazily: the model's fields are not final when the decorator runs
+        options = self._options[model]
+        if options['fields'] is None:
+            options['fields'] = [
+                (field.name, field.attname) for field in model._meta.concrete_fields
+                if field.name not in options['exclude'] and not getattr(field, 'auto_now', False)
+            ]
+        return options['fields']
+
+    def _snapshot(self, sender, instance, **kwargs):
+        values = instance.__dict__
+        instance._audit_snapshot = {
+            attname: values[attname] for _, attname in self._tracked_fields(sender) if attname in values
+        }
+
+    def _changes(self, sender, instance):
+        snapshot = getattr(instance, '_audit_snapshot', {})
+        redact = self._options[sender]['redact']
+        changes = []
+        for name, attname in self._tracked_fields(sender):
+            if attname not in snapshot:
+                continue
+            old, new = snapshot[attname], getattr(instance, attname)
+            if old == new:
+                continue
+            if name in redact:
+                changes.append(f"{name}: [changed]")
+            else:
+                changes.append(f"{name}: {old!r} -> {new!r}")
+        return changes
+
+    @staticmethod
+    def _current_user():
+        from .middleware import get_current_user
+        user = get_current_user()
+        # Ensure user is authenticated instance
+        if user and not user.is_authenticated:
+            user = None
+        return user
+
+    def _log_save(self, sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        if self._is_suspended(sender):
+            # Later changes are still reported relative to what was saved
+            self._snapshot(sender, instance)
+            return
+        details = f"Saved {sender.__name__} {instance.pk}"
+        if not created:
+            # Saves without changes are still logged, as before field diffs were recorded
+            changes = self._changes(sender, instance)
+            if changes:
+                details = f"{details}; changed {', '.join(changes)}"
+
+        AuditLogWriter.record(
+            user=self._current_user(),
+            action='CREATE' if created else 'UPDATE',
+            model_name=sender.__name__,
+            object_id=str(instance.pk),
+            details=details
+        )
+        self._snapshot(sender, instance)
+
+    def log_bulk_create(self, model, instances):
+        """
+        Records CREATE entries for rows inserted with bulk_create, which sends no post_save.
+        """
+        if not self.is_registered(model) or self._is_suspended(model):
+            return
+        user = self._current_user()
+        for instance in instances:
+            AuditLogWriter.record(
+                user=user,
+                action='CREATE',
+                model_name=model.__name__,
+                object_id=str(instance.pk),
+                details=f"Saved {model.__name__} {instance.pk}"
+            )
+
+    def _log_delete(self, sender, instance, **kwargs):
+        if self._is_suspended(sender):
+            return
+        AuditLogWriter.record(
+            user=self._current_user(),
+            action='DELETE',
+            model_name=sender.__name__,
+            object_id=str(instance.pk),
+            details=f"Deleted {sender.__name__} {instance.pk}"
+        )
+
+
+audit_registry = AuditRegistry()
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.security, deploy=True)
+def check_virus_scanning(app_configs, **kwargs):
+    """
+    Uploads are stored unscanned without CLAMD_ADDRESS, which is only acceptable in development.
+    """
+    if settings.DEBUG or settings.CLAMD_ADDRESS:
+        return []
+    return [Error(
+        "CLAMD_ADDRESS is not set, so uploaded files are stored without a virus scan.",
+        hint="Point it at clamd, e.g. tcp://clamd:3310 (see docker-compose.prod.yml).",
+        id='core.E001',
+    )]
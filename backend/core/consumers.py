@@ -0,0 +1,35 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .realtime import user_group, unread_counts
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Per-user event stream: new notifications, new messages and unread counters.
+
+    On connect the client receives ``{"type": "unread", "unread": {...}}`` so it can
+    drop its initial count request; afterwards events arrive as they are committed.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.group_name = user_group(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        counts = await database_sync_to_async(unread_counts)(user.pk)
+        await self.send_json({'type': 'unread', 'data': None, 'unread': counts})
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Clients only listen; a ping keeps intermediaries from closing idle sockets
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def push_event(self, event):
+        await self.send_json(event['payload'])
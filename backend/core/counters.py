@@ -0,0 +1,154 @@
+"""
+O(1) unread badges: per-user counters in UnreadCounter, adjusted on every save.
+
+Each counted model has a CounterSpec saying which user a row counts for and
+whether it is currently unread. Saves and deletes move one unit between the
+previous and current state with an atomic ``F()`` update (see core.signals);
+``reconcile`` recomputes counters from the source tables to repair drift left
+by bulk operations that bypass signals.
+"""
+from collections import Counter, defaultdict
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from messaging.models import Message
+from .models import Notification, UnreadCounter
+
+User = get_user_model()
+
+
+class CounterSpec:
+    def __init__(self, field, model, user_field, unread):
+        self.field = field
+        self.model = model
+        self.user_field = user_field
+        self.unread = unread
+
+    def is_unread(self, values):
+        return all(values[name] == expected for name, expected in self.unread.items())
+
+    def key_from_instance(self, instance):
+        values = {name: getattr(instance, name) for name in self.unread}
+        user_id = getattr(instance, f'{self.user_field}_id')
+        return user_id if user_id and self.is_unread(values) else None
+
+    def key_from_db(self, pk):
+        row = self.model.objects.filter(pk=pk).values(f'{self.user_field}_id', *self.unread).first()
+        if row is None or not self.is_unread(row):
+            return None
+        return row[f'{self.user_field}_id']
+
+    def unread_filter(self):
+        return Q(**self.unread)
+
+    def counts(self, user_ids=None):
+        rows = self.model.objects.filter(self.unread_filter(), **{f'{self.user_field}__isnull': False})
+        if user_ids is not None:
+            rows = rows.filter(**{f'{self.user_field}_id__in': user_ids})
+        grouped = rows.values(f'{self.user_field}_id').annotate(unread=Count('id')).order_by()
+        return {row[f'{self.user_field}_id']: row['unread'] for row in grouped}
+
+
+FIELDS = ('notifications', 'messages')
+
+COUNTERS = {
+    Notification: CounterSpec('notifications', Notification, 'recipient', {'is_read': False}),
+    Message: CounterSpec('messages', Message, 'recipient', {'is_read': False, 'is_archived': False}),
+}
+
+
+def adjust(user_id, field, delta):
+    """
+    Atomically adds ``delta`` to one of a user's counters, creating the row from the
+    source tables the first time the user is seen.
+    """
+    if not user_id or not delta:
+        return
+    updated = UnreadCounter.objects.filter(user_id=user_id).update(**{field: F(field) + delta})
+    if not updated:
+        # The fresh count already includes the row being saved, so the delta is not applied on top
+        reconcile([user_id])
+
+
+def adjust_many(user_ids, field, delta):
+    """
+    ``adjust`` for many users in one UPDATE, for bulk inserts that bypass the signals.
+    A user listed several times is adjusted once per listing (one UPDATE per distinct repeat count).
+    """
+    repeats = Counter(user_ids)
+    user_ids = set(repeats)
+    if not user_ids or not delta:
+        return
+    by_delta = defaultdict(list)
+    for user_id, times in repeats.items():
+        by_delta[delta * times].append(user_id)
+    for user_delta, ids in by_delta.items():
+        UnreadCounter.objects.filter(user_id__in=ids).update(**{field: F(field) + user_delta})
+    existing = set(UnreadCounter.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+    if user_ids - existing:
+        reconcile(list(user_ids - existing))
+
+
+def get_counts(user_id):
+    """
+    ``{'notifications': n, 'messages': m}`` for a user, from the counter row (one primary-key lookup).
+    """
+    return get_counts_many([user_id]).get(user_id, {field: 0 for field in FIELDS})
+
+
+def get_counts_many(user_ids):
+    """
+    Counters for several users in one query, keyed by user id.
+    """
+    def fetch(ids):
+        rows = UnreadCounter.objects.filter(user_id__in=ids).values('user_id', *FIELDS)
+        return {row['user_id']: {field: max(row[field], 0) for field in FIELDS} for row in rows}
+
+    counts = fetch(user_ids)
+    missing = [user_id for user_id in user_ids if user_id not in counts]
+    if missing:
+        reconcile(missing)
+        counts.update(fetch(missing))
+    return counts
+
+
+def reconcile(user_ids=None):
+    """
+    Recomputes counters from the source tables for ``user_ids`` (default: every user with a
+    counter or an unread row) and fixes the ones that drifted. Returns the number of rows repaired.
+    """
+    expected = {}
+    for spec in COUNTERS.values():
+        for user_id, unread in spec.counts(user_ids).items():
+            expected.setdefault(user_id, {}).setdefault(spec.field, unread)
+
+    counters = UnreadCounter.objects.all()
+    if user_ids is not None:
+        counters = counters.filter(user_id__in=user_ids)
+    current = {row['user_id']: row for row in counters.values('user_id', *FIELDS)}
+    targets = set(current) | set(expected) | (set(user_ids) if user_ids is not None else set())
+
+    # Counter rows are only created for users that exist (ids may come straight from a request)
+    new_users = set(User.objects.filter(pk__in=targets - set(current)).values_list('pk', flat=True))
+
+    now = timezone.now()
+    repaired = 0
+    fields = [spec.field for spec in COUNTERS.values()]
+    for user_id in targets & (set(current) | new_users):
+        values = {field: expected.get(user_id, {}).get(field, 0) for field in fields}
+        row = current.get(user_id)
+        if row is not None:
+            if all(row[field] == values[field] for field in fields):
+                continue
+            UnreadCounter.objects.filter(user_id=user_id).update(reconciled_at=now, **values)
+            repaired += 1
+            continue
+        try:
+            with transaction.atomic():
+                UnreadCounter.objects.create(user_id=user_id, reconciled_at=now, **values)
+        except IntegrityError:
+            # Created concurrently; the next run will check it again
+            continue
+        repaired += 1
+    return repaired
@@ -0,0 +1,193 @@
+"""
+Protected file downloads.
+
+Views check access the same way as the resource's API (usually through the
+viewset's ``get_queryset``) and then call ``serve_file``. With
+DOWNLOAD_ACCEL_REDIRECT_PREFIX set the response is an empty ``X-Accel-Redirect``
+and nginx streams the file (with its own Range support) from an ``internal``
+location, so workers are not tied up by large downloads. Otherwise the file is
+served from Python with ETag/If-None-Match and single-range Range/If-Range support.
+
+Browsers cannot send the JWT on a plain link, so serializers expose signed,
+short-lived download URLs (``SignedDownloadURLField``) that authenticate the user
+for that one path (``DownloadSignatureAuthentication``).
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import content_disposition_header
+from rest_framework import serializers
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+from .storage import is_blob
+
+SIGNATURE_SALT = 'core.downloads'
+STREAM_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def sign_path(user, path):
+    return signing.TimestampSigner(salt=SIGNATURE_SALT).sign(f"{user.pk}:{path}")
+
+
+def signed_url(request, path):
+    """
+    Absolute URL of ``path`` carrying a signature for the requesting user.
+    """
+    return request.build_absolute_uri(f"{path}?sig={quote(sign_path(request.user, path))}")
+
+
+class DownloadSignatureAuthentication(BaseAuthentication):
+    """
+    Authenticates ``?sig=`` links made by ``signed_url`` for the path they were signed for.
+    """
+
+    def authenticate(self, request):
+        signature = request.query_params.get('sig')
+        if not signature:
+            return None
+        try:
+            value = signing.TimestampSigner(salt=SIGNATURE_SALT).unsign(
+                signature, max_age=settings.DOWNLOAD_LINK_MAX_AGE
+            )
+        except signing.BadSignature:
+            raise AuthenticationFailed("Download link is invalid or has expired.")
+        user_id, path = value.split(':', 1)
+        if path != request.path:
+            raise AuthenticationFailed("Download link is not valid for this file.")
+        user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("Download link is invalid or has expired.")
+        return user, None
+
+
+DOWNLOAD_AUTHENTICATION_CLASSES = [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, DownloadSignatureAuthentication]
+
+
+class SignedDownloadURLField(serializers.Field):
+    """
+    Read-only signed URL of a download view, or None when ``file_field`` is empty.
+    ``url_kwargs`` maps URL kwargs to attributes of the instance.
+    """
+
+    def __init__(self, view_name, file_field='file', url_kwargs=None, **kwargs):
+        self.view_name = view_name
+        self.file_field = file_field
+        self.url_kwargs = url_kwargs or {'pk': 'pk'}
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        request = self.context.get('request')
+        if not getattr(instance, self.file_field) or request is None or not request.user.is_authenticated:
+            return None
+        path = reverse(self.view_name, kwargs={kwarg: getattr(instance, attr) for kwarg, attr in self.url_kwargs.items()})
+        return signed_url(request, path)
+
+
+def file_etag(field_file):
+    """
+    Blob names contain the content hash; other files are identified by size and modification time.
+    """
+    name = field_file.name
+    if is_blob(name):
+        return f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    storage = field_file.storage
+    modified = storage.get_modified_time(name).timestamp()
+    return f'"{field_file.size:x}-{int(modified):x}"'
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single ``bytes=`` range, None to serve the whole file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: answering with the full file is allowed
+        return None
+    first, last = match.groups()
+    if first == '':
+        if last == '':
+            return None
+        length = int(last)
+        if not length:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _matches(header, etag):
+    return header.strip() == '*' or etag in [tag.strip().removeprefix('W/') for tag in header.split(',')]
+
+
+def _stream(handle, start, length):
+    with handle:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(STREAM_CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def serve_file(request, field_file, filename=None, as_attachment=True):
+    """
+    Response for downloading ``field_file``: 304, an nginx X-Accel-Redirect, a 206 range or the whole file.
+    """
+    filename = filename or os.path.basename(field_file.name)
+    etag = file_etag(field_file)
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, max-age=0, must-revalidate',
+        'Content-Disposition': content_disposition_header(as_attachment, filename),
+    }
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and _matches(if_none_match, etag):
+        return HttpResponse(status=304, headers={'ETag': etag, 'Cache-Control': headers['Cache-Control']})
+
+    prefix = settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(field_file.name)
+        return response
+
+    size = field_file.size
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            return HttpResponse(status=416, headers={'Content-Range': f'bytes */{size}'})
+
+    handle = field_file.storage.open(field_file.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(_stream(handle, start, end - start + 1), status=206, content_type=content_type, headers=headers)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
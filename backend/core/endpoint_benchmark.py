@@ -0,0 +1,256 @@
+"""
+Query-count and latency benchmarks for the API's read endpoints.
+
+``discover_routes`` walks config/urls.py for every GET route under /api/.
+``run`` requests each one as a user of each role, through the full middleware
+stack, and records the status, query count, p50/p95 latency and response size.
+URL arguments come from rows the role can see: the view's own ``get_queryset``
+for generic views, ROUTE_SAMPLES for the rest. A route with nothing visible is
+skipped for that role.
+
+Results are keyed ``"<ROLE> <path template>"``, e.g. ``"MANAGER /api/tasks/{pk}/"``,
+so they can be stored as a baseline and compared with ``compare``. Everything,
+including the benchmark users, runs in a transaction that is rolled back, so
+GET endpoints with side effects leave no trace.
+"""
+import json
+import re
+import statistics
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+from rest_framework.routers import APIRootView
+from rest_framework.test import APIClient
+from employees.models import Department, Employee
+from meetings.models import Recording, RecordingUpload
+from messaging.models import MessageAttachment
+
+User = get_user_model()
+
+DEFAULT_ROLES = ['SYSTEM_ADMIN', 'HR_MANAGER', 'ACCOUNTANT', 'MANAGER', 'SOFTWARE_ENGINEER']
+REGEX_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+ROUTE_CONVERTER = re.compile(r'<(?:\w+:)?(\w+)>')
+ARGUMENT = re.compile(r'{(\w+)}')
+
+# URL arguments for views without a get_queryset lookup, as seen by ``user``
+ROUTE_SAMPLES = {
+    'recording-upload': lambda user: {'upload_id': RecordingUpload.objects.filter(
+        created_by=user, status=RecordingUpload.Status.ACTIVE
+    ).values_list('pk', flat=True).first()},
+    'recording-download': lambda user: {'meeting_id': Recording.objects.exclude(file='').values_list(
+        'meeting_id', flat=True
+    ).first()},
+    'message-attachment-download': lambda user: {'pk': MessageAttachment.objects.filter(
+        message__recipient=user
+    ).values_list('pk', flat=True).first()},
+}
+
+
+class Route:
+    def __init__(self, path, name, callback):
+        self.path = path
+        self.name = name
+        self.callback = callback
+        self.arguments = ARGUMENT.findall(path)
+
+    def url(self, arguments):
+        return ARGUMENT.sub(lambda match: str(arguments[match.group(1)]), self.path)
+
+    def __repr__(self):
+        return f"Route({self.path!r})"
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, prefix + str(pattern.pattern))
+        else:
+            yield prefix + str(pattern.pattern), pattern
+
+
+def _handles_get(callback):
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    return view_class is None or hasattr(view_class, 'get')
+
+
+def discover_routes(prefix='api/'):
+    """
+    GET routes under ``prefix``, without DRF's format-suffix variants and router root views.
+    """
+    routes = {}
+    for raw, pattern in _walk(get_resolver().url_patterns):
+        callback = pattern.callback
+        if not raw.startswith(prefix) or 'format>' in raw or getattr(callback, 'cls', None) is APIRootView:
+            continue
+        if not _handles_get(callback):
+            continue
+        path = ROUTE_CONVERTER.sub(r'{\1}', REGEX_GROUP.sub(r'{\1}', raw)).replace('^', '').replace('$', '')
+        routes.setdefault('/' + path, Route('/' + path, pattern.name, callback))
+    return list(routes.values())
+
+
+def _view(route, user):
+    view_class = route.callback.cls
+    request = Request(RequestFactory().get(route.path))
+    request.user = user
+    view = view_class(**route.callback.initkwargs)
+    actions = getattr(route.callback, 'actions', None)
+    if actions:
+        view.action_map = actions
+        view.action = actions['get']
+    view.request, view.args, view.kwargs, view.format_kwarg = request, (), {}, None
+    return view
+
+
+def sample_arguments(route, user):
+    """
+    URL arguments for ``route`` pointing at a row ``user`` can see, or None when there is none.
+    """
+    if not route.arguments:
+        return {}
+    if route.name in ROUTE_SAMPLES:
+        arguments = ROUTE_SAMPLES[route.name](user)
+    else:
+        view_class = getattr(route.callback, 'cls', None)
+        if not (view_class and issubclass(view_class, GenericAPIView)):
+            return None
+        lookup = view_class.lookup_url_kwarg or view_class.lookup_field
+        if route.arguments != [lookup]:
+            return None
+        value = _view(route, user).get_queryset().order_by().values_list(view_class.lookup_field, flat=True).first()
+        arguments = {lookup: value}
+    return arguments if all(value is not None for value in arguments.values()) else None
+
+
+def benchmark_users(roles):
+    """
+    One user per role, each with an employee profile, created for this run.
+    """
+    department = Department.objects.order_by('id').first() or Department.objects.create(name='Benchmark')
+    run_id = uuid.uuid4().hex[:8]
+    users = {}
+    for role in roles:
+        name = f'benchmark-{run_id}-{role.lower()}'
+        user = User.objects.create_user(
+            username=name, email=f'{name}@example.com', password=None,
+            role=role, first_name='Benchmark', last_name=role.title(), is_staff=role == 'SYSTEM_ADMIN',
+        )
+        Employee.objects.create(
+            user=user, department=department, designation='Benchmark',
+            joining_date=timezone.now().date(), employee_id=f'BENCH-{run_id}-{role}'[:20],
+        )
+        users[role] = user
+    return users
+
+
+def _body_size(response):
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        response.close()
+        return size
+    return len(response.content)
+
+
+class QueryCounter:
+    """
+    Execute wrapper counting queries; unlike the debug query log it is not reset when a request starts.
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, url, iterations):
+    client.get(url)  # warm-up
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        response = client.get(url)
+    size = _body_size(response)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        _body_size(client.get(url))
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'url': url,
+        'status': response.status_code,
+        'queries': queries.count,
+        'p50_ms': round(statistics.median(timings), 2) if timings else 0.0,
+        'p95_ms': round(timings[max(int(len(timings) * 0.95) - 1, 0)], 2) if timings else 0.0,
+        'bytes': size,
+    }
+
+
+def run(roles=None, iterations=20, match=None, progress=None):
+    """
+    Benchmarks every GET route as each role. Returns ``(results, skipped)``.
+    """
+    results, skipped = {}, []
+    routes = [route for route in discover_routes() if not match or match in route.path]
+    # Throttling would turn repeated requests into 429s; the dummy cache keeps no request history
+    with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+        with transaction.atomic():
+            users = benchmark_users(roles or DEFAULT_ROLES)
+            client = APIClient()
+            for route in routes:
+                for role, user in users.items():
+                    key = f"{role} {route.path}"
+                    arguments = sample_arguments(route, user)
+                    if arguments is None:
+                        skipped.append(key)
+                        continue
+                    client.force_authenticate(user=user)
+                    results[key] = measure(client, route.url(arguments), iterations)
+                    if progress:
+                        progress(key, results[key])
+            transaction.set_rollback(True)
+    return results, skipped
+
+
+def compare(results, baseline, latency_tolerance=0.5, latency_slack_ms=5.0, size_tolerance=0.25):
+    """
+    Regressions of ``results`` against ``baseline`` (both keyed like ``run``'s results), as messages.
+
+    A regression is a different status, any extra query, a p95 more than ``latency_tolerance``
+    (plus ``latency_slack_ms``, which absorbs timer noise on fast endpoints) above the
+    baseline, or a response more than ``size_tolerance`` larger.
+    """
+    regressions = []
+    for key, current in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current['status'] != previous['status']:
+            regressions.append(f"{key}: status {previous['status']} -> {current['status']}")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{key}: queries {previous['queries']} -> {current['queries']}")
+        allowed_ms = previous['p95_ms'] * (1 + latency_tolerance) + latency_slack_ms
+        if current['p95_ms'] > allowed_ms:
+            regressions.append(f"{key}: p95 {previous['p95_ms']:.2f}ms -> {current['p95_ms']:.2f}ms")
+        if current['bytes'] > previous['bytes'] * (1 + size_tolerance):
+            regressions.append(f"{key}: size {previous['bytes']} -> {current['bytes']} bytes")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as handle:
+        return json.load(handle)['results']
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as handle:
+        json.dump({'generated_at': timezone.now().isoformat(), 'results': results}, handle, indent=2, sort_keys=True)
+        handle.write('\n')
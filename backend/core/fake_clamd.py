@@ -0,0 +1,101 @@
+"""
+A local stand-in for clamd, for tests and development machines without ClamAV.
+
+It speaks the same PING and INSTREAM protocol as the real daemon and reports
+a file as infected when it contains one of ``signatures`` (the EICAR test
+string by default)::
+
+    with FakeClamd() as clamd, override_settings(CLAMD_ADDRESS=clamd.address):
+        ...
+"""
+import socketserver
+import struct
+import threading
+
+EICAR = rb'X5O!P%@AP[4\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*'
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def _read_exact(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the stream")
+            data += chunk
+        return data
+
+    def _command(self):
+        data = b''
+        while not data.endswith((b'\0', b'\n')):
+            chunk = self.request.recv(1)
+            if not chunk:
+                break
+            data += chunk
+        return data.rstrip(b'\0\n').decode()
+
+    def handle(self):
+        server = self.server.clamd
+        command = self._command()
+        if command in ('zPING', 'nPING', 'PING'):
+            self.request.sendall(b'PONG\0')
+            return
+        if command not in ('zINSTREAM', 'nINSTREAM'):
+            self.request.sendall(b'UNKNOWN COMMAND\0')
+            return
+
+        data = b''
+        while True:
+            (size,) = struct.unpack('!L', self._read_exact(4))
+            if not size:
+                break
+            if len(data) + size > server.stream_max_length:
+                self.request.sendall(b'INSTREAM size limit exceeded. ERROR\0')
+                return
+            data += self._read_exact(size)
+            server.chunks += 1
+
+        server.scans += 1
+        for pattern, name in server.signatures.items():
+            if pattern in data:
+                self.request.sendall(f'stream: {name} FOUND\0'.encode())
+                return
+        self.request.sendall(b'stream: OK\0')
+
+
+class FakeClamd:
+    """
+    Threaded TCP server on 127.0.0.1; ``scans`` and ``chunks`` count the work it was given.
+    """
+
+    def __init__(self, signatures=None, stream_max_length=25 * 1024 * 1024):
+        self.signatures = signatures or {EICAR: 'Eicar-Test-Signature'}
+        self.stream_max_length = stream_max_length
+        self.scans = 0
+        self.chunks = 0
+        self._server = None
+
+    @property
+    def address(self):
+        host, port = self._server.server_address
+        return f'tcp://{host}:{port}'
+
+    def start(self):
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.clamd = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core import partitions
+from core.archive import archive_older_than, months_to_archive
+
+
+class Command(BaseCommand):
+    help = 'Creates upcoming audit log partitions and archives months older than the retention window to compressed segment files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-months', type=int, default=settings.AUDIT_RETENTION_MONTHS)
+        parser.add_argument('--months-ahead', type=int, default=3, help='Monthly partitions to create in advance (PostgreSQL)')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the months that would be archived')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for month in months_to_archive(options['retention_months']):
+                self.stdout.write(f"Would archive {month:%Y-%m}")
+            return
+
+        for name in partitions.ensure_partitions(months_ahead=options['months_ahead']):
+            self.stdout.write(f"Created partition {name}")
+
+        for segment in archive_older_than(options['retention_months']):
+            self.stdout.write(self.style.SUCCESS(
+                f"Archived {segment.month:%Y-%m}: {segment.row_count} rows -> {segment.file}"
+            ))
@@ -0,0 +1,56 @@
+import time
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.audit import audit_batch, audit_registry
+from core.models import AuditLog
+from employees.models import Employee, Department
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark of model save throughput with and without audit logging'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--saves', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        saves = options['saves']
+        department = Department.objects.create(name='Audit Benchmark')
+        user = User.objects.create_user(
+            username='audit-benchmark',
+            email='audit-benchmark@example.com',
+            password=None,
+        )
+        employee = Employee.objects.create(
+            user=user,
+            department=department,
+            designation='Benchmark',
+            joining_date=timezone.now().date()
+        )
+
+        try:
+            audited = self.run(employee, 'designation', saves)
+            with audit_registry.suspended(Employee):
+                unaudited = self.run(employee, 'designation', saves)
+            untracked = self.run(department, 'description', saves)
+        finally:
+            with audit_registry.suspended(User), audit_registry.suspended(Employee):
+                user.delete()
+                department.delete()
+            AuditLog.objects.filter(model_name__in=['Employee', 'User'], object_id__in=[str(employee.pk), str(user.pk)]).delete()
+
+        self.stdout.write(f"{'Employee (audited)':<24} {audited:>10.0f} saves/s")
+        self.stdout.write(f"{'Employee (not audited)':<24} {unaudited:>10.0f} saves/s")
+        self.stdout.write(f"{'Department (untracked)':<24} {untracked:>10.0f} saves/s")
+        if unaudited:
+            self.stdout.write(f"Audit overhead: {(unaudited / audited - 1) * 100:.1f}%")
+
+    def run(self, instance, field, saves):
+        start = time.perf_counter()
+        with audit_batch():
+            for i in range(saves):
+                setattr(instance, field, f"Benchmark {i}")
+                instance.save()
+        return saves / (time.perf_counter() - start)
@@ -0,0 +1,109 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from core.models import AuditLog
+from core.search import search_audit_logs
+
+DEFAULT_QUERIES = [
+    'designation',
+    'model:Task action:DELETE',
+    'model:Employee salary',
+    'sprint review',
+    'action:UPDATE lead',
+    '43117',
+]
+MODELS = ['Task', 'Employee', 'Leave', 'ApprovalRequest', 'User']
+ACTIONS = ['CREATE', 'UPDATE', 'DELETE']
+WORDS = ['designation', 'status', 'priority', 'title', 'due_date', 'salary', 'sprint', 'review', 'lead', 'deploy', 'backlog']
+
+
+def legacy_search(queryset, query):
+    """icontains across the old search_fields, as SearchFilter ran it."""
+    for term in query.split():
+        queryset = queryset.filter(
+            Q(details__icontains=term) | Q(object_id__icontains=term) |
+            Q(user__email__icontains=term) | Q(user__first_name__icontains=term)
+        )
+    return queryset
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks audit log search: legacy icontains scans vs the full-text index (p50/p95 of the first page)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--populate', type=int, default=0, help='Insert this many synthetic audit rows first (e.g. 10000000)')
+        parser.add_argument('--months', type=int, default=12, help='Spread synthetic rows over this many months')
+        parser.add_argument('--query', action='append', dest='queries', help='Query to run (repeatable)')
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skip-legacy', action='store_true', help='Only time the indexed search (legacy scans are slow on large tables)')
+
+    def handle(self, *args, **options):
+        if options['populate']:
+            self.populate(options)
+
+        self.stdout.write(f"Backend: {connection.vendor}, rows: {AuditLog.objects.count()}")
+        queryset = AuditLog.objects.order_by('-timestamp', '-id')
+        page_size = options['page_size']
+        for query in options['queries'] or DEFAULT_QUERIES:
+            indexed = self.measure(lambda: list(search_audit_logs(queryset, query)[:page_size]), options['iterations'])
+            self.stdout.write(f"{query!r}")
+            self.report('indexed', indexed)
+            # The old SearchFilter had no field filters, so only the free text is comparable
+            legacy_query = ' '.join(term for term in query.split() if ':' not in term)
+            if legacy_query and not options['skip_legacy']:
+                legacy = self.measure(lambda: list(legacy_search(queryset, legacy_query)[:page_size]), options['iterations'])
+                self.report('legacy', legacy)
+
+    def report(self, name, stats):
+        self.stdout.write(f"  {name:<8} rows={stats['rows']:<4} p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms")
+
+    def measure(self, func, iterations):
+        rows = len(func())
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95_index = max(int(len(timings) * 0.95) - 1, 0)
+        return {
+            'rows': rows,
+            'p50': statistics.median(timings),
+            'p95': timings[p95_index],
+        }
+
+    def populate(self, options):
+        rng = random.Random(options['seed'])
+        total, batch_size = options['populate'], options['batch_size']
+        span = timedelta(days=30 * max(options['months'], 1)).total_seconds()
+        now = timezone.now()
+
+        self.stdout.write(f"Populating {total} audit log rows...")
+        written = 0
+        while written < total:
+            rows = []
+            for i in range(written, min(written + batch_size, total)):
+                model_name = rng.choice(MODELS)
+                field, old, new = rng.choice(WORDS), rng.choice(WORDS), rng.choice(WORDS)
+                rows.append(AuditLog(
+                    action=rng.choice(ACTIONS),
+                    model_name=model_name,
+                    object_id=str(rng.randint(1, 100_000)),
+                    details=f"Saved {model_name} {i}; changed {field}: '{old}' -> '{new}'",
+                    timestamp=now - timedelta(seconds=rng.random() * span),
+                ))
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(rows, batch_size=batch_size)
+            written += len(rows)
+            self.stdout.write(f"  {written}/{total}")
+
+        self.stdout.write(self.style.SUCCESS('Synthetic audit rows ready.'))
@@ -0,0 +1,72 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from core.endpoint_benchmark import DEFAULT_ROLES, compare, load_baseline, run, save_baseline
+from core.synthetic import populate_org
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks every GET route under /api/ as each role (status, queries, p50/p95, bytes) '
+        'and fails when results regress against a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--populate', action='store_true', help='Add a synthetic organisation before measuring')
+        parser.add_argument('--employees', type=int, default=10_000)
+        parser.add_argument('--attendance-days', type=int, default=100, help='Attendance history per employee')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--roles', nargs='+', default=DEFAULT_ROLES)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--match', help='Only routes whose path contains this text')
+        parser.add_argument('--baseline', default='benchmarks/endpoints.json', help='Baseline JSON file')
+        parser.add_argument('--update-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--strict', action='store_true', help='Fail when there is no baseline to compare with (for CI)')
+        parser.add_argument('--latency-tolerance', type=float, default=0.5, help='Allowed p95 growth (0.5 = +50%%)')
+        parser.add_argument('--latency-slack-ms', type=float, default=5.0)
+        parser.add_argument('--size-tolerance', type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        if options['populate']:
+            self.stdout.write(f"Populating {options['employees']} employees...")
+            try:
+                counts = populate_org(
+                    employees=options['employees'], attendance_days=options['attendance_days'], seed=options['seed']
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(', '.join(f"{name}={rows}" for name, rows in counts.items()))
+
+        def progress(key, result):
+            self.stdout.write(
+                f"{key:<60} {result['status']} queries={result['queries']:<3} "
+                f"p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms bytes={result['bytes']}"
+            )
+
+        results, skipped = run(
+            roles=options['roles'], iterations=options['iterations'], match=options['match'], progress=progress
+        )
+        if skipped:
+            self.stdout.write(f"Skipped {len(skipped)} route/role pairs with no visible rows to request")
+
+        baseline_path = options['baseline']
+        if options['update_baseline']:
+            os.makedirs(os.path.dirname(baseline_path) or '.', exist_ok=True)
+            save_baseline(baseline_path, results)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {baseline_path}"))
+            return
+        if not os.path.exists(baseline_path):
+            message = f"No baseline at {baseline_path}; run with --update-baseline to create one"
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(message)
+            return
+
+        regressions = compare(
+            results, load_baseline(baseline_path), latency_tolerance=options['latency_tolerance'],
+            latency_slack_ms=options['latency_slack_ms'], size_tolerance=options['size_tolerance'],
+        )
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against {baseline_path}")
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} results within the baseline"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from core.storage import collect_garbage, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Deletes content-addressed blobs no file field references any more (run periodically, e.g. daily cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reconcile', action='store_true', help='Recount references from the file fields first (after bulk updates)')
+        parser.add_argument('--grace-hours', type=int, help='Override BLOB_GC_GRACE_HOURS')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting it')
+
+    def handle(self, *args, **options):
+        if options['reconcile']:
+            self.stdout.write(f"Repaired {reconcile()} reference count(s)")
+        deleted, freed = collect_garbage(options['grace_hours'], dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {deleted} blob(s), {freed / 1024 / 1024:.1f} MB"))
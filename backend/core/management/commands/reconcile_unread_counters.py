@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recomputes unread notification/message counters from the source tables and repairs drift; repeats every --interval seconds when given'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only reconcile this user id (repeatable)')
+        parser.add_argument('--interval', type=float, help='Run as a long-lived worker, reconciling every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            start = time.perf_counter()
+            repaired = reconcile(options['users'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Repaired {repaired} unread counter(s) in {time.perf_counter() - start:.2f}s"
+            ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.outbox import drain
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued outbox emails over a reused mail connection; runs as a long-lived worker unless --once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the due emails and exit')
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when nothing is due')
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            sent, failed = drain(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            if sent or failed:
+                self.stdout.write(
+                    f"Sent {sent}, failed {failed} in {elapsed:.2f}s ({sent / elapsed if elapsed else 0:.1f} emails/s)"
+                )
+            if options['once']:
+                return
+            if not (sent or failed):
+                time.sleep(options['poll_interval'])
@@ -1,4 +1,9 @@
 import threading
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from .audit import audit_batch
 
 _thread_locals = threading.local()
 
@@ -17,6 +22,18 @@ class CurrentUserMiddleware:
         return response
 
 
+class AuditBatchMiddleware:
+    """
+    Buffers the audit log entries committed during a request and writes them in one batch.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_batch():
+            return self.get_response(request)
+
+
 class SessionSecurityMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
@@ -46,3 +63,23 @@ class SessionSecurityMiddleware:
         return self.get_response(request)
 
 
+@database_sync_to_async
+def get_jwt_user(raw_token):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed, TokenError
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections with the same access token the REST API uses.
+    Browsers cannot set headers on a WebSocket, so the token comes as ``?token=<access>``.
+    """
+    async def __call__(self, scope, receive, send):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+        scope = dict(scope, user=await get_jwt_user(token) if token else AnonymousUser())
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,93 @@
+import datetime
+from django.db import migrations
+
+
+def partition_auditlog(apps, schema_editor):
+    """
+    Converts core_auditlog into a table partitioned by month on PostgreSQL.
+    Other backends keep the plain table (see core.partitions).
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    from core.partitions import PARENT_TABLE, DEFAULT_PARTITION, COLUMNS, ensure_partitions, month_start
+
+    columns = ', '.join(f'"{column}"' for column in COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {PARENT_TABLE} RENAME TO {PARENT_TABLE}_unpartitioned')
+        cursor.execute(f'CREATE SEQUENCE {PARENT_TABLE}_partitioned_id_seq')
+        cursor.execute(f"""
+            CREATE TABLE {PARENT_TABLE} (
+                "id" bigint NOT NULL DEFAULT nextval('{PARENT_TABLE}_partitioned_id_seq'),
+                "user_id" bigint NULL REFERENCES users_user ("id") DEFERRABLE INITIALLY DEFERRED,
+                "action" varchar(10) NOT NULL,
+                "model_name" varchar(100) NOT NULL,
+                "object_id" varchar(100) NULL,
+                "details" text NOT NULL,
+                "ip_address" inet NULL,
+                "timestamp" timestamp with time zone NOT NULL,
+                PRIMARY KEY ("id", "timestamp")
+            ) PARTITION BY RANGE ("timestamp")
+        """)
+        cursor.execute(f'ALTER SEQUENCE {PARENT_TABLE}_partitioned_id_seq OWNED BY {PARENT_TABLE}."id"')
+        cursor.execute(f'CREATE INDEX {PARENT_TABLE}_user_id_idx ON {PARENT_TABLE} ("user_id")')
+        cursor.execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT')
+
+        cursor.execute(f'SELECT MIN("timestamp") FROM {PARENT_TABLE}_unpartitioned')
+        oldest = cursor.fetchone()[0]
+
+    ensure_partitions(start=month_start(oldest) if oldest else datetime.date.today(), connection=connection)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {PARENT_TABLE}_unpartitioned'
+        )
+        cursor.execute(
+            f"SELECT setval('{PARENT_TABLE}_partitioned_id_seq', COALESCE((SELECT MAX(\"id\") FROM {PARENT_TABLE}), 0) + 1, false)"
+        )
+        cursor.execute(f'DROP TABLE {PARENT_TABLE}_unpartitioned')
+
+
+def unpartition_auditlog(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    from core.partitions import PARENT_TABLE, COLUMNS
+
+    columns = ', '.join(f'"{column}"' for column in COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {PARENT_TABLE} RENAME TO {PARENT_TABLE}_partitioned')
+        cursor.execute(f"""
+            CREATE TABLE {PARENT_TABLE} (
+                "id" bigint NOT NULL PRIMARY KEY GENERATED BY DEFAULT AS IDENTITY,
+                "user_id" bigint NULL REFERENCES users_user ("id") DEFERRABLE INITIALLY DEFERRED,
+                "action" varchar(10) NOT NULL,
+                "model_name" varchar(100) NOT NULL,
+                "object_id" varchar(100) NULL,
+                "details" text NOT NULL,
+                "ip_address" inet NULL,
+                "timestamp" timestamp with time zone NOT NULL
+            )
+        """)
+        cursor.execute(f'CREATE INDEX {PARENT_TABLE}_user_id_idx ON {PARENT_TABLE} ("user_id")')
+        cursor.execute(
+            f'INSERT INTO {PARENT_TABLE} ({columns}) SELECT {columns} FROM {PARENT_TABLE}_partitioned'
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{PARENT_TABLE}', 'id'), COALESCE((SELECT MAX(\"id\") FROM {PARENT_TABLE}), 0) + 1, false)"
+        )
+        cursor.execute(f'DROP TABLE {PARENT_TABLE}_partitioned CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_auditlog_timestamp'),
+        ('users', '0004_alter_user_two_factor_auth_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_auditlog, unpartition_auditlog),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanVerdict',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('clean', models.BooleanField()),
+                ('signature', models.CharField(blank=True, max_length=255)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('scanned_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
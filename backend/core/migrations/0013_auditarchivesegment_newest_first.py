@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_storedblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditarchivesegment',
+            name='newest_first',
+            field=models.BooleanField(default=False, help_text='Rows are stored newest first'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -20,6 +21,86 @@ class Notification(TimeStampedModel):
     def __str__(self):
         return f"To {self.recipient}: {self.title}"
 
+    class Meta:
+        indexes = [
+            # Serves the per-user keyset pages of the notification feed
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notification_feed_idx'),
+        ]
+
+class UnreadCounter(models.Model):
+    """
+    Denormalized unread badges for one user, kept in step by core.counters.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    notifications = models.IntegerField(default=0)
+    messages = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.notifications} notifications, {self.messages} messages unread"
+
+class OutboxEmail(models.Model):
+    """
+    An email queued in the sender's transaction and delivered later by the send_outbox_emails worker.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+class ScanVerdict(models.Model):
+    """
+    The virus scanner's verdict on a file's content, keyed by its SHA-256 so duplicates are not scanned again.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    clean = models.BooleanField()
+    signature = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    scanned_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.sha256[:12]}: {'clean' if self.clean else self.signature}"
+
+class StoredBlob(models.Model):
+    """
+    A file in content-addressed storage (core.storage) and how many FileField values point at it.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='storedblob_gc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
 class AuditLog(models.Model):
     ACTION_CHOICES = (
         ('CREATE', 'Create'),
@@ -35,10 +116,33 @@ class AuditLog(models.Model):
     object_id = models.CharField(max_length=100, blank=True, null=True)
     details = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is recorded, not when the buffered batch is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f"{self.user} - {self.action} - {self.model_name} - {self.timestamp}"
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='auditlog_timestamp_idx'),
+        ]
+
+class AuditArchiveSegment(models.Model):
+    """
+    A compressed JSONL file holding audit log rows moved out of the live table by archive_audit_logs.
+    """
+    month = models.DateField(help_text="First day of the archived month")
+    file = models.CharField(max_length=255, help_text="Path relative to AUDIT_ARCHIVE_DIR")
+    row_count = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64)
+    first_timestamp = models.DateTimeField(null=True, blank=True)
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    newest_first = models.BooleanField(default=False, help_text="Rows are stored newest first")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Audit archive {self.month:%Y-%m} ({self.row_count} rows)"
+
+    class Meta:
+        ordering = ['-month', '-id']
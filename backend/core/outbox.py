@@ -0,0 +1,153 @@
+"""
+Transactional email outbox.
+
+``enqueue_email`` writes an OutboxEmail row in the caller's transaction, so the
+email exists exactly when the task/message that caused it does and the request
+never waits on SMTP. The ``send_outbox_emails`` worker claims due rows in batches,
+sends each batch over one reused mail connection and reschedules failures with
+exponential backoff.
+"""
+import datetime
+import logging
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.utils import timezone
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = datetime.timedelta(hours=1)
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """
+    Queues an email for the outbox worker. ``to`` is an address or a list of addresses.
+    """
+    if isinstance(to, str):
+        to = [to]
+    return OutboxEmail.objects.create(
+        subject=subject[:255],
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def enqueue_emails(emails, from_email=None):
+    """
+    Queues ``(subject, body, to)`` emails with one bulk insert. Returns the number queued.
+    """
+    rows = [
+        OutboxEmail(
+            subject=subject[:255],
+            body=body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=[to] if isinstance(to, str) else list(to),
+        )
+        for subject, body, to in emails
+    ]
+    OutboxEmail.objects.bulk_create(rows, batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE)
+    return len(rows)
+
+
+def retry_delay(attempts):
+    delay = datetime.timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def release_stale_locks(now=None):
+    """
+    Hands batches claimed by a worker that died mid-send back to the queue.
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS)
+    return OutboxEmail.objects.filter(status=OutboxEmail.Status.SENDING, locked_at__lt=cutoff).update(
+        status=OutboxEmail.Status.PENDING, locked_at=None
+    )
+
+
+def claim_batch(limit, now=None):
+    """
+    Marks up to ``limit`` due emails as SENDING and returns them. Concurrent workers on
+    PostgreSQL skip each other's rows instead of waiting on them.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(
+            status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id')
+        if db_connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:limit])
+        OutboxEmail.objects.filter(id__in=ids).update(status=OutboxEmail.Status.SENDING, locked_at=now)
+    return list(OutboxEmail.objects.filter(id__in=ids).order_by('next_attempt_at', 'id'))
+
+
+def send_batch(emails, mail_connection):
+    """
+    Sends claimed emails over an open mail connection and records the outcome of each.
+    Returns ``(sent, failed)``.
+    """
+    now = timezone.now()
+    sent_ids = []
+    failed = 0
+    for email in emails:
+        message = EmailMessage(email.subject, email.body, email.from_email, email.to, connection=mail_connection)
+        try:
+            message.send()
+        except Exception as exc:
+            failed += 1
+            attempts = email.attempts + 1
+            gave_up = attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            OutboxEmail.objects.filter(pk=email.pk).update(
+                status=OutboxEmail.Status.FAILED if gave_up else OutboxEmail.Status.PENDING,
+                attempts=attempts,
+                next_attempt_at=now + retry_delay(attempts),
+                locked_at=None,
+                last_error=f"{type(exc).__name__}: {exc}"[:1000],
+            )
+            logger.warning("Outbox email %s failed (attempt %s%s): %s", email.pk, attempts, ', giving up' if gave_up else '', exc)
+            # A broken SMTP session fails every later send too; start a fresh one. If that fails
+            # as well, each remaining send retries the connection itself and is rescheduled.
+            try:
+                mail_connection.close()
+                mail_connection.open()
+            except Exception:
+                pass
+            continue
+        sent_ids.append(email.pk)
+
+    OutboxEmail.objects.filter(pk__in=sent_ids).update(
+        status=OutboxEmail.Status.SENT, sent_at=now, locked_at=None, last_error=''
+    )
+    return len(sent_ids), failed
+
+
+def drain(batch_size=None, max_batches=None, mail_connection=None):
+    """
+    Sends due emails batch by batch over a single mail connection until none are due
+    (or ``max_batches`` is reached). Returns ``(sent, failed)``.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    mail_connection = mail_connection or get_connection()
+    release_stale_locks()
+
+    sent = failed = batches = 0
+    opened = False
+    try:
+        while max_batches is None or batches < max_batches:
+            emails = claim_batch(batch_size)
+            if not emails:
+                break
+            if not opened:
+                mail_connection.open()
+                opened = True
+            batch_sent, batch_failed = send_batch(emails, mail_connection)
+            sent += batch_sent
+            failed += batch_failed
+            batches += 1
+    finally:
+        if opened:
+            mail_connection.close()
+    return sent, failed
@@ -0,0 +1,180 @@
+"""
+Monthly partitioning of the audit log table.
+
+On PostgreSQL ``core_auditlog`` is a natively partitioned table
+(``PARTITION BY RANGE (timestamp)``) with one partition per month named
+``core_auditlog_pYYYYMM`` and a ``core_auditlog_default`` partition that
+catches rows for months without a partition yet.
+
+Other backends (SQLite in development) keep a single table; a month is
+split out into its own ``core_auditlog_pYYYYMM`` table when it is
+detached for archival, which is the same shape PostgreSQL produces with
+``DETACH PARTITION``.
+"""
+import re
+import datetime
+from django.db import connection as default_connection, transaction
+
+PARENT_TABLE = 'core_auditlog'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+PARTITION_PATTERN = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$')
+COLUMNS = ['id', 'user_id', 'action', 'model_name', 'object_id', 'details', 'ip_address', 'timestamp']
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + (month.month - 1) + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def partition_month(table_name):
+    match = PARTITION_PATTERN.match(table_name)
+    if not match:
+        return None
+    return datetime.date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def month_bounds(month, connection=default_connection):
+    """
+    Returns the [start, end) timestamps of a month, adapted for raw SQL on ``connection``.
+    """
+    tz = datetime.timezone.utc
+    start = datetime.datetime(month.year, month.month, 1, tzinfo=tz)
+    next_month = add_months(month, 1)
+    end = datetime.datetime(next_month.year, next_month.month, 1, tzinfo=tz)
+    return connection.ops.adapt_datetimefield_value(start), connection.ops.adapt_datetimefield_value(end)
+
+
+def is_partitioned(connection=default_connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [PARENT_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def attached_partitions(connection=default_connection):
+    """
+    Names of the monthly partitions currently attached to the audit log table (PostgreSQL only).
+    """
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [PARENT_TABLE]
+        )
+        return sorted(name for (name,) in cursor.fetchall() if PARTITION_PATTERN.match(name))
+
+
+def detached_partitions(connection=default_connection):
+    """
+    Month tables that exist but are not part of the live audit log (left by an interrupted archival run).
+    """
+    attached = set(attached_partitions(connection))
+    tables = connection.introspection.table_names()
+    return sorted(name for name in tables if PARTITION_PATTERN.match(name) and name not in attached)
+
+
+def ensure_partitions(months_ahead=3, start=None, connection=default_connection):
+    """
+    Creates monthly partitions from ``start`` (default: this month) up to ``months_ahead`` months ahead.
+    Rows already sitting in the default partition for those months are moved into the new partition.
+    No-op on backends without native partitioning. Returns the names of the partitions created.
+    """
+    if not is_partitioned(connection):
+        return []
+
+    attached = set(attached_partitions(connection))
+    month = month_start(start or datetime.date.today())
+    last = add_months(month_start(datetime.date.today()), months_ahead)
+    qn = connection.ops.quote_name
+    # Explicit columns: generated ones (the search vector) cannot be inserted into
+    columns = ', '.join(qn(column) for column in COLUMNS)
+    created = []
+    while month <= last:
+        name = partition_name(month)
+        if name not in attached:
+            lower, upper = month_bounds(month, connection)
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {qn(name)} "
+                    f"(LIKE {qn(PARENT_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+                )
+                cursor.execute(
+                    f"INSERT INTO {qn(name)} ({columns}) SELECT {columns} FROM {qn(DEFAULT_PARTITION)} "
+                    f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s",
+                    [lower, upper]
+                )
+                cursor.execute(
+                    f"DELETE FROM {qn(DEFAULT_PARTITION)} WHERE \"timestamp\" >= %s AND \"timestamp\" < %s",
+                    [lower, upper]
+                )
+                cursor.execute(
+                    f"ALTER TABLE {qn(PARENT_TABLE)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+                    [lower, upper]
+                )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def detach_month(month, connection=default_connection):
+    """
+    Moves every audit row of ``month`` out of the live table into a standalone month table and
+    returns its name. On PostgreSQL the month's partition is detached; elsewhere the rows are
+    copied into a new per-month table and deleted from the live one.
+    """
+    name = partition_name(month)
+    lower, upper = month_bounds(month, connection)
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(column) for column in COLUMNS)
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if name in detached_partitions(connection):
+            # A previous run detached this month; only pick up rows that arrived since
+            cursor.execute(
+                f"INSERT INTO {qn(name)} ({columns}) SELECT {columns} FROM {qn(PARENT_TABLE)} "
+                f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s",
+                [lower, upper]
+            )
+        elif name in attached_partitions(connection):
+            cursor.execute(f"ALTER TABLE {qn(PARENT_TABLE)} DETACH PARTITION {qn(name)}")
+            cursor.execute(
+                f"INSERT INTO {qn(name)} ({columns}) SELECT {columns} FROM {qn(DEFAULT_PARTITION)} "
+                f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s",
+                [lower, upper]
+            )
+        else:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} AS SELECT {columns} FROM {qn(PARENT_TABLE)} "
+                f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s",
+                [lower, upper]
+            )
+        cursor.execute(
+            f"DELETE FROM {qn(PARENT_TABLE)} WHERE \"timestamp\" >= %s AND \"timestamp\" < %s",
+            [lower, upper]
+        )
+    return name
+
+
+def drop_month_table(name, connection=default_connection):
+    if not PARTITION_PATTERN.match(name):
+        raise ValueError(f"{name} is not an audit log month table")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
@@ -0,0 +1,89 @@
+"""
+Declarative select_related/prefetch_related for serializers.
+
+A serializer lists the relations its own fields walk in ``Meta.select_related``
+(foreign keys and one-to-ones, joined into the query) and ``Meta.prefetch_related``
+(many-valued relations, loaded with one extra query each)::
+
+    class TaskSerializer(serializers.ModelSerializer):
+        assigned_to_name = serializers.CharField(source='assigned_to.user.get_full_name', read_only=True)
+
+        class Meta:
+            model = Task
+            select_related = ['assigned_to__user']
+
+Nested serializers add their own declarations under their source, so
+``PayslipSerializer(employee_details=EmployeeSerializer(source='employee'))`` loads
+``employee__user`` and ``employee__department`` without repeating them; a nested
+serializer must therefore follow a relation. Views mixing in
+``SerializerRelationsMixin`` apply the result to their querysets, so a list page
+costs the same number of queries however many rows it has.
+"""
+from functools import lru_cache
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class Relations:
+    def __init__(self, select=(), prefetch=()):
+        self.select = list(dict.fromkeys(select))
+        self.prefetch = list(prefetch)
+
+    def apply(self, queryset):
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*self.prefetch)
+        return queryset
+
+    def __repr__(self):
+        return f"Relations(select={self.select!r}, prefetch={self.prefetch!r})"
+
+
+def _prefixed(prefix, lookup):
+    if isinstance(lookup, Prefetch):
+        return Prefetch(f'{prefix}__{lookup.prefetch_through}', queryset=lookup.queryset, to_attr=lookup.to_attr)
+    return f'{prefix}__{lookup}'
+
+
+def serializer_relations(serializer):
+    """
+    Relations a serializer instance and the serializers nested in it declare, as lookups from its model.
+    """
+    meta = getattr(serializer, 'Meta', None)
+    select = list(getattr(meta, 'select_related', []))
+    prefetch = list(getattr(meta, 'prefetch_related', []))
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        path = '__'.join(field.source_attrs)
+        if isinstance(field, serializers.ListSerializer):
+            child = serializer_relations(field.child)
+            model = getattr(getattr(field.child, 'Meta', None), 'model', None)
+            if model is None:
+                prefetch.append(path)
+            else:
+                prefetch.append(Prefetch(path, queryset=child.apply(model._default_manager.all())))
+        elif isinstance(field, serializers.BaseSerializer):
+            child = serializer_relations(field)
+            select.append(path)
+            select.extend(_prefixed(path, lookup) for lookup in child.select)
+            prefetch.extend(_prefixed(path, lookup) for lookup in child.prefetch)
+    return Relations(select, prefetch)
+
+
+@lru_cache(maxsize=None)
+def relations_for(serializer_class):
+    return serializer_relations(serializer_class())
+
+
+class SerializerRelationsMixin:
+    """
+    For generic views: loads the relations the serializer declares (see ``relations_for``)
+    along with the queryset of list and detail requests.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return relations_for(self.get_serializer_class()).apply(queryset)
@@ -0,0 +1,78 @@
+"""
+Pushes notification and message events to connected users over the channel layer.
+
+Every authenticated WebSocket joins the group ``user_<id>`` (see core.consumers).
+Events are sent once the surrounding transaction commits, so clients never hear
+about rows that were rolled back.
+"""
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from .counters import get_counts, get_counts_many
+
+logger = logging.getLogger(__name__)
+
+EVENT_HANDLER = 'push.event'
+
+
+def user_group(user_id):
+    return f"user_{user_id}"
+
+
+def unread_counts(user_id):
+    return get_counts(user_id)
+
+
+def _send(user_id, payload):
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    try:
+        async_to_sync(layer.group_send)(user_group(user_id), {'type': EVENT_HANDLER, 'payload': payload})
+    except Exception:
+        # A push failure must not break the request that produced the event; clients resync on reconnect
+        logger.exception("Failed to push %s event to user %s", payload.get('type'), user_id)
+
+
+def push(user_id, event_type, data=None):
+    """
+    Sends ``{"type": event_type, "data": ..., "unread": {...}}`` to the user after commit.
+    """
+    def send():
+        _send(user_id, {'type': event_type, 'data': data, 'unread': unread_counts(user_id)})
+    transaction.on_commit(send)
+
+
+def push_many(events):
+    """
+    Sends ``(user_id, event_type, data)`` events after commit, reading all counters in one query.
+    """
+    events = list(events)
+    if not events:
+        return
+
+    def send():
+        counts = get_counts_many({user_id for user_id, _, _ in events})
+        for user_id, event_type, data in events:
+            _send(user_id, {'type': event_type, 'data': data, 'unread': counts.get(user_id)})
+    transaction.on_commit(send)
+
+
+def push_unread(user_id):
+    push(user_id, 'unread')
+
+
+def notification_payload(notification):
+    from core.serializers import NotificationSerializer
+    return NotificationSerializer(notification).data
+
+
+def message_payload(message):
+    return {
+        'id': message.id,
+        'subject': message.subject,
+        'sender': message.sender_id,
+        'sender_name': message.sender.get_full_name() or message.sender.email,
+        'timestamp': message.timestamp.isoformat() if message.timestamp else None,
+    }
@@ -0,0 +1,171 @@
+"""
+Virus scanning of uploads through a clamd-compatible daemon.
+
+``inspect_upload`` makes one local pass over an upload that hashes it and keeps
+its first bytes for MIME sniffing. The hash is looked up in the ScanVerdict
+table; only unknown content is streamed to clamd with the INSTREAM command, in
+chunks of CLAMD_CHUNK_SIZE bytes, and the verdict is stored for next time.
+Clean verdicts expire after VIRUS_SCAN_CACHE_HOURS so content is rechecked
+against newer signatures; infected verdicts never expire.
+
+CLAMD_ADDRESS is ``tcp://host:port`` or ``unix:///path/to/clamd.ctl``. Without
+it uploads are not scanned (development only; ``check --deploy`` fails, see
+core.checks); with it an unreachable or failing daemon rejects the upload.
+"""
+import datetime
+import hashlib
+import logging
+import socket
+import struct
+from urllib.parse import urlparse
+from django.conf import settings
+from django.utils import timezone
+from .models import ScanVerdict
+
+logger = logging.getLogger(__name__)
+
+HEAD_SIZE = 2048
+
+
+class ScanError(Exception):
+    """Raised when the daemon cannot be reached or does not return a verdict."""
+
+
+class Verdict:
+    def __init__(self, clean, signature='', cached=False):
+        self.clean = clean
+        self.signature = signature
+        self.cached = cached
+
+    def __repr__(self):
+        return f"Verdict({'clean' if self.clean else self.signature}{', cached' if self.cached else ''})"
+
+
+class Inspection:
+    """
+    What one pass over an upload learned: its hash, size, first bytes and scan verdict.
+    """
+    def __init__(self, sha256, size, head, verdict):
+        self.sha256 = sha256
+        self.size = size
+        self.head = head
+        self.verdict = verdict
+
+
+class ClamdClient:
+    """
+    Minimal client for clamd's ``zINSTREAM`` and ``zPING`` commands.
+    """
+
+    def __init__(self, address=None, timeout=None, chunk_size=None):
+        self.address = address or settings.CLAMD_ADDRESS
+        self.timeout = timeout or settings.CLAMD_TIMEOUT
+        self.chunk_size = chunk_size or settings.CLAMD_CHUNK_SIZE
+
+    def _connect(self):
+        target = urlparse(self.address)
+        try:
+            if target.scheme == 'unix':
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect(target.path)
+            else:
+                sock = socket.create_connection((target.hostname, target.port or 3310), timeout=self.timeout)
+        except OSError as e:
+            raise ScanError(f"Cannot reach clamd at {self.address}: {e}") from e
+        return sock
+
+    @staticmethod
+    def _reply(sock):
+        data = b''
+        while not data.endswith(b'\0'):
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        return data.rstrip(b'\0').decode('utf-8', 'replace').strip()
+
+    def ping(self):
+        with self._connect() as sock:
+            sock.sendall(b'zPING\0')
+            return self._reply(sock) == 'PONG'
+
+    def scan_chunks(self, chunks):
+        """
+        Streams ``chunks`` (an iterable of bytes) to the daemon and returns its Verdict.
+        """
+        with self._connect() as sock:
+            try:
+                sock.sendall(b'zINSTREAM\0')
+                for chunk in chunks:
+                    for start in range(0, len(chunk), self.chunk_size):
+                        piece = chunk[start:start + self.chunk_size]
+                        sock.sendall(struct.pack('!L', len(piece)) + piece)
+                sock.sendall(struct.pack('!L', 0))
+            except OSError as e:
+                # clamd closes the stream early when StreamMaxLength is exceeded; its reply says why
+                logger.info("clamd stopped reading the stream: %s", e)
+            try:
+                reply = self._reply(sock)
+            except OSError as e:
+                raise ScanError(f"No reply from clamd: {e}") from e
+
+        result = reply.split(':', 1)[-1].strip()
+        if result == 'OK':
+            return Verdict(clean=True)
+        if result.endswith(' FOUND'):
+            return Verdict(clean=False, signature=result[:-len(' FOUND')])
+        raise ScanError(f"clamd error: {reply or 'empty reply'}")
+
+
+def _chunks(upload):
+    upload.seek(0)
+    for chunk in upload.chunks(settings.CLAMD_CHUNK_SIZE):
+        yield chunk
+    upload.seek(0)
+
+
+def cached_verdict(sha256):
+    entry = ScanVerdict.objects.filter(sha256=sha256).first()
+    if entry is None:
+        return None
+    if entry.clean and entry.scanned_at < timezone.now() - datetime.timedelta(hours=settings.VIRUS_SCAN_CACHE_HOURS):
+        return None
+    return Verdict(entry.clean, entry.signature, cached=True)
+
+
+def scan(upload, sha256, size):
+    """
+    Verdict for an upload whose hash is already known, from the cache or from clamd.
+    """
+    verdict = cached_verdict(sha256)
+    if verdict:
+        return verdict
+    if not settings.CLAMD_ADDRESS:
+        return Verdict(clean=True)
+
+    verdict = ClamdClient().scan_chunks(_chunks(upload))
+    ScanVerdict.objects.update_or_create(
+        sha256=sha256,
+        defaults={'clean': verdict.clean, 'signature': verdict.signature, 'size': size, 'scanned_at': timezone.now()},
+    )
+    if not verdict.clean:
+        logger.warning("Virus scan found %s in %s (%s)", verdict.signature, getattr(upload, 'name', ''), sha256)
+    return verdict
+
+
+def inspect_upload(upload, head_size=HEAD_SIZE):
+    """
+    Hashes the upload and keeps its first ``head_size`` bytes in one pass, then scans it
+    unless its verdict is cached. Raises ScanError when the daemon fails.
+    """
+    digest = hashlib.sha256()
+    head = b''
+    size = 0
+    for chunk in _chunks(upload):
+        digest.update(chunk)
+        if len(head) < head_size:
+            head += chunk[:head_size - len(head)]
+        size += len(chunk)
+    sha256 = digest.hexdigest()
+    return Inspection(sha256, size, head, scan(upload, sha256, size))
@@ -0,0 +1,219 @@
+"""
+Full-text search over the audit log.
+
+Free text is matched against an index instead of ``icontains`` scans:
+
+* PostgreSQL: a generated ``search_vector`` tsvector column on ``core_auditlog``
+  (details, object_id, model_name) with a GIN index, see migration 0008.
+* SQLite: an external-content FTS5 table ``core_auditlog_fts`` kept in sync by
+  insert/update/delete triggers.
+* Other backends fall back to ``icontains`` on details and object_id.
+
+Queries may mix free text with field filters, e.g. ``model:Task action:DELETE "sprint review"``.
+"""
+import re
+import datetime
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import filters
+
+User = get_user_model()
+
+PARENT_TABLE = 'core_auditlog'
+FTS_TABLE = f'{PARENT_TABLE}_fts'
+SEARCH_INDEX = f'{PARENT_TABLE}_search_idx'
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        AFTER INSERT ON {PARENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, details, object_id, model_name)
+            VALUES (new.id, new.details, new.object_id, new.model_name);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        AFTER DELETE ON {PARENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, details, object_id, model_name)
+            VALUES ('delete', old.id, old.details, old.object_id, old.model_name);
+        END""",
+    f'{FTS_TABLE}_au': f"""
+        AFTER UPDATE ON {PARENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, details, object_id, model_name)
+            VALUES ('delete', old.id, old.details, old.object_id, old.model_name);
+            INSERT INTO {FTS_TABLE} (rowid, details, object_id, model_name)
+            VALUES (new.id, new.details, new.object_id, new.model_name);
+        END""",
+}
+TOKEN_PATTERN = re.compile(r'(\w+):("[^"]*"|\S+)|"([^"]*)"|(\S+)')
+WORD_PATTERN = re.compile(r'\w+')
+
+# Field filters accepted in a query, mapped to the lookup they apply
+FIELD_FILTERS = {
+    'model': 'model_name__iexact',
+    'action': 'action',
+    'object': 'object_id',
+    'id': 'object_id',
+    'user': 'user',
+    'after': 'timestamp__gte',
+    'before': 'timestamp__lt',
+}
+
+
+class ParsedQuery:
+    def __init__(self, filters=None, terms=None):
+        self.filters = filters or {}
+        self.terms = terms or []
+
+    def __repr__(self):
+        return f"ParsedQuery(filters={self.filters!r}, terms={self.terms!r})"
+
+
+def _parse_timestamp(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        parsed = datetime.datetime(day.year, day.month, day.day)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def parse_query(query):
+    """
+    Splits a search string into field filters and free-text words.
+
+    ``field:value`` pairs listed in FIELD_FILTERS become filters (quote values with spaces);
+    everything else, including unknown ``field:value`` pairs, is searched as text.
+    """
+    parsed = ParsedQuery()
+    for match in TOKEN_PATTERN.finditer(query or ''):
+        field, value, phrase, word = match.groups()
+        if field is not None:
+            value = value.strip('"')
+            key = field.lower()
+            if key in FIELD_FILTERS and value:
+                if key == 'action':
+                    value = value.upper()
+                elif key in ('after', 'before'):
+                    timestamp = _parse_timestamp(value)
+                    if timestamp is None:
+                        parsed.terms.extend(WORD_PATTERN.findall(match.group(0)))
+                        continue
+                    value = timestamp
+                parsed.filters[key] = value
+                continue
+            text = f"{field} {value}"
+        else:
+            text = phrase if phrase is not None else word
+        parsed.terms.extend(WORD_PATTERN.findall(text))
+    return parsed
+
+
+def install_index(connection=connection):
+    """
+    Creates the search index for ``connection`` if it is missing. Idempotent.
+
+    On SQLite the triggers live on core_auditlog itself, so they are lost whenever a
+    migration rebuilds that table; this puts them back and reindexes the existing rows.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                ALTER TABLE {PARENT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple',
+                    coalesce(details, '') || ' ' || coalesce(object_id, '') || ' ' || model_name
+                )) STORED
+            """)
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON {PARENT_TABLE} USING GIN (search_vector)")
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [PARENT_TABLE])
+            existing = {name for (name,) in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"details, object_id, model_name, content='{PARENT_TABLE}', content_rowid='id')"
+            )
+            for name, body in FTS_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+            if existing.issuperset(FTS_TRIGGERS):
+                return
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_index(connection=connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+            cursor.execute(f"ALTER TABLE {PARENT_TABLE} DROP COLUMN IF EXISTS search_vector")
+        elif connection.vendor == 'sqlite':
+            for name in FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _user_filter(value):
+    if value.isdigit():
+        return Q(user_id=int(value))
+    return Q(user__email__iexact=value)
+
+
+def text_condition(terms):
+    """
+    Condition matching audit rows whose indexed text contains every term (as a prefix).
+    """
+    vendor = connection.vendor
+    table = connection.ops.quote_name(PARENT_TABLE)
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f"{term}:*" for term in terms)
+        return RawSQL(
+            f"{table}.search_vector @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField()
+        )
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return RawSQL(
+            f"{table}.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+            [match], output_field=BooleanField()
+        )
+    condition = Q()
+    for term in terms:
+        condition &= Q(details__icontains=term) | Q(object_id__icontains=term)
+    return condition
+
+
+def search_audit_logs(queryset, query):
+    """
+    Applies a search string to an AuditLog queryset.
+
+    Free-text words also match users by email or first name, so ``search=jane``
+    still finds the entries Jane made.
+    """
+    parsed = parse_query(query)
+    for key, value in parsed.filters.items():
+        if key == 'user':
+            queryset = queryset.filter(_user_filter(value))
+        else:
+            queryset = queryset.filter(**{FIELD_FILTERS[key]: value})
+
+    if parsed.terms:
+        condition = Q(text_condition(parsed.terms))
+        if len(parsed.terms) == 1:
+            term = parsed.terms[0]
+            users = User.objects.filter(Q(email__istartswith=term) | Q(first_name__istartswith=term))
+            condition |= Q(user__in=users.values('pk'))
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+class AuditSearchFilter(filters.BaseFilterBackend):
+    """
+    Indexed replacement for SearchFilter on the audit log endpoint.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_audit_logs(queryset, query)
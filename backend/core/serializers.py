@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Notification, AuditLog
+from .models import Notification, AuditLog, AuditArchiveSegment
 
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -7,6 +7,21 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'message', 'link', 'is_read', 'created_at']
         read_only_fields = ['id', 'title', 'message', 'link', 'created_at']
 
+class NotificationBroadcastSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    message = serializers.CharField()
+    link = serializers.CharField(max_length=255, required=False, allow_null=True, allow_blank=True)
+    user_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    department = serializers.IntegerField(required=False)
+    role = serializers.CharField(max_length=20, required=False)
+    all_users = serializers.BooleanField(default=False)
+    deduplicate = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        if not (data.get('user_ids') or data.get('department') or data.get('role') or data['all_users']):
+            raise serializers.ValidationError("Choose recipients: user_ids, department, role or all_users.")
+        return data
+
 class AuditLogSerializer(serializers.ModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
     user_full_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -15,3 +30,10 @@ class AuditLogSerializer(serializers.ModelSerializer):
         model = AuditLog
         fields = ['id', 'user', 'user_email', 'user_full_name', 'action', 'model_name', 'object_id', 'details', 'ip_address', 'timestamp']
         read_only_fields = fields
+        select_related = ['user']
+
+class AuditArchiveSegmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditArchiveSegment
+        fields = ['id', 'month', 'row_count', 'first_timestamp', 'last_timestamp', 'created_at']
+        read_only_fields = fields
@@ -1,32 +1,109 @@
 import logging
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from .counters import adjust_many
+from .models import Notification
+from .scanning import inspect_upload
+from . import realtime
 
 logger = logging.getLogger(__name__)
 
+User = get_user_model()
+
 class VirusScanner:
     """
-    Service to scan files for viruses.
-    Currently a mock implementation, but structured to support ClamAV integration.
+    Scans uploads for viruses with clamd (see core.scanning).
     """
 
     @staticmethod
     def scan(file_obj):
         """
         Scans a file-like object for viruses.
-        Returns True if safe, False if infected.
-        """
-        # In a real implementation, we would stream the file to ClamAV here.
-        # For now, we mock it.
-        
-        filename = getattr(file_obj, 'name', 'unknown_file')
-        filesize = getattr(file_obj, 'size', 0)
-
-        # Log the "scan"
-        logger.info(f"🛡️ VirusScanner: Scanning {filename} ({filesize} bytes)...")
-        
-        # Mock Check: If filename contains 'eicar', treat as virus for testing.
-        if 'eicar' in filename.lower():
-            logger.warning(f"🚨 VirusScanner: MALWARE DETECTED in {filename}!")
-            return False
-
-        logger.info(f"✅ VirusScanner: {filename} is CLEAN.")
-        return True
+        Returns True if safe, False if infected. Raises ScanError when the scanner fails.
+        """
+        return inspect_upload(file_obj).verdict.clean
+
+class NotificationService:
+    """
+    Creates notifications for one user or fans them out to many.
+    """
+
+    @staticmethod
+    def _recipient_ids(recipients):
+        if hasattr(recipients, 'values_list'):
+            return list(recipients.values_list('pk', flat=True).order_by('pk'))
+        return list(dict.fromkeys(getattr(recipient, 'pk', recipient) for recipient in recipients))
+
+    @staticmethod
+    def recipients_for(user_ids=None, department=None, role=None, all_users=False):
+        """
+        Active users matching any of the given targets.
+        """
+        condition = Q()
+        if all_users:
+            condition = Q(pk__isnull=False)
+        if user_ids:
+            condition |= Q(pk__in=user_ids)
+        if department:
+            condition |= Q(employee_profile__department=department)
+        if role:
+            condition |= Q(role=role)
+        if not condition:
+            return User.objects.none()
+        return User.objects.filter(condition, is_active=True).distinct()
+
+    @classmethod
+    def notify_many(cls, recipients, title, message, link=None, deduplicate=False, chunk_size=None):
+        """
+        Creates one notification per recipient with chunked bulk_create.
+
+        ``recipients`` may be a User queryset or an iterable of users or user ids. With
+        ``deduplicate`` users who already have an identical unread notification are skipped.
+        Unread counters are bumped per chunk and the pushes go out once the transaction
+        commits. Returns ``(created, skipped)``.
+        """
+        chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        user_ids = cls._recipient_ids(recipients)
+        created = skipped = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            with transaction.atomic():
+                if deduplicate:
+                    pending = set(Notification.objects.filter(
+                        recipient_id__in=chunk, is_read=False, title=title, message=message, link=link
+                    ).values_list('recipient_id', flat=True))
+                    skipped += len(pending)
+                    chunk = [user_id for user_id in chunk if user_id not in pending]
+                created += len(cls._bulk_create([
+                    Notification(recipient_id=user_id, title=title, message=message, link=link)
+                    for user_id in chunk
+                ]))
+        logger.info("Fanned out %r to %s users (%s duplicates skipped)", title, created, skipped)
+        return created, skipped
+
+    @classmethod
+    def notify_each(cls, notifications, chunk_size=None):
+        """
+        Creates distinct notifications (unsaved Notification instances) in chunked
+        bulk inserts, with the same counter updates and pushes as ``notify_many``.
+        """
+        chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        notifications = list(notifications)
+        created = []
+        for start in range(0, len(notifications), chunk_size):
+            with transaction.atomic():
+                created.extend(cls._bulk_create(notifications[start:start + chunk_size]))
+        return created
+
+    @staticmethod
+    def _bulk_create(notifications):
+        notifications = Notification.objects.bulk_create(notifications)
+        # bulk_create bypasses the counter and push signals
+        adjust_many([notification.recipient_id for notification in notifications], 'notifications', 1)
+        realtime.push_many(
+            (notification.recipient_id, 'notification', realtime.notification_payload(notification))
+            for notification in notifications
+        )
+        return notifications
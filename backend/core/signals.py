@@ -1,26 +1,64 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, post_migrate
+from django.db import connections
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from .models import AuditLog, Notification
+from .models import Notification
 from tasks.models import Task
+from tasks.services import assignment_notification
 from workflows.models import ApprovalRequest
+from .search import install_index
+from . import realtime
+from .counters import COUNTERS, adjust
 
-# List of models to track (can be expanded)
-TRACKED_MODELS = ['Employee', 'Task', 'Leave', 'ApprovalRequest', 'User']
+# Audit logging is wired per model through core.audit.audit_registry
 
-from .middleware import get_current_user
+# Unread counters follow saves and deletes of notifications and messages.
+# queryset.update/bulk_create bypass these; adjust the counters there or run reconcile_unread_counters.
 
-# ... Audit Log signals ...
+def capture_previous_unread(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._unread_previous_key = COUNTERS[sender].key_from_db(instance.pk) if instance.pk else None
+
+def move_unread(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    spec = COUNTERS[sender]
+    previous = getattr(instance, '_unread_previous_key', None)
+    current = spec.key_from_instance(instance)
+    if previous != current:
+        adjust(previous, spec.field, -1)
+        adjust(current, spec.field, 1)
+    instance._unread_previous_key = None
+
+def capture_deleted_unread(sender, instance, **kwargs):
+    instance._unread_deleted_key = COUNTERS[sender].key_from_db(instance.pk)
+
+def remove_unread(sender, instance, **kwargs):
+    adjust(getattr(instance, '_unread_deleted_key', None), COUNTERS[sender].field, -1)
+
+for model in COUNTERS:
+    pre_save.connect(capture_previous_unread, sender=model, dispatch_uid=f'unread_pre_save_{model.__name__}')
+    post_save.connect(move_unread, sender=model, dispatch_uid=f'unread_post_save_{model.__name__}')
+    pre_delete.connect(capture_deleted_unread, sender=model, dispatch_uid=f'unread_pre_delete_{model.__name__}')
+    post_delete.connect(remove_unread, sender=model, dispatch_uid=f'unread_post_delete_{model.__name__}')
+
+@receiver(post_save, sender=Notification, dispatch_uid='push_notification')
+def push_notification(sender, instance, created, **kwargs):
+    if created:
+        realtime.push(instance.recipient_id, 'notification', realtime.notification_payload(instance))
+    else:
+        realtime.push_unread(instance.recipient_id)
+
+@receiver(post_delete, sender=Notification, dispatch_uid='push_notification_deleted')
+def push_notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        realtime.push_unread(instance.recipient_id)
 
 @receiver(post_save, sender=Task)
 def notify_task_assignment(sender, instance, created, **kwargs):
     if created and instance.assigned_to:
-        Notification.objects.create(
-            recipient=instance.assigned_to.user,
-            title="New Task Assigned",
-            message=f"You have been assigned a new task: {instance.title}",
-            link=f"/tasks/{instance.id}"
-        )
+        assignment_notification(instance).save()
 
 @receiver(post_save, sender=ApprovalRequest)
 def notify_approval_update(sender, instance, created, **kwargs):
@@ -42,41 +80,8 @@ def notify_approval_update(sender, instance, created, **kwargs):
             link=f"/approvals/{instance.id}"
         )
 
-
-@receiver(post_save)
-def log_create_update(sender, instance, created, **kwargs):
-    if sender.__name__ not in TRACKED_MODELS:
-        return
-
-    action = 'CREATE' if created else 'UPDATE'
-    user = get_current_user()
-    
-    # Ensure user is authenticated instance
-    if user and not user.is_authenticated:
-        user = None
-    
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        model_name=sender.__name__,
-        object_id=str(instance.pk),
-        details=f"Saved {sender.__name__} {instance.pk}"
-    )
-
-@receiver(post_delete)
-def log_delete(sender, instance, **kwargs):
-    if sender.__name__ not in TRACKED_MODELS:
-        return
-
-    user = get_current_user()
-     # Ensure user is authenticated instance
-    if user and not user.is_authenticated:
-        user = None
-    
-    AuditLog.objects.create(
-        user=user,
-        action='DELETE',
-        model_name=sender.__name__,
-        object_id=str(instance.pk),
-        details=f"Deleted {sender.__name__} {instance.pk}"
-    )
+@receiver(post_migrate)
+def restore_audit_search_index(sender, using, **kwargs):
+    # A migration that rebuilds core_auditlog on SQLite drops the FTS triggers with it
+    if sender.name == 'core' and connections[using].vendor == 'sqlite':
+        install_index(connections[using])
@@ -0,0 +1,231 @@
+"""
+Content-addressed, deduplicating file storage.
+
+Files saved through ContentAddressedStorage are named after the SHA-256 of their
+content (``blobs/ab/cd/abcd....pdf``), so the same file uploaded many times is
+stored once and saving a duplicate only costs hashing it. Blobs are shared, so
+``delete`` never removes them; instead every tracked FileField keeps a
+reference count on its StoredBlob row (see ``blob_registry``), and
+``collect_garbage`` (the ``gc_blobs`` command) removes blobs nobody references.
+"""
+import datetime
+import hashlib
+import logging
+import os
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'blobs/'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _BlobExists(Exception):
+    pass
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def content_sha256(content):
+    """
+    ``(sha256, size)`` of a Django File, reading the temporary file directly when there is one.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(content, 'temporary_file_path'):
+        with open(content.temporary_file_path(), 'rb') as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+    else:
+        for chunk in content.chunks(HASH_CHUNK_SIZE):
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            digest.update(chunk)
+            size += len(chunk)
+        content.seek(0)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that stores each distinct content once, under its hash.
+    Names saved before it was introduced keep working: they are read and deleted as usual.
+    """
+
+    @staticmethod
+    def blob_name(sha256, name):
+        extension = os.path.splitext(name)[1].lower()[:16]
+        return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+    def get_available_name(self, name, max_length=None):
+        if is_blob(name):
+            # Only reached when another writer created the blob first
+            if self.exists(name):
+                raise _BlobExists(name)
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        sha256, size = content_sha256(content)
+        blob = self.blob_name(sha256, name)
+        # Touching the row keeps the garbage collector off a blob that is about to be referenced again
+        if StoredBlob.objects.filter(name=blob).update(updated_at=timezone.now()) and self.exists(blob):
+            return blob
+        if not self.exists(blob):
+            try:
+                blob = super()._save(blob, content)
+            except _BlobExists:
+                pass
+        StoredBlob.objects.get_or_create(name=blob, defaults={'sha256': sha256, 'size': size})
+        return blob
+
+    def delete(self, name):
+        if is_blob(name):
+            return
+        super().delete(name)
+
+
+def get_blob_storage():
+    return blob_storage
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def adjust(name, delta):
+    from .models import StoredBlob
+
+    if not is_blob(name) or not delta:
+        return
+    StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + delta, updated_at=timezone.now())
+
+
+class BlobRegistry:
+    """
+    FileFields stored in blob storage whose references are counted.
+
+    Usage::
+
+        @blob_registry.register('file')
+        class Document(models.Model):
+            file = models.FileField(storage=get_blob_storage, ...)
+
+    Saves and deletes move one reference from the old blob to the new one;
+    queryset.update/bulk_create bypass this, so run ``gc_blobs --reconcile`` after them.
+    """
+
+    def __init__(self):
+        self.fields = {}
+
+    def register(self, *field_names):
+        def decorator(model):
+            self.fields[model] = list(field_names)
+            uid = f'blobs_{model._meta.label_lower}'
+            pre_save.connect(self._capture, sender=model, weak=False, dispatch_uid=f'{uid}_pre_save')
+            post_save.connect(self._count_save, sender=model, weak=False, dispatch_uid=f'{uid}_post_save')
+            pre_delete.connect(self._capture, sender=model, weak=False, dispatch_uid=f'{uid}_pre_delete')
+            post_delete.connect(self._count_delete, sender=model, weak=False, dispatch_uid=f'{uid}_post_delete')
+            return model
+        return decorator
+
+    def _capture(self, sender, instance, raw=False, **kwargs):
+        # Read from the database: FieldFile.delete() clears the name on the instance
+        if raw:
+            return
+        fields = self.fields[sender]
+        previous = sender.objects.filter(pk=instance.pk).values(*fields).first() if instance.pk else None
+        instance._blob_previous = previous or {}
+
+    def _count_save(self, sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        previous = getattr(instance, '_blob_previous', {})
+        for field in self.fields[sender]:
+            old, new = previous.get(field) or '', getattr(instance, field).name or ''
+            if old != new:
+                adjust(old, -1)
+                adjust(new, 1)
+        instance._blob_previous = {}
+
+    def _count_delete(self, sender, instance, **kwargs):
+        previous = getattr(instance, '_blob_previous', {})
+        for field in self.fields[sender]:
+            adjust(previous.get(field), -1)
+
+    def referenced(self):
+        """
+        ``{blob name: references}`` counted from the tracked fields.
+        """
+        counts = {}
+        for model, fields in self.fields.items():
+            for field in fields:
+                names = model._default_manager.filter(**{f'{field}__startswith': BLOB_PREFIX}).values_list(field, flat=True)
+                for name in names.iterator():
+                    counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+blob_registry = BlobRegistry()
+
+
+def reconcile():
+    """
+    Recomputes every blob's reference count from the tracked fields. Returns the rows repaired.
+    """
+    from .models import StoredBlob
+
+    counts = blob_registry.referenced()
+    repaired = 0
+    for blob in StoredBlob.objects.iterator():
+        actual = counts.get(blob.name, 0)
+        if blob.ref_count != actual:
+            StoredBlob.objects.filter(name=blob.name).update(ref_count=actual, updated_at=timezone.now())
+            repaired += 1
+    return repaired
+
+
+def collect_garbage(grace_hours=None, dry_run=False, now=None):
+    """
+    Deletes blobs unreferenced for ``grace_hours`` (BLOB_GC_GRACE_HOURS), and blob files
+    with no StoredBlob row (left by rolled-back saves) older than that.
+    Returns ``(blobs_deleted, bytes_freed)``.
+    """
+    from .models import StoredBlob
+
+    grace_hours = settings.BLOB_GC_GRACE_HOURS if grace_hours is None else grace_hours
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(hours=grace_hours)
+    deleted = freed = 0
+
+    for blob in StoredBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).iterator():
+        if not dry_run:
+            # Only if still unreferenced and untouched, so a save racing the collector keeps its blob
+            if not StoredBlob.objects.filter(name=blob.name, ref_count__lte=0, updated_at__lt=cutoff).delete()[0]:
+                continue
+            FileSystemStorage.delete(blob_storage, blob.name)
+        deleted += 1
+        freed += blob.size
+
+    root = blob_storage.path(BLOB_PREFIX)
+    known = set(StoredBlob.objects.values_list('name', flat=True))
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, blob_storage.location).replace(os.sep, '/')
+            if name in known or os.path.getmtime(path) >= cutoff.timestamp():
+                continue
+            freed += os.path.getsize(path)
+            deleted += 1
+            if not dry_run:
+                os.remove(path)
+    logger.info("Collected %s blobs (%s bytes)", deleted, freed)
+    return deleted, freed
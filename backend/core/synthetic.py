@@ -0,0 +1,160 @@
+"""
+Synthetic organisation data for benchmarks and load tests.
+
+Rows are inserted with bulk_create in batches, streamed from generators, and every
+user shares one precomputed password hash, so millions of rows take minutes
+rather than hours. Output is deterministic for a seed: the same seed produces the
+same people, history and identifiers (relative to today's date), and a seed can
+only be generated once per database.
+
+bulk_create bypasses model signals, so the dashboard rollups are rebuilt at the
+end. Unread counters need no work: the synthetic users have no counter rows yet,
+and core.counters creates them from the source tables on first read.
+"""
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from analytics.rollups import rebuild_rollups
+from attendance.models import Attendance
+from core.models import AuditLog
+from employees.models import Department, Employee
+from finance.models import Payslip
+from leaves.models import Leave
+from messaging.models import Message
+from tasks.models import Task
+
+User = get_user_model()
+
+DEPARTMENTS = ['Engineering', 'Human Resources', 'Finance', 'Operations', 'Sales', 'Marketing', 'Support']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Patel', 'Kowalski', 'Silva', 'Tanaka', 'Haddad']
+AUDITED_MODELS = ['Task', 'Employee', 'Leave', 'ApprovalRequest', 'User']
+AUDITED_FIELDS = ['designation', 'status', 'priority', 'title', 'due_date', 'salary', 'phone_number']
+PASSWORD = 'password123'
+
+
+def _username(seed, i):
+    return f"synthetic-{seed}-{i}"
+
+
+def populate_org(employees=100, departments=len(DEPARTMENTS), attendance_days=30, tasks_per_employee=3,
+                 leaves_per_employee=1, payslip_months=3, messages_per_employee=2, audit_entries_per_employee=5,
+                 seed=42, batch_size=5000, password=PASSWORD, progress=None):
+    """
+    Adds an organisation of ``employees`` people with their history. Returns ``{model name: rows added}``.
+
+    ``progress(model name, rows, seconds)`` is called as each table is finished.
+    Raises ValueError when ``seed`` was already generated in this database.
+    """
+    employee_id = f"SYN{seed}-{max(employees - 1, 0)}"
+    if len(employee_id) > Employee._meta.get_field('employee_id').max_length:
+        raise ValueError(f"Employee ids like {employee_id!r} are too long; use a smaller seed or organisation")
+    if User.objects.filter(username=_username(seed, 0)).exists():
+        raise ValueError(f"Seed {seed} was already generated; pick another seed")
+
+    rng = random.Random(seed)
+    today = timezone.now().date()
+    now = timezone.now()
+    password = make_password(password)
+    roles = [choice for choice, _ in User.Roles.choices]
+    counts = {}
+
+    def insert(model, rows):
+        start, batch, total = time.perf_counter(), [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                total += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            total += len(batch)
+        counts[model.__name__] = total
+        if progress:
+            progress(model.__name__, total, time.perf_counter() - start)
+
+    with transaction.atomic():
+        names = DEPARTMENTS[:departments] + [f"Department {n}" for n in range(len(DEPARTMENTS) + 1, departments + 1)]
+        teams = [Department.objects.get_or_create(name=name)[0] for name in names]
+
+        # Kept in memory to link the history rows; bulk_create sets their primary keys
+        users = [
+            User(
+                username=_username(seed, i),
+                email=f"{_username(seed, i)}@example.com",
+                first_name=f"Person{i}",
+                last_name=rng.choice(LAST_NAMES),
+                password=password,
+                role=rng.choice(roles),
+                two_factor_auth_type=User.TwoFactorType.NONE,
+            )
+            for i in range(employees)
+        ]
+        insert(User, users)
+        people = [
+            Employee(
+                user=user,
+                department=rng.choice(teams),
+                designation='Staff',
+                joining_date=today - timedelta(days=rng.randint(30, 3000)),
+                employee_id=f"SYN{seed}-{i}",
+            )
+            for i, user in enumerate(users)
+        ]
+        insert(Employee, people)
+
+        attendance_statuses = [choice for choice, _ in Attendance.Status.choices]
+        insert(Attendance, (
+            Attendance(employee=person, date=today - timedelta(days=offset), status=rng.choice(attendance_statuses))
+            for person in people for offset in range(attendance_days)
+        ))
+        task_statuses = [choice for choice, _ in Task.Status.choices]
+        priorities = [choice for choice, _ in Task.Priority.choices]
+        insert(Task, (
+            Task(
+                assigned_to=person, assigned_by=rng.choice(users), title=f"Task {n} for {person.employee_id}",
+                description='Synthetic task', due_date=now + timedelta(days=rng.randint(-30, 60)),
+                status=rng.choice(task_statuses), priority=rng.choice(priorities),
+            )
+            for person in people for n in range(tasks_per_employee)
+        ))
+        leave_types = [choice for choice, _ in Leave.LeaveType.choices]
+        leave_statuses = [choice for choice, _ in Leave.Status.choices]
+        insert(Leave, (
+            Leave(
+                employee=person, leave_type=rng.choice(leave_types), start_date=start, end_date=start + timedelta(days=rng.randint(0, 5)),
+                reason='Synthetic leave', status=rng.choice(leave_statuses),
+            )
+            for person in people for start in (today + timedelta(days=rng.randint(-200, 60)) for _ in range(leaves_per_employee))
+        ))
+        months = [today.replace(day=1)]
+        while len(months) < payslip_months:
+            months.append((months[-1] - timedelta(days=1)).replace(day=1))
+        insert(Payslip, (
+            Payslip(
+                employee=person, month=month, year=month.year, total_earnings=5000, total_deductions=500, net_pay=4500,
+                status=Payslip.Status.PUBLISHED,
+            )
+            for person in people for month in months[:payslip_months]
+        ))
+        insert(Message, (
+            Message(sender=rng.choice(users), recipient=user, subject='Synthetic message', body='Hello', is_read=rng.random() < 0.5)
+            for user in users for _ in range(messages_per_employee)
+        ))
+        span = timedelta(days=max(attendance_days, 30)).total_seconds()
+        insert(AuditLog, (
+            AuditLog(
+                user=user, action=rng.choice(['CREATE', 'UPDATE', 'DELETE']), model_name=model_name,
+                object_id=str(rng.randint(1, max(len(people), 1))),
+                details=f"Saved {model_name}; changed {rng.choice(AUDITED_FIELDS)}",
+                timestamp=now - timedelta(seconds=rng.random() * span),
+            )
+            for user in users for model_name in (rng.choice(AUDITED_MODELS) for _ in range(audit_entries_per_employee))
+        ))
+
+        rebuild_rollups()
+    return counts
@@ -1,3 +1,944 @@
-from django.test import TestCase
+import io
+import gzip
+import threading
+import datetime
+import tempfile
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase, TransactionTestCase
+from django.db import transaction
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.models import AuditLog, AuditArchiveSegment, Notification, UnreadCounter
+from core.counters import get_counts, reconcile
+from core.services import NotificationService
+from core.models import OutboxEmail
+from core.outbox import drain, enqueue_email
+from django.core import mail
+from unittest import mock, skipUnless
+from core import partitions
+from core.archive import archive_older_than, read_segment
+from core.audit import AuditLogWriter, audit_batch, audit_registry
+from core.search import parse_query, search_audit_logs
+from config.asgi import application
+from messaging.models import Message
+from rest_framework_simplejwt.tokens import AccessToken
+from employees.models import Employee, Department
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from core.checks import check_virus_scanning
+from core.fake_clamd import EICAR, FakeClamd
+from core.models import ScanVerdict, StoredBlob
+from core.storage import blob_storage, collect_garbage, reconcile as reconcile_blobs
+from messaging.models import MessageAttachment
+from documents.models import Document
+import os
+import shutil
+from core.validators import validate_file_type
+from core.prefetch import relations_for
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from attendance.models import Attendance
+from finance.models import Payslip
+from finance.serializers import PayslipSerializer
+from tasks.models import Task
+from core import endpoint_benchmark
+from core.synthetic import populate_org
+from django.core.management import CommandError, call_command
 
-# Create your tests here.
+User = get_user_model()
+
+class AuditLogWriterTest(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Engineering')
+        self.user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+        )
+        AuditLog.objects.all().delete()
+
+    def create_employee(self):
+        return Employee.objects.create(
+            user=self.user,
+            department=self.department,
+            designation='Dev',
+            joining_date=timezone.now().date()
+        )
+
+    def test_entries_are_written_in_one_batch(self):
+        with audit_batch():
+            with self.captureOnCommitCallbacks(execute=True):
+                employee = self.create_employee()
+                employee.designation = 'Senior Dev'
+                employee.save()
+                self.assertEqual(AuditLogWriter.pending(), 0) # Not committed yet
+            self.assertEqual(AuditLogWriter.pending(), 2)
+            self.assertFalse(AuditLog.objects.exists())
+
+        self.assertEqual(
+            list(AuditLog.objects.filter(model_name='Employee').order_by('timestamp').values_list('action', flat=True)),
+            ['CREATE', 'UPDATE']
+        )
+        self.assertEqual(AuditLogWriter.pending(), 0)
+
+    def test_rolled_back_savepoint_leaves_no_entries(self):
+        with audit_batch():
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        self.create_employee()
+                        raise RuntimeError("rollback")
+                except RuntimeError:
+                    pass
+                self.department.save()
+
+        self.assertFalse(AuditLog.objects.filter(model_name='Employee').exists())
+
+    def test_full_buffer_forces_flush(self):
+        with self.settings(AUDIT_LOG_BATCH_SIZE=2):
+            with audit_batch():
+                with self.captureOnCommitCallbacks(execute=True):
+                    employee = self.create_employee()
+                    employee.designation = 'Senior Dev'
+                    employee.save()
+                    employee.designation = 'Staff Dev'
+                    employee.save()
+                self.assertEqual(AuditLogWriter.pending(), 1)
+
+            self.assertEqual(AuditLog.objects.filter(model_name='Employee').count(), 3)
+
+    def test_rejected_entry_is_dropped_without_blocking_the_rest(self):
+        bulk_create = AuditLog.objects.bulk_create
+
+        def reject_poison(entries, **kwargs):
+            if any(entry.details == 'poison' for entry in entries):
+                raise ValueError('rejected')
+            return bulk_create(entries, **kwargs)
+
+        with mock.patch.object(AuditLog.objects, 'bulk_create', side_effect=reject_poison):
+            with self.assertLogs('core.audit', 'ERROR'), audit_batch():
+                with self.captureOnCommitCallbacks(execute=True):
+                    AuditLogWriter.record(action='UPDATE', model_name='Employee', details='good')
+                    AuditLogWriter.record(action='UPDATE', model_name='Employee', details='poison')
+                    AuditLogWriter.record(action='UPDATE', model_name='Employee', details='also good')
+
+        self.assertEqual(AuditLogWriter.pending(), 0)
+        self.assertEqual(sorted(AuditLog.objects.values_list('details', flat=True)), ['also good', 'good'])
+
+
+class AuditRegistryTest(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Engineering')
+        self.user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+        )
+        self.employee = Employee.objects.create(
+            user=self.user,
+            department=self.department,
+            designation='Dev',
+            joining_date=timezone.now().date(),
+            salary=1000
+        )
+
+    def test_only_registered_models_are_audited(self):
+        self.assertTrue(audit_registry.is_registered(Employee))
+        self.assertFalse(audit_registry.is_registered(Department))
+        self.assertFalse(audit_registry.is_registered(AuditLog))
+
+    def test_update_records_changed_fields_and_unchanged_saves(self):
+        employee = Employee.objects.get(pk=self.employee.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.designation = 'Lead'
+            employee.salary = 2000
+            employee.save()
+            employee.save() # No changes, still logged
+
+        logs = AuditLog.objects.filter(model_name='Employee', action='UPDATE').order_by('id')
+        self.assertEqual(logs.count(), 2)
+        self.assertIn("designation: 'Dev' -> 'Lead'", logs[0].details)
+        self.assertIn("salary: [changed]", logs[0].details)
+        self.assertNotIn("2000", logs[0].details)
+        self.assertEqual(logs[1].details, f"Saved Employee {employee.pk}")
+
+    def test_suspended_model_is_not_audited(self):
+        with audit_registry.suspended(Employee):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.employee.designation = 'Lead'
+                self.employee.save()
+
+        self.assertTrue(audit_registry.is_registered(Employee))
+        self.assertFalse(AuditLog.objects.filter(model_name='Employee', action='UPDATE').exists())
+
+    def test_suspension_does_not_reach_other_threads(self):
+        other = Employee.objects.create(
+            user=User.objects.create_user(username='other', email='other@test.com', password=None),
+            department=self.department, designation='Dev', joining_date=timezone.now().date(),
+        )
+        entered, saved = threading.Event(), threading.Event()
+        recorded = []
+
+        def save_elsewhere():
+            entered.wait()
+            with mock.patch.object(AuditLogWriter, 'record', side_effect=lambda **fields: recorded.append(fields)):
+                other.designation = 'Lead'
+                audit_registry._log_save(Employee, other, created=False)
+            saved.set()
+
+        thread = threading.Thread(target=save_elsewhere)
+        thread.start()
+        with audit_registry.suspended(Employee):
+            entered.set()
+            saved.wait(5)
+        thread.join()
+
+        self.assertEqual([fields['object_id'] for fields in recorded], [str(other.pk)])
+
+
+class AuditArchiveTest(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='password123',
+            is_staff=True
+        )
+        old = datetime.datetime(2024, 3, 15, 12, 0, tzinfo=datetime.timezone.utc)
+        AuditLog.objects.create(user=self.admin, action='CREATE', model_name='Task', object_id='1', details='Saved Task 1', timestamp=old)
+        AuditLog.objects.create(user=self.admin, action='DELETE', model_name='Task', object_id='1', details='Deleted Task 1', timestamp=old + datetime.timedelta(days=1))
+        AuditLog.objects.create(action='UPDATE', model_name='Leave', object_id='7', details='Saved Leave 7', timestamp=old + datetime.timedelta(days=60))
+        self.recent = AuditLog.objects.create(action='CREATE', model_name='Task', object_id='2', details='Saved Task 2')
+
+    def test_old_months_move_to_segments(self):
+        with self.settings(AUDIT_ARCHIVE_DIR=self.archive_dir.name):
+            segments = archive_older_than(12, today=datetime.date(2025, 10, 1))
+
+            self.assertEqual([segment.month for segment in segments], [datetime.date(2024, 3, 1), datetime.date(2024, 5, 1)])
+            self.assertFalse(AuditLog.objects.filter(timestamp__year=2024).exists())
+            self.assertTrue(AuditLog.objects.filter(id=self.recent.id).exists())
+            entries = list(read_segment(segments[0]))
+
+        self.assertEqual([entry['action'] for entry in entries], ['DELETE', 'CREATE'])
+        self.assertEqual(entries[0]['user_email'], 'admin@test.com')
+        self.assertEqual(segments[0].row_count, 2)
+        self.assertEqual(segments[0].first_timestamp, datetime.datetime(2024, 3, 15, 12, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(segments[0].last_timestamp, datetime.datetime(2024, 3, 16, 12, 0, tzinfo=datetime.timezone.utc))
+
+    def test_segments_are_queryable_through_api(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        with self.settings(AUDIT_ARCHIVE_DIR=self.archive_dir.name):
+            archive_older_than(12, today=datetime.date(2025, 10, 1))
+            segment = AuditArchiveSegment.objects.get(month=datetime.date(2024, 3, 1))
+
+            response = client.get(f'/api/audit/segments/{segment.id}/logs/', {'action': 'DELETE'})
+            first_page = client.get(f'/api/audit/segments/{segment.id}/logs/', {'page_size': 1})
+            second_page = client.get(first_page.data['next'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['details'] for entry in response.data['results']], ['Deleted Task 1'])
+        self.assertEqual([entry['details'] for entry in first_page.data['results']], ['Deleted Task 1'])
+        self.assertIsNone(first_page.data['previous'])
+        self.assertEqual([entry['details'] for entry in second_page.data['results']], ['Saved Task 1'])
+        self.assertIsNone(second_page.data['next'])
+
+    def test_a_page_stops_reading_the_segment(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        with self.settings(AUDIT_ARCHIVE_DIR=self.archive_dir.name):
+            archive_older_than(12, today=datetime.date(2025, 10, 1))
+            segment = AuditArchiveSegment.objects.get(month=datetime.date(2024, 3, 1))
+            read = []
+
+            def counting(segment):
+                for entry in read_segment(segment):
+                    read.append(entry)
+                    yield entry
+
+            with mock.patch('core.archive.read_segment', counting):
+                response = client.get(f'/api/audit/segments/{segment.id}/logs/', {'page_size': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(read), 2)  # The page plus one entry to tell whether there is a next page
+
+    def test_segments_written_oldest_first_are_still_read_newest_first(self):
+        with self.settings(AUDIT_ARCHIVE_DIR=self.archive_dir.name):
+            segment = archive_older_than(12, today=datetime.date(2025, 10, 1))[0]
+            path = os.path.join(self.archive_dir.name, segment.file)
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                lines = f.readlines()
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                f.writelines(reversed(lines))
+            segment.newest_first = False
+
+            self.assertEqual([entry['action'] for entry in read_segment(segment)], ['DELETE', 'CREATE'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Native partitioning needs PostgreSQL')
+class AuditPartitionTest(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_dir.cleanup)
+
+    def table_of(self, entry):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text FROM core_auditlog WHERE id = %s', [entry.pk])
+            return cursor.fetchone()[0]
+
+    def test_rows_move_from_the_default_partition_into_their_month(self):
+        self.assertTrue(partitions.is_partitioned())
+        entry = AuditLog.objects.create(
+            action='CREATE', model_name='Task', object_id='1', details='Saved Task 1',
+            timestamp=datetime.datetime(2024, 3, 15, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(self.table_of(entry), partitions.DEFAULT_PARTITION)
+
+        created = partitions.ensure_partitions(months_ahead=1, start=datetime.date(2024, 3, 1))
+
+        self.assertEqual(created[0], 'core_auditlog_p202403')
+        self.assertIn('core_auditlog_p202403', partitions.attached_partitions())
+        self.assertEqual(self.table_of(entry), 'core_auditlog_p202403')
+        self.assertEqual(partitions.ensure_partitions(months_ahead=1, start=datetime.date(2024, 3, 1)), [])
+        self.assertEqual(AuditLog.objects.get(pk=entry.pk).details, 'Saved Task 1')
+
+    def test_archiving_detaches_and_drops_the_month(self):
+        partitioned = AuditLog.objects.create(
+            action='CREATE', model_name='Task', object_id='1', details='In a partition',
+            timestamp=datetime.datetime(2024, 3, 15, tzinfo=datetime.timezone.utc),
+        )
+        partitions.ensure_partitions(months_ahead=0, start=datetime.date(2024, 3, 1))
+        late = AuditLog.objects.create(
+            action='UPDATE', model_name='Task', object_id='1', details='Default partition',
+            timestamp=datetime.datetime(2023, 1, 10, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(self.table_of(late), partitions.DEFAULT_PARTITION)
+
+        with self.settings(AUDIT_ARCHIVE_DIR=self.archive_dir.name):
+            segments = archive_older_than(12, today=datetime.date(2025, 10, 1))
+            details = {segment.month: [entry['details'] for entry in read_segment(segment)] for segment in segments}
+
+        self.assertEqual(details[datetime.date(2024, 3, 1)], ['In a partition'])
+        self.assertEqual(details[datetime.date(2023, 1, 1)], ['Default partition'])
+        self.assertFalse(AuditLog.objects.filter(pk__in=[partitioned.pk, late.pk]).exists())
+        self.assertNotIn('core_auditlog_p202403', partitions.attached_partitions())
+        self.assertEqual(partitions.detached_partitions(), [])
+
+
+class AuditSearchTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@test.com',
+            password='password123',
+            first_name='Grace',
+            is_staff=True
+        )
+        AuditLog.objects.all().delete()
+        self.deleted = AuditLog.objects.create(user=self.admin, action='DELETE', model_name='Task', object_id='4', details='Deleted Task 4 sprint review')
+        self.saved = AuditLog.objects.create(action='UPDATE', model_name='Task', object_id='5', details="Saved Task 5; changed title: 'Sprint planning' -> 'Release'")
+        self.leave = AuditLog.objects.create(action='DELETE', model_name='Leave', object_id='9', details='Deleted Leave 9')
+
+    def search(self, query):
+        return set(search_audit_logs(AuditLog.objects.all(), query).values_list('id', flat=True))
+
+    def test_parse_query_splits_filters_and_text(self):
+        parsed = parse_query('model:Task action:delete "sprint review" colour:red')
+
+        self.assertEqual(parsed.filters, {'model': 'Task', 'action': 'DELETE'})
+        self.assertEqual(parsed.terms, ['sprint', 'review', 'colour', 'red'])
+
+    def test_field_filters_and_prefix_terms(self):
+        self.assertEqual(self.search('model:Task action:DELETE'), {self.deleted.id})
+        self.assertEqual(self.search('sprin'), {self.deleted.id, self.saved.id})
+        self.assertEqual(self.search('model:task releas'), {self.saved.id})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.leave.details = 'Deleted Leave 9 sprint'
+        self.leave.save()
+        self.saved.delete()
+
+        self.assertEqual(self.search('sprint'), {self.deleted.id, self.leave.id})
+
+    def test_text_matches_user_name_through_api(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+
+        response = client.get('/api/audit/logs/', {'search': 'grace'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['id'] for entry in response.data['results']], [self.deleted.id])
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        created_at = timezone.now()
+        for i in range(25):
+            Notification.objects.create(recipient=self.user, title=f'Notice {i}', message='Hello')
+        # Several rows share a created_at so the id tie-breaker is exercised
+        Notification.objects.filter(recipient=self.user).update(created_at=created_at)
+
+    def titles(self, response):
+        return [notification['title'] for notification in response.data['results']]
+
+    def test_pages_cover_every_row_once(self):
+        seen = []
+        url = '/api/notifications/'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(self.titles(response))
+            url = response.data['next']
+
+        self.assertEqual(seen, [f'Notice {i}' for i in reversed(range(25))])
+
+    def test_previous_link_returns_to_earlier_page(self):
+        first = self.client.get('/api/notifications/')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(self.titles(back), self.titles(first))
+
+    def test_deep_page_runs_no_count_query(self):
+        first = self.client.get('/api/notifications/')
+        with self.assertNumQueries(1) as queries:
+            self.client.get(first.data['next'])
+        self.assertNotIn('COUNT', queries.captured_queries[0]['sql'].upper())
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/notifications/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class UnreadCounterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+        )
+        self.sender = User.objects.create_user(
+            username='boss',
+            email='boss@test.com',
+            password='password123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def notify(self, title='Hi'):
+        return Notification.objects.create(recipient=self.user, title=title, message='Hello')
+
+    def test_counters_follow_create_read_and_delete(self):
+        first, second = self.notify(), self.notify()
+        message = Message.objects.create(sender=self.sender, recipient=self.user, subject='Report', body='Due')
+        self.assertEqual(get_counts(self.user.pk), {'notifications': 2, 'messages': 1})
+
+        first.is_read = True
+        first.save()
+        second.delete()
+        message.is_archived = True
+        message.save()
+
+        self.assertEqual(get_counts(self.user.pk), {'notifications': 0, 'messages': 0})
+
+    def test_mark_all_read_and_badge_endpoints(self):
+        self.notify()
+        self.notify()
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/notifications/unread_count/')
+        self.assertEqual(response.data['count'], 2)
+
+        self.client.post('/api/notifications/mark_all_read/')
+        self.assertEqual(self.client.get('/api/notifications/unread_count/').data['count'], 0)
+
+    def test_reconcile_repairs_drift(self):
+        self.notify()
+        Notification.objects.bulk_create([
+            Notification(recipient=self.user, title='Bulk', message='Hello') for _ in range(3)
+        ])
+        UnreadCounter.objects.filter(user=self.user).update(messages=5)
+
+        self.assertEqual(reconcile(), 1)
+        self.assertEqual(get_counts(self.user.pk), {'notifications': 4, 'messages': 0})
+        self.assertEqual(reconcile(), 0)
+
+    def test_reconcile_command_repeats_every_interval(self):
+        self.notify()
+        UnreadCounter.objects.filter(user=self.user).update(messages=5)
+        out = io.StringIO()
+
+        # The second sleep stops the otherwise endless worker loop; the test's connection must stay open
+        with mock.patch('time.sleep', side_effect=[None, KeyboardInterrupt]) as sleep, \
+                mock.patch('core.management.commands.reconcile_unread_counters.close_old_connections'), \
+                self.assertRaises(KeyboardInterrupt):
+            call_command('reconcile_unread_counters', interval=60, stdout=out)
+
+        self.assertEqual(sleep.call_args_list, [mock.call(60), mock.call(60)])
+        self.assertEqual([line.split(' in ')[0] for line in out.getvalue().splitlines()], [
+            'Repaired 1 unread counter(s)', 'Repaired 0 unread counter(s)'
+        ])
+        self.assertEqual(get_counts(self.user.pk)['messages'], 0)
+
+
+class NotificationFanOutTest(TestCase):
+    def setUp(self):
+        self.department = Department.objects.create(name='Engineering')
+        self.users = [
+            User.objects.create_user(username=f'emp{i}', email=f'emp{i}@test.com', password='password123')
+            for i in range(5)
+        ]
+        for user in self.users[:3]:
+            Employee.objects.create(user=user, department=self.department, designation='Dev', joining_date=timezone.now().date())
+        self.hr = User.objects.create_user(username='hr', email='hr@test.com', password='password123', role='HR_MANAGER')
+
+    def test_notify_many_chunks_and_deduplicates(self):
+        NotificationService.notify_many(self.users[:2], 'Outage', 'Servers down')
+
+        created, skipped = NotificationService.notify_many(
+            [user.pk for user in self.users], 'Outage', 'Servers down', deduplicate=True, chunk_size=2
+        )
+
+        self.assertEqual((created, skipped), (3, 2))
+        self.assertEqual(Notification.objects.filter(title='Outage').count(), 5)
+        self.assertEqual(get_counts(self.users[0].pk)['notifications'], 1)
+        self.assertEqual(get_counts(self.users[4].pk)['notifications'], 1)
+
+    def test_broadcast_to_department(self):
+        client = APIClient()
+        client.force_authenticate(user=self.hr)
+
+        response = client.post('/api/notifications/broadcast/', {
+            'title': 'Standup', 'message': 'Moved to 10:00', 'department': self.department.id
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 3, 'skipped': 0})
+        self.assertEqual(
+            set(Notification.objects.filter(title='Standup').values_list('recipient_id', flat=True)),
+            {user.pk for user in self.users[:3]}
+        )
+
+    def test_broadcast_requires_admin_or_hr(self):
+        client = APIClient()
+        client.force_authenticate(user=self.users[0])
+
+        response = client.post('/api/notifications/broadcast/', {'title': 'x', 'message': 'y', 'all_users': True}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class EmailOutboxTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+        )
+
+    def test_message_email_is_queued_then_sent_in_batches(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.post('/api/messages/', {'recipient_email': 'ext@example.com', 'subject': 'Hi', 'body': 'Hello'})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        for i in range(4):
+            enqueue_email(f'Report {i}', 'Body', 'boss@example.com')
+
+        self.assertEqual(drain(batch_size=2), (5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].to, ['ext@example.com'])
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.Status.SENT).exists())
+
+    def test_failures_back_off_then_give_up(self):
+        email = enqueue_email('Hi', 'Body', 'ext@example.com')
+        with self.settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2), \
+                mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('connection refused')):
+            self.assertEqual(drain(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.Status.PENDING, 1))
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertEqual(drain(), (0, 0)) # Not due yet
+
+            OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            drain()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.FAILED)
+        self.assertIn('connection refused', email.last_error)
+
+
+class VirusScanTest(TestCase):
+    PDF = b'%PDF-1.4\n' + b'0' * 5000
+
+    def setUp(self):
+        self.clamd = FakeClamd().start()
+        self.addCleanup(self.clamd.stop)
+        settings = override_settings(CLAMD_ADDRESS=self.clamd.address, CLAMD_CHUNK_SIZE=1024)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_streams_in_chunks_and_caches_verdicts_by_content(self):
+        validate_file_type(SimpleUploadedFile('report.pdf', self.PDF))
+        self.assertEqual((self.clamd.scans, self.clamd.chunks), (1, 5))
+
+        # The same content under another name is not sent to the daemon again
+        validate_file_type(SimpleUploadedFile('copy-of-report.pdf', self.PDF))
+        self.assertEqual(self.clamd.scans, 1)
+        self.assertTrue(ScanVerdict.objects.get().clean)
+
+    def test_infected_files_are_rejected(self):
+        infected = self.PDF[:1500] + EICAR + self.PDF[1500:]
+        with self.assertRaisesMessage(ValidationError, 'virus'):
+            validate_file_type(SimpleUploadedFile('report.pdf', infected))
+        self.assertEqual(ScanVerdict.objects.get().signature, 'Eicar-Test-Signature')
+
+        with self.assertRaisesMessage(ValidationError, 'virus'):
+            validate_file_type(SimpleUploadedFile('renamed.pdf', infected))
+        self.assertEqual(self.clamd.scans, 1)
+
+    def test_unreachable_scanner_rejects_the_upload(self):
+        address = self.clamd.address
+        self.clamd.stop()
+        with self.settings(CLAMD_ADDRESS=address), self.assertRaisesMessage(ValidationError, 'could not be scanned'):
+            validate_file_type(SimpleUploadedFile('report.pdf', self.PDF))
+        self.assertFalse(ScanVerdict.objects.exists())
+
+    def test_deploy_check_requires_a_scanner_outside_debug(self):
+        with self.settings(CLAMD_ADDRESS='', DEBUG=False):
+            self.assertEqual([error.id for error in check_virus_scanning(None)], ['core.E001'])
+        with self.settings(CLAMD_ADDRESS='', DEBUG=True):
+            self.assertEqual(check_virus_scanning(None), [])
+        self.assertEqual(check_virus_scanning(None), [])
+
+
+class BlobStorageTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        sender = User.objects.create_user(username='sender', email='sender@test.com', password='password123')
+        self.messages = [
+            Message.objects.create(sender=sender, recipient=sender, subject=f'Policy {i}', body='See attached')
+            for i in range(3)
+        ]
+
+    def attach(self, message, content, name='policy.pdf'):
+        return MessageAttachment.objects.create(message=message, file=SimpleUploadedFile(name, content))
+
+    def blob_files(self):
+        return [name for _, _, names in os.walk(os.path.join(self.media, 'blobs')) for name in names]
+
+    def test_identical_uploads_share_one_blob(self):
+        attachments = [self.attach(message, b'%PDF-1.4 handbook', name=f'copy-{i}.pdf') for i, message in enumerate(self.messages)]
+
+        self.assertEqual(len({attachment.file.name for attachment in attachments}), 1)
+        self.assertEqual(len(self.blob_files()), 1)
+        blob = StoredBlob.objects.get()
+        self.assertEqual((blob.ref_count, blob.size), (3, 17))
+        with attachments[0].file.open('rb') as stored:
+            self.assertEqual(stored.read(), b'%PDF-1.4 handbook')
+
+        # Replacing one attachment's file moves its reference
+        attachments[0].file = SimpleUploadedFile('other.pdf', b'%PDF-1.4 other')
+        attachments[0].save()
+        self.assertEqual(dict(StoredBlob.objects.values_list('sha256', 'ref_count')), {
+            blob.sha256: 2, attachments[0].file.name.rsplit('/', 1)[1][:64]: 1,
+        })
+
+    def test_unreferenced_blobs_are_collected_after_the_grace_period(self):
+        kept = self.attach(self.messages[0], b'kept')
+        dropped = [self.attach(message, b'dropped') for message in self.messages[1:]]
+        for attachment in dropped:
+            attachment.file.delete(save=False)  # shared blobs are left to the collector
+            attachment.delete()
+        self.assertEqual(len(self.blob_files()), 2)
+
+        self.assertEqual(collect_garbage(grace_hours=1), (0, 0))
+        self.assertEqual(collect_garbage(grace_hours=0), (1, len(b'dropped')))
+        self.assertEqual(self.blob_files(), [os.path.basename(kept.file.name)])
+
+        # Counts drifted by queryset.update are repaired from the file fields
+        StoredBlob.objects.update(ref_count=0)
+        self.assertEqual(reconcile_blobs(), 1)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+
+
+class ProtectedDownloadTest(TestCase):
+    CONTENT = b'%PDF-1.4 0123456789'
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media, DOWNLOAD_ACCEL_REDIRECT_PREFIX='')
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.department = Department.objects.create(name='Legal')
+        self.user = self.member('reader', self.department)
+        self.document = Document.objects.create(
+            title='Contract', file=SimpleUploadedFile('contract.pdf', self.CONTENT),
+            uploaded_by=self.user, department=self.department
+        )
+        self.url = f'/api/documents/{self.document.id}/download/'
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def member(self, username, department):
+        user = User.objects.create_user(username=username, email=f'{username}@test.com', password='password123', role='EMPLOYEE')
+        Employee.objects.create(user=user, department=department, designation='Counsel', joining_date=timezone.now().date())
+        return user
+
+    @staticmethod
+    def body(response):
+        # The test client closes the response once its content is consumed
+        return b''.join(response.streaming_content)
+
+    def test_serves_ranges_and_revalidates_with_etags(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.body(response), self.CONTENT)
+        self.assertIn('filename="Contract.pdf"', response['Content-Disposition'])
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        partial = self.client.get(self.url, HTTP_RANGE='bytes=9-12')
+        self.assertEqual(partial.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(partial['Content-Range'], f'bytes 9-12/{len(self.CONTENT)}')
+        self.assertEqual(self.body(partial), b'0123')
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=-3')), b'789')
+
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=500-').status_code, 416)
+        # A range for an older version of the file gets the whole current file
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((stale.status_code, self.body(stale)), (status.HTTP_200_OK, self.CONTENT))
+
+    def test_checks_document_visibility(self):
+        self.client.force_authenticate(user=self.member('outsider', Department.objects.create(name='Sales')))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_signed_links_work_without_a_token_for_their_path_only(self):
+        listing = self.client.get('/api/documents/')
+        link = listing.data['results'][0]['download_url']
+
+        anonymous = APIClient()
+        response = anonymous.get(link)
+        self.assertEqual((response.status_code, self.body(response)), (status.HTTP_200_OK, self.CONTENT))
+        other_path = link.replace(f'/{self.document.id}/', f'/{self.document.id + 1}/')
+        self.assertEqual(anonymous.get(other_path).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_hands_off_to_nginx_when_configured(self):
+        with self.settings(DOWNLOAD_ACCEL_REDIRECT_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response.content, b'')
+
+
+class SerializerRelationsTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.department = Department.objects.create(name='Operations')
+        self.admin = User.objects.create_user(username='sysadmin', email='sysadmin@test.com', password='password123', role='SYSTEM_ADMIN')
+        Employee.objects.create(user=self.admin, department=self.department, designation='Admin', joining_date=timezone.now().date())
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.created = 0
+
+    def employee(self):
+        self.created += 1
+        user = User.objects.create_user(
+            username=f'worker{self.created}', email=f'worker{self.created}@test.com', password='password123', first_name=f'Worker{self.created}'
+        )
+        return Employee.objects.create(user=user, department=self.department, designation='Staff', joining_date=timezone.now().date())
+
+    def assertConstantQueries(self, url, add_row, more=6):
+        """A page costs the same number of queries after ``more`` rows are added to it."""
+        def page_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(response.data['results']), len(queries)
+
+        for _ in range(2):
+            add_row()
+        rows, small = page_queries()
+        for _ in range(more):
+            add_row()
+        self.assertEqual(page_queries(), (rows + more, small), url)
+
+    def test_nested_serializers_contribute_their_relations(self):
+        relations = relations_for(PayslipSerializer)
+        self.assertEqual(
+            relations.select,
+            ['employee', 'employee__user', 'employee__user__employee_profile', 'employee__department']
+        )
+
+    def test_list_pages_cost_a_constant_number_of_queries(self):
+        now = timezone.now()
+        rows = {
+            '/api/tasks/': lambda: Task.objects.create(
+                assigned_to=self.employee(), assigned_by=self.employee().user, title='Audit', description='', due_date=now
+            ),
+            '/api/attendance/': lambda: Attendance.objects.create(employee=self.employee(), date=now.date()),
+            '/api/finance/payslips/': lambda: Payslip.objects.create(
+                employee=self.employee(), month=now.date().replace(day=1), year=now.year,
+                total_earnings=100, total_deductions=10, net_pay=90
+            ),
+            '/api/documents/': lambda: Document.objects.create(
+                title='Plan', file=SimpleUploadedFile('plan.txt', b'plan'),
+                uploaded_by=self.employee().user, department=self.department
+            ),
+            '/api/messages/': lambda: MessageAttachment.objects.create(
+                message=Message.objects.create(sender=self.employee().user, recipient=self.admin, subject='Hi', body='...'),
+                file=SimpleUploadedFile('note.txt', b'note')
+            ),
+        }
+        for url, add_row in rows.items():
+            with self.subTest(url=url):
+                self.assertConstantQueries(url, add_row)
+
+    def test_employee_directory_costs_a_constant_number_of_queries(self):
+        # Seeded demo employees are listed too; stay within one page
+        self.assertConstantQueries('/api/employees/', self.employee, more=3)
+
+
+class EndpointBenchmarkTest(TestCase):
+    def test_every_read_endpoint_answers_in_a_constant_number_of_queries(self):
+        populate_org(employees=4, attendance_days=2, seed=1)
+        small, _ = endpoint_benchmark.run(iterations=1)
+        populate_org(employees=12, attendance_days=2, seed=2)
+        large, _ = endpoint_benchmark.run(iterations=1)
+
+        self.assertIn('SOFTWARE_ENGINEER /api/tasks/', small)
+        for key, result in large.items():
+            with self.subTest(key):
+                self.assertLess(result['status'], 500)
+                if key in small:
+                    self.assertEqual(result['queries'], small[key]['queries'])
+
+    def test_compare_reports_regressions(self):
+        baseline = {
+            'MANAGER /api/tasks/': {'status': 200, 'queries': 3, 'p95_ms': 10.0, 'bytes': 1000},
+            'MANAGER /api/leaves/': {'status': 200, 'queries': 2, 'p95_ms': 10.0, 'bytes': 1000},
+        }
+        results = {
+            'MANAGER /api/tasks/': {'status': 200, 'queries': 4, 'p95_ms': 30.0, 'bytes': 1100},
+            'MANAGER /api/leaves/': {'status': 200, 'queries': 2, 'p95_ms': 12.0, 'bytes': 1100},
+            'MANAGER /api/new/': {'status': 200, 'queries': 9, 'p95_ms': 99.0, 'bytes': 9999},
+        }
+
+        self.assertEqual(endpoint_benchmark.compare(results, baseline), [
+            'MANAGER /api/tasks/: queries 3 -> 4',
+            'MANAGER /api/tasks/: p95 10.00ms -> 30.00ms',
+        ])
+
+
+class GenerateOrgTest(TestCase):
+    def generate(self, seed):
+        call_command(
+            'generate_org', employees=6, departments=9, attendance_days=3, tasks=2, leaves=1,
+            payslip_months=2, messages=2, audit_entries=4, seed=seed, batch_size=4, stdout=io.StringIO(),
+        )
+        people = Employee.objects.filter(employee_id__startswith=f'SYN{seed}-').order_by('employee_id')
+        return [
+            (person.employee_id, person.user.username, person.user.role, person.user.last_name,
+             person.department.name, person.joining_date)
+            for person in people
+        ]
+
+    def test_generates_every_table_at_the_requested_scale(self):
+        self.generate(3)
+
+        users = User.objects.filter(username__startswith='synthetic-3-')
+        self.assertEqual(users.count(), 6)
+        self.assertTrue(users.first().check_password('password123'))
+        self.assertEqual(Department.objects.filter(name='Department 9').count(), 1)
+        self.assertEqual(Attendance.objects.filter(employee__user__in=users).count(), 18)
+        self.assertEqual(Task.objects.filter(assigned_to__user__in=users).count(), 12)
+        self.assertEqual(Payslip.objects.filter(employee__user__in=users).count(), 12)
+        self.assertEqual(Message.objects.filter(recipient__in=users).count(), 12)
+        self.assertEqual(AuditLog.objects.filter(user__in=users).count(), 24)
+        unread = Message.objects.filter(recipient=users.first(), is_read=False).count()
+        self.assertEqual(get_counts(users.first().pk)['messages'], unread)
+
+    def test_same_seed_gives_the_same_organisation_once(self):
+        savepoint = transaction.savepoint()
+        first = self.generate(5)
+        with self.assertRaisesMessage(CommandError, 'already generated'):
+            self.generate(5)
+
+        transaction.savepoint_rollback(savepoint)
+        self.assertEqual(self.generate(5), first)
+        self.assertNotEqual(self.generate(6), [])
+
+
+class NotificationPushTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='emp',
+            email='emp@test.com',
+            password='password123',
+        )
+        self.sender = User.objects.create_user(
+            username='boss',
+            email='boss@test.com',
+            password='password123',
+        )
+
+    async def connect(self, token):
+        communicator = WebsocketCommunicator(application, f'/ws/notifications/?token={token}')
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def test_anonymous_socket_is_rejected(self):
+        communicator, connected = await self.connect('invalid')
+        self.assertFalse(connected)
+
+    async def test_new_rows_and_reads_are_pushed(self):
+        communicator, connected = await self.connect(str(AccessToken.for_user(self.user)))
+        self.assertTrue(connected)
+        initial = await communicator.receive_json_from()
+        self.assertEqual(initial['unread'], {'notifications': 0, 'messages': 0})
+
+        notification = await sync_to_async(Notification.objects.create)(recipient=self.user, title='Hi', message='Hello')
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['type'], 'notification')
+        self.assertEqual(event['data']['title'], 'Hi')
+        self.assertEqual(event['unread'], {'notifications': 1, 'messages': 0})
+
+        await sync_to_async(Message.objects.create)(sender=self.sender, recipient=self.user, subject='Report', body='Due')
+        event = await communicator.receive_json_from()
+        self.assertEqual((event['type'], event['data']['subject']), ('message', 'Report'))
+        self.assertEqual(event['unread'], {'notifications': 1, 'messages': 1})
+
+        notification.is_read = True
+        await sync_to_async(notification.save)()
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['type'], 'unread')
+        self.assertEqual(event['unread'], {'notifications': 0, 'messages': 1})
+
+        await communicator.disconnect()
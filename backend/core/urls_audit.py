@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views_audit import AuditLogViewSet
+from .views_audit import AuditLogViewSet, AuditArchiveSegmentViewSet
 
 router = DefaultRouter()
 router.register(r'logs', AuditLogViewSet, basename='auditlog')
+router.register(r'segments', AuditArchiveSegmentViewSet, basename='auditsegment')
 
 urlpatterns = [
     path('', include(router.urls)),
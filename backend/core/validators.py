@@ -1,7 +1,10 @@
+import logging
 import filetype
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from .services import VirusScanner
+from .scanning import ScanError, inspect_upload
+
+logger = logging.getLogger(__name__)
 
 # Try to import dictionary for magic, but don't fail if system lib is missing
 try:
@@ -11,16 +14,17 @@ except ImportError:
     MAGIC_AVAILABLE = False
 
 def validate_file_type(upload):
-    # 1. Virus Scan
-    if not VirusScanner.scan(upload):
+    # 1. Virus Scan; the same pass over the file keeps its first bytes for type detection
+    try:
+        inspection = inspect_upload(upload)
+    except ScanError as e:
+        logger.error("Virus scan failed for %s: %s", getattr(upload, 'name', 'upload'), e)
+        raise ValidationError(_("File could not be scanned for viruses. Please try again later."))
+    if not inspection.verdict.clean:
         raise ValidationError(_("File contains a virus or malware."))
 
     # 2. Magic Number Validation
-    # Read snippet to detect type
-    initial_pos = upload.tell()
-    upload.seek(0)
-    first_bytes = upload.read(2048)
-    upload.seek(initial_pos)
+    first_bytes = inspection.head
 
     # Try detecting with filetype (pure python, safer dependency) first
     kind = filetype.guess(first_bytes)
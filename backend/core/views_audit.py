@@ -1,16 +1,61 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import AuditLog
-from .serializers import AuditLogSerializer
+from .models import AuditLog, AuditArchiveSegment
+from .serializers import AuditLogSerializer, AuditArchiveSegmentSerializer
+from .archive import search_segment
+from .pagination import IteratorPagination, TimestampKeysetPagination
+from .search import AuditSearchFilter
+from .prefetch import SerializerRelationsMixin
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(SerializerRelationsMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows admins to view audit logs.
     """
     queryset = AuditLog.objects.all().order_by('-timestamp')
     serializer_class = AuditLogSerializer
     permission_classes = [permissions.IsAdminUser] # Only Admins can view logs
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['user', 'action', 'model_name']
-    search_fields = ['details', 'object_id', 'user__email', 'user__first_name']
+    pagination_class = TimestampKeysetPagination
+    # search accepts field filters as well as text, e.g. ?search=model:Task action:DELETE sprint
+    filter_backends = [DjangoFilterBackend, AuditSearchFilter, filters.OrderingFilter]
+    # timestamp bounds let PostgreSQL prune partitions outside the requested range
+    filterset_fields = {
+        'user': ['exact'],
+        'action': ['exact'],
+        'model_name': ['exact'],
+        'timestamp': ['gte', 'lt'],
+    }
     ordering_fields = ['timestamp', 'action']
+
+class AuditArchiveSegmentViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only access to audit log months moved to compressed segment files.
+    """
+    queryset = AuditArchiveSegment.objects.all()
+    serializer_class = AuditArchiveSegmentSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['month']
+
+    @action(detail=True, methods=['get'])
+    def logs(self, request, pk=None):
+        """
+        Archived entries of a segment, filtered like the live logs (user, action, model_name, object_id, search).
+        """
+        segment = self.get_object()
+        entries = search_segment(
+            segment,
+            action=request.query_params.get('action'),
+            model_name=request.query_params.get('model_name'),
+            user=request.query_params.get('user'),
+            object_id=request.query_params.get('object_id'),
+            search=request.query_params.get('search'),
+        )
+        # Stops reading the segment once the requested page is filled
+        paginator = IteratorPagination()
+        try:
+            page = paginator.paginate_iterable(entries, request)
+        except FileNotFoundError:
+            return Response({"error": "Archive segment file is missing"}, status=status.HTTP_404_NOT_FOUND)
+        return paginator.get_paginated_response(page)
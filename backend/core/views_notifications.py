@@ -2,11 +2,17 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, NotificationBroadcastSerializer
+from .services import NotificationService
+from users.permissions import IsAdminOrHR
+from .pagination import CreatedAtKeysetPagination
+from .realtime import push_unread
+from .counters import adjust, get_counts
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtKeysetPagination
 
     def get_queryset(self):
         # Return notifications for the current user, newest first
@@ -15,7 +21,10 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['POST'])
     def mark_all_read(self, request):
         """Mark all notifications as read for the current user."""
-        self.get_queryset().update(is_read=True)
+        marked = self.get_queryset().filter(is_read=False).update(is_read=True)
+        # update() skips the post_save counter and push handlers
+        adjust(request.user.pk, 'notifications', -marked)
+        push_unread(request.user.pk)
         return Response({'status': 'success'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['POST'])
@@ -29,5 +38,26 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['GET'])
     def unread_count(self, request):
         """Return the count of unread notifications."""
-        count = self.get_queryset().filter(is_read=False).count()
+        count = get_counts(request.user.pk)['notifications']
         return Response({'count': count}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['POST'], permission_classes=[IsAdminOrHR])
+    def broadcast(self, request):
+        """Notify users by id, department, role or everyone (Admin/HR only)."""
+        serializer = NotificationBroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        recipients = NotificationService.recipients_for(
+            user_ids=data.get('user_ids'),
+            department=data.get('department'),
+            role=data.get('role'),
+            all_users=data['all_users'],
+        )
+        created, skipped = NotificationService.notify_many(
+            recipients,
+            title=data['title'],
+            message=data['message'],
+            link=data.get('link') or None,
+            deduplicate=data['deduplicate'],
+        )
+        return Response({'created': created, 'skipped': skipped}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class DocumentsConfig(AppConfig):
+    name = 'documents'
+
+    def ready(self):
+        import documents.signals
@@ -0,0 +1,101 @@
+"""
+Plain-text extraction from uploaded documents, for the full-text index.
+
+Handles the text formats Document uploads accept: TXT, DOCX (read straight from
+the zip with the standard library) and PDF (through pypdf). Images and legacy
+.doc files have no extractable text; they are still found by title and description.
+"""
+import io
+import zipfile
+import zlib
+from xml.etree import ElementTree
+from django.conf import settings
+
+# pypdf is only needed by the index_documents worker, not by the web process
+try:
+    import pypdf
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(Exception):
+    pass
+
+
+def _limit(parts, max_chars):
+    text = ''
+    for part in parts:
+        text += part
+        if len(text) >= max_chars:
+            return text[:max_chars]
+    return text
+
+
+def _text(handle):
+    data = handle.read()
+    for encoding in ('utf-8', 'utf-16'):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode('latin-1')
+
+
+def _docx_paragraphs(handle):
+    try:
+        archive = zipfile.ZipFile(handle)
+        document = archive.open('word/document.xml')
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ExtractionError(f"Not a valid DOCX file: {e}") from e
+    with archive, document:
+        # iterparse keeps memory flat on very large documents
+        paragraph = []
+        try:
+            for event, element in ElementTree.iterparse(document, events=('end',)):
+                if element.tag == f'{WORD_NAMESPACE}t':
+                    paragraph.append(element.text or '')
+                elif element.tag == f'{WORD_NAMESPACE}tab':
+                    paragraph.append('\t')
+                elif element.tag == f'{WORD_NAMESPACE}p':
+                    yield ''.join(paragraph) + '\n'
+                    paragraph = []
+                    element.clear()
+        except (ElementTree.ParseError, zipfile.BadZipFile, zlib.error, EOFError) as e:
+            raise ExtractionError(f"Damaged DOCX file: {e}") from e
+
+
+def _pdf_pages(handle):
+    if not PYPDF_AVAILABLE:
+        raise ExtractionError("PDF text extraction requires pypdf")
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(handle.read()))
+        for page in reader.pages:
+            yield (page.extract_text() or '') + '\n'
+    # Damaged or encrypted PDFs surface as assorted errors from deep inside pypdf
+    except (pypdf.errors.PyPdfError, KeyError, ValueError, TypeError, IndexError, AttributeError) as e:
+        raise ExtractionError(f"Unreadable PDF: {e}") from e
+
+
+EXTRACTORS = {
+    '.txt': lambda handle: [_text(handle)],
+    '.docx': _docx_paragraphs,
+    '.pdf': _pdf_pages,
+}
+
+
+def extract_text(field_file, max_chars=None):
+    """
+    Text of a stored file, truncated to ``max_chars`` (DOCUMENT_INDEX_MAX_CHARS).
+    Returns '' for formats without text; raises ExtractionError for damaged files.
+    """
+    max_chars = max_chars or settings.DOCUMENT_INDEX_MAX_CHARS
+    extension = '.' + field_file.name.rsplit('.', 1)[-1].lower() if '.' in field_file.name else ''
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        return ''
+    with field_file.storage.open(field_file.name, 'rb') as handle:
+        # NUL characters cannot be stored in PostgreSQL text columns
+        return _limit(extractor(handle), max_chars).replace('\x00', '')
@@ -0,0 +1,121 @@
+"""
+Background text extraction for the document search index.
+
+Saving a Document only writes its title and description to its DocumentText row
+(searchable immediately) and, when the file changed, marks the row PENDING. The
+``index_documents`` worker claims pending rows in batches, extracts the file's
+text (documents.extraction) and stores it; the database keeps the full-text
+index in sync (documents.search). Files are content-addressed blobs, so a file
+already extracted for another document is copied instead of parsed again.
+"""
+import datetime
+import logging
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .extraction import ExtractionError, extract_text
+from .models import Document, DocumentText
+
+logger = logging.getLogger(__name__)
+
+
+def queue(document):
+    """
+    Brings the document's DocumentText up to date, queueing extraction when its file changed.
+    """
+    entry, created = DocumentText.objects.get_or_create(
+        document=document,
+        defaults={'title': document.title, 'description': document.description},
+    )
+    fields = {}
+    if not created and (entry.title, entry.description) != (document.title, document.description):
+        fields.update(title=document.title, description=document.description)
+    if created or entry.source != document.file.name:
+        fields.update(status=DocumentText.Status.PENDING, queued_at=timezone.now(), locked_at=None, error='')
+    if fields:
+        DocumentText.objects.filter(pk=entry.pk).update(**fields)
+
+
+def requeue_all():
+    """
+    Creates missing DocumentText rows and queues every document for extraction. Returns the number queued.
+    """
+    missing = Document.objects.filter(indexed_text__isnull=True)
+    DocumentText.objects.bulk_create(
+        [DocumentText(document=document, title=document.title, description=document.description)
+         for document in missing.iterator()],
+        batch_size=500,
+    )
+    return DocumentText.objects.update(
+        status=DocumentText.Status.PENDING, source='', queued_at=timezone.now(), locked_at=None, error=''
+    )
+
+
+def release_stale_locks(now=None):
+    """
+    Requeues rows left RUNNING by a worker that died.
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(seconds=settings.DOCUMENT_INDEX_LOCK_TIMEOUT_SECONDS)
+    return DocumentText.objects.filter(status=DocumentText.Status.RUNNING, locked_at__lt=cutoff).update(
+        status=DocumentText.Status.PENDING, locked_at=None
+    )
+
+
+def claim_batch(limit, now=None):
+    """
+    Marks up to ``limit`` pending rows RUNNING and returns them with their documents.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        pending = DocumentText.objects.filter(status=DocumentText.Status.PENDING).order_by('queued_at')
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.values_list('document_id', flat=True)[:limit])
+        DocumentText.objects.filter(document_id__in=ids).update(status=DocumentText.Status.RUNNING, locked_at=now)
+    return list(DocumentText.objects.filter(document_id__in=ids).select_related('document').order_by('queued_at'))
+
+
+def index_entry(entry):
+    """
+    Extracts the text of ``entry``'s file and stores it. Returns the final status.
+    """
+    field_file = entry.document.file
+    fields = {'source': field_file.name, 'locked_at': None, 'indexed_at': timezone.now(), 'error': ''}
+    already_extracted = DocumentText.objects.filter(
+        source=field_file.name, status=DocumentText.Status.INDEXED
+    ).exclude(pk=entry.pk).values_list('body', flat=True).first()
+    try:
+        fields['body'] = already_extracted if already_extracted is not None else extract_text(field_file)
+        fields['status'] = DocumentText.Status.INDEXED
+    except (ExtractionError, OSError) as e:
+        logger.warning("Text extraction failed for document %s: %s", entry.pk, e)
+        fields.update(body='', status=DocumentText.Status.FAILED, error=str(e)[:1000])
+    except Exception as e:
+        # A parser bug on one file must not stop the worker; the row is marked FAILED like any damaged file
+        logger.exception("Unexpected error extracting text from document %s", entry.pk)
+        fields.update(body='', status=DocumentText.Status.FAILED, error=f"{type(e).__name__}: {e}"[:1000])
+    # A save that replaced the file meanwhile queued the row again; leave it for the next pass
+    DocumentText.objects.filter(pk=entry.pk, status=DocumentText.Status.RUNNING).update(**fields)
+    return fields['status']
+
+
+def drain(batch_size=None, max_batches=None):
+    """
+    Indexes pending documents batch by batch until none are left (or ``max_batches``
+    is reached). Returns ``(indexed, failed)``.
+    """
+    batch_size = batch_size or settings.DOCUMENT_INDEX_BATCH_SIZE
+    release_stale_locks()
+    indexed = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        entries = claim_batch(batch_size)
+        if not entries:
+            break
+        for entry in entries:
+            if index_entry(entry) == DocumentText.Status.INDEXED:
+                indexed += 1
+            else:
+                failed += 1
+        batches += 1
+    return indexed, failed
@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from documents.indexing import drain, requeue_all
+
+
+class Command(BaseCommand):
+    help = 'Extracts document text into the full-text search index; runs as a long-lived worker unless --once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Index the pending documents and exit')
+        parser.add_argument('--rebuild', action='store_true', help='Queue every document for extraction first')
+        parser.add_argument('--batch-size', type=int, default=settings.DOCUMENT_INDEX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when nothing is pending')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write(f"Queued {requeue_all()} documents")
+        while True:
+            start = time.perf_counter()
+            indexed, failed = drain(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            if indexed or failed:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Indexed {indexed}, failed {failed} in {elapsed:.2f}s "
+                    f"({indexed / elapsed if elapsed else 0:.1f} documents/s)"
+                ))
+            if options['once']:
+                return
+            if not (indexed or failed):
+                time.sleep(options['poll_interval'])
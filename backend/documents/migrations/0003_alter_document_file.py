@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:48
+
+import core.storage
+import core.validators
+import documents.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_alter_document_file'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(storage=core.storage.get_blob_storage, upload_to=documents.models.document_upload_path, validators=[core.validators.validate_file_type]),
+        ),
+    ]
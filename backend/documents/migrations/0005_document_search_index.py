@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from documents.search import install_index
+    install_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    from documents.search import drop_index
+    drop_index(schema_editor.connection)
+
+
+def queue_existing_documents(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentText = apps.get_model('documents', 'DocumentText')
+    DocumentText.objects.bulk_create(
+        [DocumentText(document=document, title=document.title, description=document.description)
+         for document in Document.objects.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+        migrations.RunPython(queue_existing_documents, migrations.RunPython.noop),
+    ]
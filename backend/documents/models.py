@@ -4,6 +4,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from employees.models import Department
 from core.validators import validate_file_type
+from core.storage import blob_registry, get_blob_storage
 
 User = get_user_model()
 
@@ -14,9 +15,10 @@ def document_upload_path(instance, filename):
     filename = f"{uuid.uuid4()}.{ext}"
     return os.path.join('documents/%Y/%m/%d/', filename)
 
+@blob_registry.register('file')
 class Document(models.Model):
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to=document_upload_path, validators=[validate_file_type])
+    file = models.FileField(upload_to=document_upload_path, storage=get_blob_storage, validators=[validate_file_type])
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploaded_documents')
     department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='documents')
     description = models.TextField(blank=True)
@@ -27,3 +29,35 @@ class Document(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+
+
+class DocumentText(models.Model):
+    """
+    A document's searchable text: its title and description, plus the body extracted
+    from its file by the index_documents worker (see documents.indexing).
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        INDEXED = 'INDEXED', 'Indexed'
+        FAILED = 'FAILED', 'Failed'
+
+    document = models.OneToOneField(Document, on_delete=models.CASCADE, primary_key=True, related_name='indexed_text')
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    # File the body was extracted from; a new file queues the document again
+    source = models.CharField(max_length=255, blank=True, db_index=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    error = models.TextField(blank=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    indexed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'queued_at'], name='document_index_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Text of {self.document_id} ({self.status})"
@@ -0,0 +1,148 @@
+"""
+Full-text search over documents.
+
+DocumentText rows hold each document's title, description and extracted body;
+the index over them is maintained by the database:
+
+* PostgreSQL: a generated, weighted ``search_vector`` tsvector column (title >
+  description > body) with a GIN index, ranked with ``ts_rank``.
+* SQLite: an external-content FTS5 table ``documents_documenttext_fts`` kept in
+  sync by insert/update/delete triggers, ranked with ``bm25``.
+* Other backends fall back to ``icontains`` without ranking.
+
+Every word of the query must match (as a prefix), like the audit log search.
+"""
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from core.search import WORD_PATTERN
+
+PARENT_TABLE = 'documents_documenttext'
+PARENT_COLUMNS = 'title, description, body'
+FTS_TABLE = f'{PARENT_TABLE}_fts'
+SEARCH_INDEX = f'{PARENT_TABLE}_search_idx'
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        AFTER INSERT ON {PARENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, {PARENT_COLUMNS})
+            VALUES (new.document_id, new.title, new.description, new.body);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        AFTER DELETE ON {PARENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {PARENT_COLUMNS})
+            VALUES ('delete', old.document_id, old.title, old.description, old.body);
+        END""",
+    # Only text changes touch the index, not the worker's status updates
+    f'{FTS_TABLE}_au': f"""
+        AFTER UPDATE OF {PARENT_COLUMNS} ON {PARENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {PARENT_COLUMNS})
+            VALUES ('delete', old.document_id, old.title, old.description, old.body);
+            INSERT INTO {FTS_TABLE} (rowid, {PARENT_COLUMNS})
+            VALUES (new.document_id, new.title, new.description, new.body);
+        END""",
+}
+# Relative weight of a match in the title, description and body
+BM25_WEIGHTS = '10.0, 4.0, 1.0'
+
+
+def install_index(connection=connection):
+    """
+    Creates the search index for ``connection`` if it is missing. Idempotent.
+
+    On SQLite the triggers are lost whenever a migration rebuilds documents_documenttext;
+    this puts them back and reindexes the existing rows.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                ALTER TABLE {PARENT_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+                    setweight(to_tsvector('simple', coalesce(body, '')), 'C')
+                ) STORED
+            """)
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON {PARENT_TABLE} USING GIN (search_vector)")
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [PARENT_TABLE])
+            existing = {name for (name,) in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{PARENT_COLUMNS}, content='{PARENT_TABLE}', content_rowid='document_id')"
+            )
+            for name, body in FTS_TRIGGERS.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+            if existing.issuperset(FTS_TRIGGERS):
+                return
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_index(connection=connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+            cursor.execute(f"ALTER TABLE {PARENT_TABLE} DROP COLUMN IF EXISTS search_vector")
+        elif connection.vendor == 'sqlite':
+            for name in FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def search_documents(queryset, query):
+    """
+    Filters a Document queryset to matches for ``query``, best first (annotated ``search_rank``).
+    """
+    terms = WORD_PATTERN.findall(query or '')
+    if not terms:
+        return queryset
+
+    vendor = connection.vendor
+    document_id = f"{connection.ops.quote_name('documents_document')}.{connection.ops.quote_name('id')}"
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f"{term}:*" for term in terms)
+        condition = RawSQL(
+            f"{document_id} IN (SELECT document_id FROM {PARENT_TABLE} "
+            f"WHERE search_vector @@ to_tsquery('simple', %s))",
+            [tsquery], output_field=BooleanField()
+        )
+        rank = RawSQL(
+            f"(SELECT ts_rank(search_vector, to_tsquery('simple', %s)) FROM {PARENT_TABLE} "
+            f"WHERE document_id = {document_id})",
+            [tsquery], output_field=FloatField()
+        )
+    elif vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        condition = RawSQL(
+            f"{document_id} IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+            [match], output_field=BooleanField()
+        )
+        # bm25 is lower for better matches
+        rank = RawSQL(
+            f"(SELECT -bm25({FTS_TABLE}, {BM25_WEIGHTS}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {document_id})",
+            [match], output_field=FloatField()
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(indexed_text__body__icontains=term)
+            )
+        rank = Value(0.0, output_field=FloatField())
+
+    return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', '-created_at')
+
+
+class DocumentSearchFilter(filters.BaseFilterBackend):
+    """
+    Ranked full-text search of document titles, descriptions and contents (``?q=``).
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_documents(queryset, query)
@@ -1,12 +1,15 @@
 from rest_framework import serializers
 from .models import Document
 from users.serializers import UserSerializer
+from core.downloads import SignedDownloadURLField
 
 class DocumentSerializer(serializers.ModelSerializer):
     uploaded_by = UserSerializer(read_only=True)
     department_name = serializers.CharField(source='department.name', read_only=True)
+    download_url = SignedDownloadURLField('document-download')
 
     class Meta:
         model = Document
-        fields = ['id', 'title', 'file', 'uploaded_by', 'department', 'department_name', 'description', 'created_at']
+        fields = ['id', 'title', 'file', 'download_url', 'uploaded_by', 'department', 'department_name', 'description', 'created_at']
         read_only_fields = ['uploaded_by', 'department']
+        select_related = ['department']
@@ -0,0 +1,21 @@
+from django.db import connections
+from django.db.models.signals import post_save, post_migrate
+from django.dispatch import receiver
+from .indexing import queue
+from .models import Document
+from .search import install_index
+
+
+@receiver(post_save, sender=Document)
+def queue_text_extraction(sender, instance, raw=False, **kwargs):
+    # Title and description are searchable at once; the index_documents worker extracts the file
+    if raw:
+        return
+    queue(instance)
+
+
+@receiver(post_migrate)
+def restore_document_search_index(sender, using, **kwargs):
+    # A migration that rebuilds documents_documenttext on SQLite drops the FTS triggers with it
+    if sender.name == 'documents' and connections[using].vendor == 'sqlite':
+        install_index(connections[using])
@@ -0,0 +1,135 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from employees.models import Department, Employee
+from . import indexing
+from .models import Document, DocumentText
+from .search import search_documents
+
+User = get_user_model()
+
+
+def docx(*paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ))
+    return buffer.getvalue()
+
+
+class DocumentSearchTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.department = Department.objects.create(name='Legal')
+        self.user = self.member('counsel', self.department)
+
+    def member(self, username, department):
+        user = User.objects.create_user(username=username, email=f'{username}@test.com', password='password123', role='EMPLOYEE')
+        Employee.objects.create(user=user, department=department, designation='Counsel', joining_date=timezone.now().date())
+        return user
+
+    def upload(self, title, filename, content, department=None, description=''):
+        return Document.objects.create(
+            title=title, description=description, file=SimpleUploadedFile(filename, content),
+            uploaded_by=self.user, department=department or self.department
+        )
+
+    def search(self, query):
+        return list(search_documents(Document.objects.all(), query).values_list('id', flat=True))
+
+    def test_worker_indexes_file_contents(self):
+        lease = self.upload('Office lease', 'lease.txt', b'The tenant pays a quarterly indemnity.')
+        policy = self.upload('Travel policy', 'policy.docx', docx('Per diem rates', 'Indemnity for lost luggage'))
+
+        self.assertEqual(self.search('lease'), [lease.id])
+        self.assertEqual(self.search('indemnity'), [])
+
+        self.assertEqual(indexing.drain(), (2, 0))
+        self.assertEqual(set(self.search('indemn')), {lease.id, policy.id})
+        self.assertEqual(self.search('luggage per'), [policy.id])
+        self.assertEqual(DocumentText.objects.get(pk=policy.pk).body, 'Per diem rates\nIndemnity for lost luggage\n')
+
+    def test_title_matches_rank_above_body_matches(self):
+        body_match = self.upload('Minutes', 'minutes.txt', b'Discussed the budget for next year.')
+        title_match = self.upload('Budget 2025', 'budget.txt', b'Numbers.')
+        indexing.drain()
+
+        self.assertEqual(self.search('budget'), [title_match.id, body_match.id])
+
+    def test_new_file_is_reindexed_and_duplicates_are_not_parsed_again(self):
+        document = self.upload('Contract', 'contract.txt', b'Original clause.')
+        indexing.drain()
+
+        document.title = 'Signed contract'
+        document.file = SimpleUploadedFile('contract.txt', b'Amended clause.')
+        document.save()
+        self.assertEqual(DocumentText.objects.get(pk=document.pk).status, DocumentText.Status.PENDING)
+        self.assertEqual(self.search('signed'), [document.id])
+
+        copy = self.upload('Copy', 'copy.txt', b'Amended clause.')
+        with mock.patch('documents.indexing.extract_text', wraps=indexing.extract_text) as extract:
+            self.assertEqual(indexing.drain(), (2, 0))
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(set(self.search('amended')), {document.id, copy.id})
+        self.assertEqual(self.search('original'), [])
+
+    def test_damaged_files_fail_without_hiding_the_document(self):
+        document = self.upload('Scan', 'scan.docx', b'not a zip file')
+
+        self.assertEqual(indexing.drain(), (0, 1))
+        entry = DocumentText.objects.get(pk=document.pk)
+        self.assertEqual(entry.status, DocumentText.Status.FAILED)
+        self.assertIn('DOCX', entry.error)
+        self.assertEqual(self.search('scan'), [document.id])
+
+    def test_malformed_docx_and_parser_crashes_fail_one_document_each(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('word/document.xml', '<w:document><w:body><w:p>')
+        broken = self.upload('Broken', 'broken.docx', buffer.getvalue())
+        crashing = self.upload('Crashing', 'crashing.txt', b'Text.')
+        fine = self.upload('Fine', 'fine.txt', b'Readable text.')
+
+        extract_text = indexing.extract_text
+
+        def extract(field_file):
+            if field_file.name == crashing.file.name:
+                raise KeyError('/Root')
+            return extract_text(field_file)
+
+        with mock.patch('documents.indexing.extract_text', side_effect=extract), self.assertLogs('documents.indexing', 'WARNING'):
+            self.assertEqual(indexing.drain(), (1, 2))
+        statuses = dict(DocumentText.objects.values_list('document_id', 'status'))
+        self.assertEqual(statuses[broken.pk], DocumentText.Status.FAILED)
+        self.assertEqual(statuses[crashing.pk], DocumentText.Status.FAILED)
+        self.assertEqual(statuses[fine.pk], DocumentText.Status.INDEXED)
+        self.assertIn('Damaged DOCX', DocumentText.objects.get(pk=broken.pk).error)
+        self.assertEqual(DocumentText.objects.get(pk=crashing.pk).error, "KeyError: '/Root'")
+
+    def test_api_search_respects_department_visibility(self):
+        mine = self.upload('Handbook', 'handbook.txt', b'Remote work guidelines.')
+        self.upload('Sales handbook', 'sales.txt', b'Remote work for sales.', department=Department.objects.create(name='Sales'))
+        indexing.drain()
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        response = client.get('/api/documents/', {'q': 'remote'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([document['id'] for document in response.data['results']], [mine.id])
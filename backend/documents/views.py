@@ -1,12 +1,20 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
+from rest_framework.decorators import action
+from django_filters.rest_framework import DjangoFilterBackend
+from core.downloads import DOWNLOAD_AUTHENTICATION_CLASSES, serve_file
+import os
 from .models import Document
+from .search import DocumentSearchFilter
 from .serializers import DocumentSerializer
 from users.permissions import IsAdmin, IsManager, IsEmployee
+from core.prefetch import SerializerRelationsMixin
 
-class DocumentViewSet(viewsets.ModelViewSet):
+class DocumentViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     serializer_class = DocumentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # ?q= searches titles, descriptions and file contents, best matches first
+    filter_backends = [DjangoFilterBackend, DocumentSearchFilter]
 
     def get_queryset(self):
         user = self.request.user
@@ -41,3 +49,12 @@ class DocumentViewSet(viewsets.ModelViewSet):
                  return super().destroy(request, *args, **kwargs)
         
         return Response({'error': 'You do not have permission to delete this document.'}, status=status.HTTP_403_FORBIDDEN)
+
+    @action(detail=True, methods=['get'], authentication_classes=DOWNLOAD_AUTHENTICATION_CLASSES)
+    def download(self, request, pk=None):
+        """
+        Streams the file to users who can see the document (signed links from the serializer also work).
+        """
+        document = self.get_object()
+        extension = os.path.splitext(document.file.name)[1]
+        return serve_file(request, document.file, filename=f"{document.title}{extension}")
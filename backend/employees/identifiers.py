@@ -0,0 +1,129 @@
+"""
+Employee id allocation.
+
+Ids look like ``EMP-0042``. Their numbers come from the database in O(1):
+
+* PostgreSQL: the ``employees_employee_code_seq`` sequence (migrations 0005, 0006).
+  ``nextval`` never blocks and never hands out a number twice.
+* Other backends: the ``employee_id`` row of ``IdCounter``, bumped by a single
+  UPDATE. The UPDATE takes the row's write lock, so concurrent allocations queue
+  behind it until the allocating transaction ends, then read their own value.
+
+``reserve(n)`` hands a bulk import a block of n numbers in one round trip. As
+with any sequence, numbers taken by a transaction that rolls back are not reused.
+Ids assigned by hand are not seen by the allocator until ``resync()`` runs.
+"""
+import re
+from django.db import IntegrityError, connection as default_connection, transaction
+from django.db.models import F
+
+PREFIX = 'EMP-'
+# Not employees_employee_id_seq: that is the name PostgreSQL gives the sequence behind Employee.id
+SEQUENCE = 'employees_employee_code_seq'
+COUNTER = 'employee_id'
+NUMBER_PATTERN = re.compile(rf'^{PREFIX}(\d+)$')
+
+
+def format_id(number):
+    return f"{PREFIX}{number:04d}"
+
+
+def highest_issued(employee_ids):
+    """
+    The largest number among ``employee_ids`` in the ``EMP-`` format, or 0.
+    """
+    numbers = (NUMBER_PATTERN.match(employee_id or '') for employee_id in employee_ids)
+    return max((int(match.group(1)) for match in numbers if match), default=0)
+
+
+def install_sequence(start, connection=default_connection):
+    """
+    Creates the PostgreSQL sequence so that its next value is ``start + 1``.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE}')
+        cursor.execute('SELECT setval(%s, %s, %s)', [SEQUENCE, max(start, 1), start > 0])
+
+
+def drop_sequence(connection=default_connection):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE}')
+
+
+def _issued_ids():
+    from .models import Employee
+
+    return highest_issued(Employee.objects.filter(employee_id__startswith=PREFIX).values_list('employee_id', flat=True))
+
+
+def _create_counter():
+    from .models import IdCounter
+
+    start = _issued_ids()
+    try:
+        with transaction.atomic():
+            IdCounter.objects.get_or_create(name=COUNTER, defaults={'last_value': start})
+    except IntegrityError:
+        pass  # Created by a concurrent allocation
+
+
+def reserve(count=1, connection=default_connection):
+    """
+    Takes ``count`` unused numbers. Returns them in ascending order.
+    """
+    if count < 1:
+        return []
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s) FROM generate_series(1, %s)', [SEQUENCE, count])
+            return sorted(row[0] for row in cursor.fetchall())
+
+    from .models import IdCounter
+
+    counter = IdCounter.objects.filter(name=COUNTER)
+    with transaction.atomic():
+        if not counter.update(last_value=F('last_value') + count):
+            # Missing after a table flush; start after the highest id already issued
+            _create_counter()
+            counter.update(last_value=F('last_value') + count)
+        last = counter.values_list('last_value', flat=True).get()
+    return list(range(last - count + 1, last + 1))
+
+
+def resync(connection=default_connection):
+    """
+    Moves the allocator past the highest id already issued, e.g. after ids were assigned
+    by hand. Never moves it backwards.
+    """
+    highest = _issued_ids()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT last_value, is_called FROM {SEQUENCE}')
+            last_value, is_called = cursor.fetchone()
+            if highest > (last_value if is_called else last_value - 1):
+                cursor.execute('SELECT setval(%s, %s)', [SEQUENCE, highest])
+        return
+
+    from .models import IdCounter
+
+    if not IdCounter.objects.filter(name=COUNTER).exists():
+        _create_counter()
+    IdCounter.objects.filter(name=COUNTER, last_value__lt=highest).update(last_value=highest)
+
+
+def allocate():
+    """
+    A new employee id.
+    """
+    return format_id(reserve(1)[0])
+
+
+def allocate_block(count):
+    """
+    ``count`` new employee ids, for bulk creation.
+    """
+    return [format_id(number) for number in reserve(count)]
@@ -0,0 +1,375 @@
+"""
+Bulk employee onboarding from a CSV or XLSX file.
+
+The first row holds the column names (see COLUMNS; only ``email`` and
+``joining_date`` are required). An import runs in two stages:
+
+1. In the request, every row is validated before anything is written, with a
+   fixed number of queries: one for emails already taken and one resolving all
+   departments (by id, or by name; unknown names are created, as in
+   EmployeeViewSet.create). A valid file is queued as an EmployeeImport.
+2. The ``process_employee_imports`` worker validates the rows again (the
+   database may have changed meanwhile), hashes the passwords in its process
+   pool (PBKDF2 is what makes onboarding slow, far too slow for a request) and
+   inserts users and employees with bulk_create in chunks, in one transaction,
+   with employee ids reserved as a block (employees.identifiers). Rows without
+   a password get an unusable one.
+
+An import is all or nothing: if any row is invalid, nothing is written and the
+report says which rows to fix.
+"""
+import csv
+import datetime
+import io
+import logging
+import multiprocessing
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from xml.etree import ElementTree
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from core.audit import audit_batch, audit_registry
+from . import identifiers
+from .models import Department, Employee, EmployeeImport
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+COLUMNS = [
+    'email', 'first_name', 'last_name', 'role', 'password', 'department',
+    'designation', 'phone_number', 'address', 'joining_date',
+]
+REQUIRED_COLUMNS = ['email', 'joining_date']
+DEFAULT_DEPARTMENT = 'General'
+DEFAULT_DESIGNATION = 'Staff'
+# Below this many passwords, handing them to the pool costs more than it saves
+POOL_MIN_PASSWORDS = 16
+EXCEL_EPOCH = datetime.date(1899, 12, 30)
+EXCEL_SERIAL = re.compile(r'^\d+(\.\d+)?$')
+XLSX_NS = {
+    'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+XLSX_REL_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+CELL_COLUMN = re.compile(r'^([A-Z]+)')
+
+
+class ImportFileError(Exception):
+    pass
+
+
+def _column_index(reference):
+    index = 0
+    for letter in CELL_COLUMN.match(reference).group(1):
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _read_csv(upload):
+    try:
+        text = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+        reader = csv.reader(text)
+        for values in reader:
+            yield reader.line_num, values
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFileError(f"Unreadable CSV: {e}")
+
+
+def _read_xlsx(upload):
+    """
+    Rows of the workbook's first sheet, read straight from its XML parts.
+    """
+    try:
+        with zipfile.ZipFile(upload) as archive:
+            shared = []
+            if 'xl/sharedStrings.xml' in archive.namelist():
+                root = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+                shared = [''.join(item.itertext()) for item in root.findall('main:si', XLSX_NS)]
+            workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+            sheet = workbook.find('main:sheets/main:sheet', XLSX_NS)
+            relations = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+            target = next(
+                rel.get('Target') for rel in relations.findall('rel:Relationship', XLSX_NS)
+                if rel.get('Id') == sheet.get(XLSX_REL_ID)
+            )
+            path = target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+            root = ElementTree.fromstring(archive.read(path))
+    except (zipfile.BadZipFile, KeyError, StopIteration, AttributeError, ElementTree.ParseError) as e:
+        raise ImportFileError(f"Unreadable XLSX: {e}")
+
+    for row in root.iterfind('main:sheetData/main:row', XLSX_NS):
+        values = []
+        for cell in row.findall('main:c', XLSX_NS):
+            kind = cell.get('t')
+            if kind == 'inlineStr':
+                value = ''.join(cell.find('main:is', XLSX_NS).itertext())
+            else:
+                value = cell.findtext('main:v', default='', namespaces=XLSX_NS)
+                if kind == 's' and value:
+                    value = shared[int(value)]
+            index = _column_index(cell.get('r')) if cell.get('r') else len(values)
+            values.extend([''] * (index - len(values)))
+            values.append(value)
+        yield int(row.get('r', 0)), values
+
+
+def read_rows(upload):
+    """
+    ``[(row number, {column: value})]`` for the data rows of an uploaded CSV or XLSX file.
+    """
+    name = upload.name.lower()
+    if name.endswith('.csv'):
+        lines = _read_csv(upload)
+    elif name.endswith('.xlsx'):
+        lines = _read_xlsx(upload)
+    else:
+        raise ImportFileError("Upload a .csv or .xlsx file")
+
+    header = next(lines, None)
+    if header is None:
+        raise ImportFileError("The file is empty")
+    columns = [str(value).strip().lower() for value in header[1]]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ImportFileError(f"Missing columns: {', '.join(missing)}")
+    unknown = [column for column in columns if column and column not in COLUMNS]
+    if unknown:
+        raise ImportFileError(f"Unknown columns: {', '.join(unknown)}")
+
+    rows = []
+    for number, values in lines:
+        values = [str(value).strip() for value in values]
+        if not any(values):
+            continue
+        rows.append((number, {column: value for column, value in zip(columns, values) if column}))
+        if len(rows) > settings.EMPLOYEE_IMPORT_MAX_ROWS:
+            raise ImportFileError(f"More than {settings.EMPLOYEE_IMPORT_MAX_ROWS} rows; split the file")
+    return rows
+
+
+def _joining_date(value):
+    # Date cells saved without a text format arrive as Excel serial numbers
+    if EXCEL_SERIAL.match(value):
+        return EXCEL_EPOCH + datetime.timedelta(days=int(float(value)))
+    return value
+
+
+def _resolve_departments(rows):
+    """
+    ``{department cell: Department or None}`` in one query; None for unknown names (created on import).
+    """
+    values = {row.get('department') or DEFAULT_DEPARTMENT for _, row in rows}
+    ids = {int(value) for value in values if value.isdigit()}
+    names = {value for value in values if not value.isdigit()}
+    found = Department.objects.filter(Q(pk__in=ids) | Q(name__in=names)).order_by('pk')
+    by_id, by_name = {}, {}
+    for department in found:
+        by_id[department.pk] = department
+        by_name.setdefault(department.name, department)
+    return {value: by_id.get(int(value)) if value.isdigit() else by_name.get(value) for value in values}
+
+
+def validate(rows):
+    """
+    Checks every row. Returns ``(report, entries)``: one report line per row, and
+    ``(user, employee, password, department name)`` for each valid row, unsaved.
+    """
+    emails = [User.objects.normalize_email(row.get('email', '')) for _, row in rows]
+    lowered = [email.lower() for email in emails]
+    # Emails double as usernames, so either column may already hold one
+    taken = set()
+    for existing in (
+        User.objects.annotate(email_lower=Lower('email'), username_lower=Lower('username'))
+        .filter(Q(email_lower__in=lowered) | Q(username_lower__in=lowered))
+        .values_list('email_lower', 'username_lower')
+    ):
+        taken.update(existing)
+    departments = _resolve_departments(rows)
+    seen = set()
+    report, entries = [], []
+
+    for (number, row), email, email_lower in zip(rows, emails, lowered):
+        errors = {}
+        user = User(
+            email=email, username=email, first_name=row.get('first_name', ''), last_name=row.get('last_name', ''),
+            role=row.get('role') or User._meta.get_field('role').default, is_active=True,
+        )
+        employee = Employee(
+            designation=row.get('designation') or DEFAULT_DESIGNATION, phone_number=row.get('phone_number', ''),
+            address=row.get('address', ''), joining_date=_joining_date(row.get('joining_date', '')),
+        )
+        for instance, exclude in ((user, ['password']), (employee, ['user', 'department', 'employee_id'])):
+            try:
+                instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                errors.update(e.message_dict)
+        if email_lower in seen:
+            errors.setdefault('email', []).append('Appears more than once in this file.')
+        elif email_lower in taken:
+            errors.setdefault('email', []).append('A user with this email already exists.')
+        seen.add(email_lower)
+        department = row.get('department') or DEFAULT_DEPARTMENT
+        if department.isdigit() and departments[department] is None:
+            errors.setdefault('department', []).append(f'No department with id {department}.')
+
+        line = {'row': number, 'email': email, 'status': 'invalid' if errors else 'valid'}
+        if errors:
+            line['errors'] = errors
+        else:
+            employee.department = departments[department]
+            entries.append((user, employee, row.get('password', ''), department))
+        report.append(line)
+    return report, entries
+
+
+def password_pool(workers=None):
+    """
+    A process pool for hash_passwords, started once per worker process, or a context
+    yielding None when hashing should stay in this process.
+    """
+    workers = settings.EMPLOYEE_IMPORT_HASH_WORKERS if workers is None else workers
+    if workers <= 1:
+        return nullcontext(None)
+    # Spawned, not forked: a forked child would share the parent's database sockets
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup)
+
+
+def hash_passwords(passwords, pool=None):
+    """
+    make_password for each of ``passwords`` (blank ones become unusable), spread over ``pool`` when given.
+    """
+    hashes = [make_password(None)] * len(passwords)
+    positions = [i for i, password in enumerate(passwords) if password]
+    plain = [passwords[i] for i in positions]
+    if pool is not None and len(plain) >= POOL_MIN_PASSWORDS:
+        hashed = list(pool.map(make_password, plain))
+    else:
+        hashed = [make_password(password) for password in plain]
+    for i, value in zip(positions, hashed):
+        hashes[i] = value
+    return hashes
+
+
+def import_employees(rows, dry_run=False, pool=None):
+    """
+    Validates ``rows`` (from ``read_rows``) and, unless there are errors or ``dry_run`` is set,
+    creates their users and employees, hashing passwords on ``pool`` (see password_pool).
+    Runs in the import worker, not in requests. Returns the report::
+
+        {'created': 2, 'invalid': 0, 'rows': [{'row': 2, 'email': ..., 'status': 'created', 'employee_id': 'EMP-0042'}, ...]}
+    """
+    report, entries = validate(rows)
+    invalid = sum(line['status'] == 'invalid' for line in report)
+    if invalid or dry_run:
+        return {'created': 0, 'invalid': invalid, 'rows': report}
+
+    hashes = hash_passwords([password for _, _, password, _ in entries], pool=pool)
+    batch_size = settings.EMPLOYEE_IMPORT_BATCH_SIZE
+    # Audit entries for the new rows are written in one batch even outside a request
+    with audit_batch(), transaction.atomic():
+        new_names = sorted({name for _, employee, _, name in entries if employee.department is None})
+        created = {department.name: department for department in Department.objects.bulk_create(
+            [Department(name=name) for name in new_names]
+        )}
+        users, employees = [], []
+        for (user, employee, _, name), password, employee_id in zip(
+            entries, hashes, identifiers.allocate_block(len(entries))
+        ):
+            user.password = password
+            employee.department = employee.department or created[name]
+            employee.employee_id = employee_id
+            users.append(user)
+            employees.append(employee)
+        User.objects.bulk_create(users, batch_size=batch_size)
+        for user, employee in zip(users, employees):
+            employee.user = user
+        Employee.objects.bulk_create(employees, batch_size=batch_size)
+        audit_registry.log_bulk_create(User, users)
+        audit_registry.log_bulk_create(Employee, employees)
+
+    for line, employee in zip(report, employees):
+        line.update(status='created', employee_id=employee.employee_id)
+    return {'created': len(employees), 'invalid': 0, 'rows': report}
+
+
+def enqueue_import(rows, requested_by=None, filename=''):
+    """
+    Queues validated ``rows`` for the import worker. Returns the EmployeeImport.
+    """
+    return EmployeeImport.objects.create(
+        requested_by=requested_by, filename=filename, rows=[[number, row] for number, row in rows]
+    )
+
+
+def release_stale_imports(now=None):
+    """
+    Requeues imports left RUNNING by a worker that died; their transaction was rolled back.
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(seconds=settings.EMPLOYEE_IMPORT_TIMEOUT_SECONDS)
+    return EmployeeImport.objects.filter(status=EmployeeImport.Status.RUNNING, started_at__lt=cutoff).update(
+        status=EmployeeImport.Status.QUEUED
+    )
+
+
+def claim_import():
+    """
+    Marks the oldest queued import RUNNING and returns it (None when the queue is empty).
+    """
+    with transaction.atomic():
+        queued = EmployeeImport.objects.filter(status=EmployeeImport.Status.QUEUED).order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        import_id = queued.values_list('id', flat=True).first()
+        if import_id is None:
+            return None
+        claimed = EmployeeImport.objects.filter(id=import_id, status=EmployeeImport.Status.QUEUED).update(
+            status=EmployeeImport.Status.RUNNING, started_at=timezone.now()
+        )
+    if not claimed:
+        return None
+    return EmployeeImport.objects.get(id=import_id)
+
+
+def run_import(job, pool=None):
+    """
+    Imports the job's rows and stores the report. The rows, and the passwords in them, are cleared either way.
+    """
+    try:
+        report = import_employees([(number, row) for number, row in job.rows], pool=pool)
+        job.report = report
+        job.error = 'Some rows are no longer valid; nothing was imported' if report['invalid'] else ''
+        job.status = EmployeeImport.Status.FAILED if report['invalid'] else EmployeeImport.Status.SUCCEEDED
+    except Exception as e:
+        logger.exception("Employee import %s failed", job.pk)
+        job.error = str(e)[:2000]
+        job.status = EmployeeImport.Status.FAILED
+    job.rows = []
+    job.finished_at = timezone.now()
+    job.save(update_fields=['rows', 'report', 'error', 'status', 'finished_at'])
+    return job
+
+
+def drain(pool=None, max_jobs=None):
+    """
+    Runs queued imports until the queue is empty (or ``max_jobs`` have run). Returns the imports run.
+    """
+    release_stale_imports()
+    jobs = []
+    while max_jobs is None or len(jobs) < max_jobs:
+        job = claim_import()
+        if job is None:
+            break
+        jobs.append(run_import(job, pool))
+    return jobs
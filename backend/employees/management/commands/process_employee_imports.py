@@ -0,0 +1,33 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from employees.imports import drain, password_pool
+
+
+class Command(BaseCommand):
+    help = 'Runs queued bulk employee imports, hashing passwords in a process pool; a long-lived worker unless --once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the queued imports and exit')
+        parser.add_argument(
+            '--workers', type=int, default=settings.EMPLOYEE_IMPORT_HASH_WORKERS,
+            help='Password hashing processes, started once for the life of the worker'
+        )
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        with password_pool(options['workers']) as pool:
+            while True:
+                close_old_connections()
+                start = time.perf_counter()
+                jobs = drain(pool=pool)
+                for job in jobs:
+                    created = job.report['created'] if job.report else 0
+                    self.stdout.write(f"Import {job.pk}: {job.status}, {created} created")
+                if jobs:
+                    self.stdout.write(f"{len(jobs)} imports in {time.perf_counter() - start:.2f}s")
+                if options['once']:
+                    return
+                if not jobs:
+                    time.sleep(options['poll_interval'])
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:16
+
+from django.db import migrations, models
+
+
+def start_allocator(apps, schema_editor):
+    """
+    Continues numbering after the highest EMP- id issued by the old count-based scheme.
+    """
+    from employees.identifiers import COUNTER, PREFIX, highest_issued, install_sequence
+
+    Employee = apps.get_model('employees', 'Employee')
+    IdCounter = apps.get_model('employees', 'IdCounter')
+    start = highest_issued(Employee.objects.filter(employee_id__startswith=PREFIX).values_list('employee_id', flat=True))
+    if schema_editor.connection.vendor == 'postgresql':
+        install_sequence(start, connection=schema_editor.connection)
+    else:
+        IdCounter.objects.create(name=COUNTER, last_value=start)
+
+
+def stop_allocator(apps, schema_editor):
+    from employees.identifiers import drop_sequence
+
+    drop_sequence(connection=schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_employee_employee_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(start_allocator, stop_allocator),
+    ]
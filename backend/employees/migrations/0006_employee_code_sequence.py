@@ -0,0 +1,37 @@
+from django.core.management.color import no_style
+from django.db import migrations
+
+
+def separate_sequences(apps, schema_editor):
+    """
+    0005 first shipped with the sequence name employees_employee_id_seq, which is the sequence
+    of Employee.id itself: it found that one, moved it to the highest employee number and
+    shared it with the primary key. Employee numbers now get their own sequence, and the
+    primary key sequence is put back after the highest id.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    from employees.identifiers import PREFIX, SEQUENCE, highest_issued, install_sequence
+
+    Employee = apps.get_model('employees', 'Employee')
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [SEQUENCE])
+        exists = cursor.fetchone()[0] is not None
+    if not exists:
+        start = highest_issued(Employee.objects.filter(employee_id__startswith=PREFIX).values_list('employee_id', flat=True))
+        install_sequence(start, connection=connection)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Employee]):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_id_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(separate_sequences, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,9 @@
+import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 from core.models import TimeStampedModel
+from core.audit import audit_registry
+from . import identifiers
 
 
 User = get_user_model()
@@ -12,6 +15,7 @@ class Department(TimeStampedModel):
     def __str__(self):
         return self.name
 
+@audit_registry.register(redact=['salary', 'bank_account_no', 'national_id'])
 class Employee(TimeStampedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='employee_profile')
     department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, related_name='employees')
@@ -31,30 +35,51 @@ class Employee(TimeStampedModel):
 
     def save(self, *args, **kwargs):
         if not self.employee_id:
-            # Generate ID: EMP-{id}
-            # Only reliable way is to save first to get ID, then update
-            # Or use a sequence. For simplicity, we'll use a count-based approach or UUID.
-            # Getting next ID:
-            last_emp = Employee.objects.all().order_by('id').last()
-            if not last_emp:
-                next_id = 1
-            else:
-                next_id = last_emp.id + 1 if self.pk is None else self.id # If creating, +1. If updating, use self.id? No, confusing.
-                # Better approach: EMP + 4 digit padding of PK
-            
-            # Since we need PK for robust ID, we save first if it's new
-            # BUT save calls save. infinite loop risk.
-            
-            # Alternative: Random/Count based
-            count = Employee.objects.count()
-            self.employee_id = f"EMP-{count + 1:04d}"
-            
-            # Handle collision
-            while Employee.objects.filter(employee_id=self.employee_id).exists():
-                count += 1
-                self.employee_id = f"EMP-{count + 1:04d}"
-
+            self.employee_id = identifiers.allocate()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.employee_id} - {self.user.get_full_name()} ({self.designation})"
+
+
+class IdCounter(models.Model):
+    """
+    Named counters for id allocation on backends without sequences (see employees.identifiers).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+
+class EmployeeImport(models.Model):
+    """
+    A validated bulk import queued for the process_employee_imports worker (see employees.imports).
+    ``rows`` holds the uploaded rows, passwords included, only until the import has run.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    filename = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    rows = models.JSONField(default=list, blank=True)
+    report = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='employee_import_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import of {self.filename} ({self.status})"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Employee, Department
+from .models import Employee, Department, EmployeeImport
 from users.serializers import UserSerializer
 
 class DepartmentSerializer(serializers.ModelSerializer):
@@ -14,3 +14,9 @@ class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id', 'employee_id', 'user', 'department', 'department_details', 'designation', 'phone_number', 'address', 'joining_date', 'is_active']
+
+class EmployeeImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EmployeeImport
+        fields = ['id', 'filename', 'status', 'report', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
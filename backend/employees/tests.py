@@ -1,3 +1,263 @@
-from django.test import TestCase
+import io
+import threading
+import zipfile
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import AuditLog
+from . import identifiers, imports
+from .models import Department, Employee, EmployeeImport, IdCounter
 
-# Create your tests here.
+User = get_user_model()
+
+
+def hire(username, department=None, **fields):
+    user = User.objects.create_user(username=username, email=f'{username}@test.com', password=None)
+    return Employee.objects.create(
+        user=user, department=department, designation='Engineer', joining_date=timezone.now().date(), **fields
+    )
+
+
+class EmployeeIdAllocationTest(TestCase):
+    def test_ids_follow_the_highest_issued_and_blocks_are_contiguous(self):
+        hire('manual', employee_id='EMP-0500')
+        identifiers.resync()
+
+        self.assertEqual(hire('first').employee_id, 'EMP-0501')
+        self.assertEqual(identifiers.allocate_block(3), ['EMP-0502', 'EMP-0503', 'EMP-0504'])
+        hire('older', employee_id='EMP-0400')
+        identifiers.resync()
+        self.assertEqual(hire('second').employee_id, 'EMP-0505')
+        self.assertEqual(identifiers.allocate_block(0), [])
+
+    def test_a_flushed_counter_restarts_after_the_highest_issued(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('PostgreSQL allocates from a sequence, not IdCounter')
+        hire('manual', employee_id='EMP-0700')
+        IdCounter.objects.all().delete()
+
+        self.assertEqual(hire('first').employee_id, 'EMP-0701')
+
+    def test_allocation_cost_does_not_grow_with_the_table(self):
+        def queries_for_one_hire(username):
+            with CaptureQueriesContext(connection) as context:
+                identifiers.allocate()
+            return len(context.captured_queries)
+
+        before = queries_for_one_hire('before')
+        for i in range(20):
+            hire(f'filler{i}')
+        self.assertEqual(queries_for_one_hire('after'), before)
+
+
+class EmployeeIdConcurrencyTest(TransactionTestCase):
+    THREADS = 8
+    HIRES_PER_THREAD = 15
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('shared-cache in-memory SQLite fails lock conflicts instead of waiting on them')
+
+    def test_concurrent_creates_never_share_an_id(self):
+        department = Department.objects.create(name='Platform')
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(n):
+            try:
+                barrier.wait()
+                for i in range(self.HIRES_PER_THREAD):
+                    hire(f'worker{n}-{i}', department=department)
+                identifiers.allocate_block(5)
+            except Exception as e:  # Reported below; a thread's exception would otherwise be lost
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        ids = list(Employee.objects.filter(department=department).values_list('employee_id', flat=True))
+        self.assertEqual(len(ids), self.THREADS * self.HIRES_PER_THREAD)
+        self.assertEqual(len(set(ids)), len(ids))
+        numbers = sorted(int(employee_id.removeprefix(identifiers.PREFIX)) for employee_id in ids)
+        issued = numbers[-1] - numbers[0] + 1
+        self.assertLessEqual(issued, len(ids) + self.THREADS * 5)
+
+
+def csv_upload(*lines, name='staff.csv'):
+    return SimpleUploadedFile(name, '\n'.join(lines).encode(), content_type='text/csv')
+
+
+def xlsx_upload(rows, name='staff.xlsx'):
+    strings = sorted({value for row in rows for value in row if isinstance(value, str)})
+    cells = []
+    for r, row in enumerate(rows, start=1):
+        values = ''.join(
+            f'<c r="{chr(65 + c)}{r}" t="s"><v>{strings.index(value)}</v></c>' if isinstance(value, str)
+            else f'<c r="{chr(65 + c)}{r}"><v>{value}</v></c>'
+            for c, value in enumerate(row)
+        )
+        cells.append(f'<row r="{r}">{values}</row>')
+    main = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('xl/workbook.xml', (
+            f'<workbook xmlns="{main}" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Staff" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>'
+        ))
+        archive.writestr('xl/sharedStrings.xml', f'<sst xmlns="{main}">' + ''.join(
+            f'<si><t>{value}</t></si>' for value in strings
+        ) + '</sst>')
+        archive.writestr('xl/worksheets/sheet1.xml', f'<worksheet xmlns="{main}"><sheetData>{"".join(cells)}</sheetData></worksheet>')
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class EmployeeImportTest(TestCase):
+    def setUp(self):
+        self.engineering = Department.objects.create(name='Engineering')
+        self.hr = User.objects.create_user(username='hr-importer', email='hr-importer@test.com', password=None, role='HR_MANAGER')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.hr)
+
+    def upload(self, upload, **data):
+        return self.client.post('/api/employees/import/', {'file': upload, **data}, format='multipart')
+
+    def run_import(self, upload):
+        """
+        Uploads a file, runs the import worker and returns the finished import's status response.
+        """
+        response = self.upload(upload)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        self.assertEqual(response.data['status'], 'QUEUED')
+        with self.captureOnCommitCallbacks(execute=True):
+            imports.drain()
+        return self.client.get(f"/api/employees/import/{response.data['id']}/")
+
+    def test_csv_rows_are_onboarded_by_the_worker_with_a_report(self):
+        response = self.run_import(csv_upload(
+            'email,first_name,last_name,role,password,department,designation,joining_date',
+            f'ada@corp.test,Ada,Lovelace,TEAM_LEAD,s3cret-pass,{self.engineering.pk},Lead,2024-01-15',
+            'alan@corp.test,Alan,Turing,,,Research,,2024-02-01',
+            '',
+            'grace@corp.test,Grace,Hopper,,,Research,,2024-03-01',
+        ))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'SUCCEEDED')
+        report = response.data['report']
+        self.assertEqual(report['created'], 3)
+        self.assertEqual([line['row'] for line in report['rows']], [2, 3, 5])
+        self.assertEqual(EmployeeImport.objects.get(pk=response.data['id']).rows, [])
+        ada = Employee.objects.select_related('user', 'department').get(user__email='ada@corp.test')
+        self.assertEqual(report['rows'][0]['employee_id'], ada.employee_id)
+        self.assertEqual((ada.user.role, ada.department, ada.designation), ('TEAM_LEAD', self.engineering, 'Lead'))
+        self.assertTrue(ada.user.check_password('s3cret-pass'))
+        alan = Employee.objects.select_related('user').get(user__email='alan@corp.test')
+        self.assertFalse(alan.user.has_usable_password())
+        self.assertEqual(alan.designation, 'Staff')
+        self.assertEqual(Department.objects.filter(name='Research').count(), 1)
+        self.assertEqual(Employee.objects.filter(department__name='Research').count(), 2)
+        self.assertEqual(len({line['employee_id'] for line in report['rows']}), 3)
+        imported = Employee.objects.filter(user__email__endswith='@corp.test').values_list('pk', flat=True)
+        created = AuditLog.objects.filter(model_name='Employee', action='CREATE', object_id__in=[str(pk) for pk in imported])
+        self.assertEqual(created.count(), 3)
+
+    def test_any_invalid_row_rejects_the_whole_file(self):
+        hire('taken', department=self.engineering)
+        User.objects.filter(username='taken').update(email='taken@corp.test')
+
+        response = self.upload(csv_upload(
+            'email,role,department,joining_date',
+            'fine@corp.test,,,2024-01-01',
+            'TAKEN@corp.test,,,2024-01-01',
+            'twice@corp.test,,,2024-01-01',
+            'twice@corp.test,,,2024-01-01',
+            'not-an-email,CEO,999,someday',
+        ))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['invalid'], 3)
+        statuses = [line['status'] for line in response.data['rows']]
+        self.assertEqual(statuses, ['valid', 'invalid', 'valid', 'invalid', 'invalid'])
+        self.assertIn('already exists', response.data['rows'][1]['errors']['email'][0])
+        self.assertIn('more than once', response.data['rows'][3]['errors']['email'][0])
+        self.assertEqual(set(response.data['rows'][4]['errors']), {'email', 'role', 'department', 'joining_date'})
+        self.assertFalse(User.objects.filter(email='fine@corp.test').exists())
+        self.assertFalse(EmployeeImport.objects.exists())
+
+    def test_rows_that_became_invalid_before_the_worker_ran_fail_the_import(self):
+        response = self.upload(csv_upload('email,joining_date', 'late@corp.test,2024-01-01', 'other@corp.test,2024-01-01'))
+        hire('late')
+        User.objects.filter(username='late').update(email='late@corp.test')
+
+        job = imports.drain()[0]
+
+        self.assertEqual(str(job.pk), response.data['id'])
+        self.assertEqual(job.status, EmployeeImport.Status.FAILED)
+        self.assertEqual(job.report['invalid'], 1)
+        self.assertEqual(job.rows, [])
+        self.assertFalse(User.objects.filter(email='other@corp.test').exists())
+
+    def test_dry_run_and_file_errors(self):
+        response = self.upload(csv_upload('email,joining_date', 'dry@corp.test,2024-01-01'), dry_run='true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows'][0]['status'], 'valid')
+        self.assertFalse(User.objects.filter(email='dry@corp.test').exists())
+
+        self.assertEqual(self.upload(csv_upload('email,start', 'x@corp.test,2024')).data['error'], 'Missing columns: joining_date')
+        self.assertEqual(self.upload(csv_upload('a', name='staff.txt')).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('XLSX', self.upload(SimpleUploadedFile('staff.xlsx', b'not a zip')).data['error'])
+
+        employee = User.objects.create_user(username='engineer', email='engineer@test.com', password=None)
+        self.client.force_authenticate(user=employee)
+        self.assertEqual(self.upload(csv_upload('email,joining_date')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_xlsx_with_shared_strings_and_date_serials(self):
+        response = self.run_import(xlsx_upload([
+            ['Email', 'First_Name', 'Joining_Date', 'Department'],
+            ['linus@corp.test', 'Linus', 45306, 'Engineering'],
+            ['margaret@corp.test', 'Margaret', '2024-02-29', 'Engineering'],
+        ]))
+
+        self.assertEqual(response.data['status'], 'SUCCEEDED', response.data)
+        linus = Employee.objects.get(user__email='linus@corp.test')
+        self.assertEqual(str(linus.joining_date), '2024-01-15')
+        self.assertEqual(linus.department, self.engineering)
+        self.assertEqual(linus.user.first_name, 'Linus')
+
+    def test_queries_do_not_grow_with_the_file(self):
+        def queries_for(count, offset):
+            rows = [(n + 2, {'email': f'p{n}@corp.test', 'joining_date': '2024-01-01', 'department': f'Team {n % 3}'})
+                    for n in range(offset, offset + count)]
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(imports.import_employees(rows)['created'], count)
+            return len(context.captured_queries)
+
+        queries_for(3, 0)  # creates the departments
+        self.assertEqual(queries_for(3, 100), queries_for(60, 200))
+
+    def test_passwords_are_hashed_in_worker_processes(self):
+        with mock.patch.object(imports, 'POOL_MIN_PASSWORDS', 2), imports.password_pool(2) as pool:
+            hashes = imports.hash_passwords(['first-secret', '', 'second-secret'], pool=pool)
+
+        user = User(username='check')
+        user.password = hashes[0]
+        self.assertTrue(user.check_password('first-secret'))
+        user.password = hashes[2]
+        self.assertTrue(user.check_password('second-secret'))
+        self.assertTrue(hashes[1].startswith('!'))
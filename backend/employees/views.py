@@ -1,10 +1,15 @@
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django.db import transaction
+from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from .models import Employee, Department
-from .serializers import EmployeeSerializer, DepartmentSerializer
+from .imports import ImportFileError, enqueue_import, import_employees, read_rows
+from .models import Employee, Department, EmployeeImport
+from .serializers import EmployeeSerializer, DepartmentSerializer, EmployeeImportSerializer
 from users.permissions import IsAdmin, IsHR, IsManager, IsEmployee, IsAdminOrHR
+from core.prefetch import SerializerRelationsMixin
 
 User = get_user_model()
 
@@ -19,7 +24,7 @@ class DepartmentViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAuthenticated, IsAdminOrHR]
         return [permission() for permission in permission_classes]
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
     
@@ -27,7 +32,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action == 'create':
+        if self.action in ['create', 'bulk_import', 'import_status']:
             permission_classes = [permissions.IsAuthenticated, IsAdmin | IsHR | IsManager]
         elif self.action == 'destroy':
             permission_classes = [permissions.IsAuthenticated, IsAdmin | IsHR]
@@ -117,3 +122,35 @@ class EmployeeViewSet(viewsets.ModelViewSet):
 
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Validates every row of an uploaded CSV/XLSX ``file`` (see employees.imports) and queues
+        the file for the import worker, or rejects it with a per-row report if any row is invalid.
+        ``dry_run=true`` only validates. Answers 202 with the import to poll at ``import/<id>/``.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or XLSX file as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = read_rows(upload)
+        except ImportFileError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        report = import_employees(rows, dry_run=True)
+        if report['invalid']:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        if dry_run:
+            return Response(report, status=status.HTTP_200_OK)
+        job = enqueue_import(rows, requested_by=request.user, filename=upload.name)
+        return Response(EmployeeImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'import/(?P<import_id>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})')
+    def import_status(self, request, import_id=None):
+        """
+        Status of a queued import, with its per-row report once it has run.
+        """
+        job = get_object_or_404(EmployeeImport, id=import_id)
+        return Response(EmployeeImportSerializer(job).data)
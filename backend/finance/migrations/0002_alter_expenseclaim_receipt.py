@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:48
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expenseclaim',
+            name='receipt',
+            field=models.FileField(blank=True, null=True, storage=core.storage.get_blob_storage, upload_to='expenses/%Y/%m/'),
+        ),
+    ]
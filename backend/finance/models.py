@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from core.models import TimeStampedModel
 from employees.models import Employee
+from core.storage import blob_registry, get_blob_storage
 
 User = get_user_model()
 
@@ -40,6 +41,7 @@ class Payslip(TimeStampedModel):
     def __str__(self):
         return f"Payslip - {self.employee} - {self.month.strftime('%B %Y')}"
 
+@blob_registry.register('receipt')
 class ExpenseClaim(TimeStampedModel):
     class Category(models.TextChoices):
         TRAVEL = 'TRAVEL', 'Travel'
@@ -57,7 +59,7 @@ class ExpenseClaim(TimeStampedModel):
     title = models.CharField(max_length=255)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     category = models.CharField(max_length=20, choices=Category.choices)
-    receipt = models.FileField(upload_to='expenses/%Y/%m/', blank=True, null=True)
+    receipt = models.FileField(upload_to='expenses/%Y/%m/', storage=get_blob_storage, blank=True, null=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_expenses')
     rejection_reason = models.TextField(blank=True)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import SalaryStructure, Payslip, ExpenseClaim
 from employees.serializers import EmployeeSerializer
+from core.downloads import SignedDownloadURLField
 
 class SalaryStructureSerializer(serializers.ModelSerializer):
     net_salary = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -20,8 +21,10 @@ class PayslipSerializer(serializers.ModelSerializer):
 
 class ExpenseClaimSerializer(serializers.ModelSerializer):
     approved_by_name = serializers.ReadOnlyField(source='approved_by.get_full_name')
+    receipt_url = SignedDownloadURLField('expense-claim-receipt', file_field='receipt')
 
     class Meta:
         model = ExpenseClaim
-        fields = ['id', 'employee', 'title', 'amount', 'category', 'receipt', 'status', 'approved_by', 'approved_by_name', 'rejection_reason', 'created_at']
+        fields = ['id', 'employee', 'title', 'amount', 'category', 'receipt', 'receipt_url', 'status', 'approved_by', 'approved_by_name', 'rejection_reason', 'created_at']
         read_only_fields = ['employee', 'status', 'approved_by', 'rejection_reason', 'created_at']
+        select_related = ['approved_by']
@@ -7,6 +7,8 @@ from .serializers import SalaryStructureSerializer, PayslipSerializer, ExpenseCl
 from users.permissions import IsAdmin, IsManager, IsEmployee
 from users.permissions import IsAdmin, IsManager, IsEmployee
 from rest_framework.pagination import PageNumberPagination
+from core.downloads import DOWNLOAD_AUTHENTICATION_CLASSES, serve_file
+from core.prefetch import SerializerRelationsMixin
 
 class IsAccountant(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -20,7 +22,7 @@ class SalaryStructureViewSet(viewsets.ModelViewSet):
     filterset_fields = ['employee__id']
     search_fields = ['employee__user__first_name', 'employee__user__last_name']
 
-class PayslipViewSet(viewsets.ModelViewSet):
+class PayslipViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = Payslip.objects.all()
     serializer_class = PayslipSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -43,7 +45,7 @@ class PayslipViewSet(viewsets.ModelViewSet):
         # Logic to iterate visible employees and create payslips based on SalaryStructure
         return Response({"status": "Bulk generation logic to be implemented"}, status=status.HTTP_200_OK)
 
-class ExpenseClaimViewSet(viewsets.ModelViewSet):
+class ExpenseClaimViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = ExpenseClaim.objects.all()
     serializer_class = ExpenseClaimSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -70,6 +72,13 @@ class ExpenseClaimViewSet(viewsets.ModelViewSet):
         else:
              serializer.save() # Admin creating?
 
+    @action(detail=True, methods=['get'], authentication_classes=DOWNLOAD_AUTHENTICATION_CLASSES)
+    def receipt(self, request, pk=None):
+        claim = self.get_object()
+        if not claim.receipt:
+            return Response({'error': 'No receipt attached'}, status=status.HTTP_404_NOT_FOUND)
+        return serve_file(request, claim.receipt)
+
     @action(detail=True, methods=['post'], permission_classes=[IsManager | IsAccountant]) # Allow Manager or Finance to approve
     def approve(self, request, pk=None):
         claim = self.get_object()
@@ -1,10 +1,12 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from core.models import TimeStampedModel
+from core.audit import audit_registry
 from employees.models import Employee
 
 User = get_user_model()
 
+@audit_registry.register
 class Leave(TimeStampedModel):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leaves')
     
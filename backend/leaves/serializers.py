@@ -9,3 +9,4 @@ class LeaveSerializer(serializers.ModelSerializer):
         model = Leave
         fields = '__all__'
         read_only_fields = ['employee', 'status', 'approver', 'rejection_reason']
+        select_related = ['employee__user', 'approver']
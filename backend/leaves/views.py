@@ -3,8 +3,9 @@ from rest_framework.response import Response
 from .models import Leave
 from .serializers import LeaveSerializer
 from users.permissions import IsAdminOrHR, IsManager
+from core.prefetch import SerializerRelationsMixin
 
-class LeaveViewSet(viewsets.ModelViewSet):
+class LeaveViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     serializer_class = LeaveSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -1,54 +1,166 @@
 import openai
 from django.conf import settings
+from django.utils.module_loading import import_string
+import hashlib
 import json
+import logging
+import os
+import re
+import time
 
 # Ensure OPENAI_API_KEY is set in settings.py or environment
 openai.api_key = getattr(settings, 'OPENAI_API_KEY', None)
 
+logger = logging.getLogger(__name__)
+
+ANALYSIS_PROMPT = """
+    You are an AI meeting assistant. Analyze the following meeting transcript.
+
+    1. Provide a concise summary of the meeting.
+    2. Extract clear, actionable items from the discussion.
+
+    Transcript:
+    {transcript_text}
+
+    Return the result in valid JSON format with keys: "summary" and "action_items".
+    """
+
+
+class MeetingAIError(Exception):
+    """Raised by a provider when transcription or analysis fails."""
+
+
+class MeetingAIProvider:
+    """
+    Transcription and analysis backend used by the meeting processing jobs.
+
+    ``transcribe`` returns the transcript text of an audio file; ``analyze`` returns
+    ``{"summary": str, "action_items": [str, ...]}``. Both raise MeetingAIError on failure.
+    ``transcription_model`` and ``analysis_model`` name the models behind each call; results
+    are cached per model (see meetings.cache), so change them when the output would change.
+    """
+    name = None
+    transcription_model = None
+    analysis_model = None
+
+    def transcribe(self, file_path):
+        raise NotImplementedError
+
+    def analyze(self, transcript_text):
+        raise NotImplementedError
+
+
+class OpenAIProvider(MeetingAIProvider):
+    """
+    Whisper for transcription, GPT-4o for the summary and action items.
+    """
+    name = 'openai'
+    transcription_model = 'whisper-1'
+    analysis_model = 'gpt-4o'
+
+    def transcribe(self, file_path):
+        try:
+            with open(file_path, "rb") as audio_file:
+                transcript = openai.audio.transcriptions.create(
+                    model=self.transcription_model,
+                    file=audio_file
+                )
+            return transcript.text
+        except Exception as e:
+            raise MeetingAIError(f"Error transcribing audio: {e}") from e
+
+    def analyze(self, transcript_text):
+        try:
+            response = openai.chat.completions.create(
+                model=self.analysis_model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that analyzes meeting transcripts."},
+                    {"role": "user", "content": ANALYSIS_PROMPT.format(transcript_text=transcript_text)}
+                ],
+                response_format={"type": "json_object"}
+            )
+            return json.loads(response.choices[0].message.content)
+        except Exception as e:
+            raise MeetingAIError(f"Error analyzing meeting: {e}") from e
+
+
+class FakeProvider(MeetingAIProvider):
+    """
+    Offline provider for tests and load tests. Transcripts are derived from the file's
+    bytes (deterministic), action items are the sentences starting with "Action:" or
+    "TODO". MEETING_AI_FAKE_LATENCY adds a sleep per call to mimic the real API.
+    """
+    name = 'fake'
+    transcription_model = 'fake'
+    analysis_model = 'fake'
+
+    def __init__(self, latency=None):
+        self.latency = getattr(settings, 'MEETING_AI_FAKE_LATENCY', 0.0) if latency is None else latency
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def transcribe(self, file_path):
+        self._wait()
+        try:
+            with open(file_path, 'rb') as audio_file:
+                data = audio_file.read()
+        except OSError as e:
+            raise MeetingAIError(f"Error transcribing audio: {e}") from e
+        try:
+            # Text files stand in for audio in tests: their content is the transcript
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            return f"Transcript of {os.path.basename(file_path)} ({len(data)} bytes, {digest})."
+
+    def analyze(self, transcript_text):
+        self._wait()
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n', transcript_text) if s.strip()]
+        action_items = [
+            re.sub(r'^(action:|todo:?)\s*', '', s, flags=re.IGNORECASE)
+            for s in sentences if re.match(r'^(action:|todo)', s, flags=re.IGNORECASE)
+        ]
+        return {
+            'summary': sentences[0] if sentences else '',
+            'action_items': action_items,
+        }
+
+
+PROVIDERS = {
+    OpenAIProvider.name: OpenAIProvider,
+    FakeProvider.name: FakeProvider,
+}
+
+
+def get_provider(name=None):
+    """
+    Returns the provider named by ``name`` or settings.MEETING_AI_PROVIDER: a key of
+    PROVIDERS or the dotted path of a MeetingAIProvider subclass.
+    """
+    name = name or getattr(settings, 'MEETING_AI_PROVIDER', OpenAIProvider.name)
+    provider_class = PROVIDERS.get(name) or import_string(name)
+    return provider_class()
+
+
 def transcribe_audio(file_path):
     """
-    Transcribes audio file using OpenAI Whisper model.
+    Transcribes audio file using the configured provider (OpenAI Whisper by default).
     """
     try:
-        with open(file_path, "rb") as audio_file:
-            transcript = openai.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file
-            )
-        return transcript.text
-    except Exception as e:
-        print(f"Error transcribing audio: {e}")
+        return get_provider().transcribe(file_path)
+    except MeetingAIError as e:
+        logger.warning("Transcription of %s failed: %s", file_path, e)
         return None
 
 def analyze_meeting(transcript_text):
     """
-    Analyzes meeting transcript using OpenAI GPT-4o to extract summary and action items.
+    Analyzes meeting transcript using the configured provider (OpenAI GPT-4o by default) to extract summary and action items.
     Returns a dict with 'summary' (str) and 'action_items' (list of str).
     """
-    prompt = f"""
-    You are an AI meeting assistant. Analyze the following meeting transcript.
-    
-    1. Provide a concise summary of the meeting.
-    2. Extract clear, actionable items from the discussion.
-    
-    Transcript:
-    {transcript_text}
-    
-    Return the result in valid JSON format with keys: "summary" and "action_items".
-    """
-    
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that analyzes meeting transcripts."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        content = response.choices[0].message.content
-        return json.loads(content)
-    except Exception as e:
-        print(f"Error analyzing meeting: {e}")
+        return get_provider().analyze(transcript_text)
+    except MeetingAIError as e:
+        logger.warning("Meeting analysis failed: %s", e)
         return None
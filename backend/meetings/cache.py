@@ -0,0 +1,107 @@
+"""
+Durable cache of AI transcription and analysis results.
+
+Transcripts are keyed on the SHA-256 of the audio file, analyses on the SHA-256 of
+the transcript text, and both on the model that produced them, so reprocessing a
+recording or processing a duplicate upload never calls the provider again. The
+cache lives in the database (AIResultCache) and is trimmed back under
+MEETING_AI_CACHE_MAX_BYTES by evicting the least recently used entries.
+"""
+import hashlib
+import json
+import logging
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import AIResultCache
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT = AIResultCache.Kind.TRANSCRIPT
+ANALYSIS = AIResultCache.Kind.ANALYSIS
+
+HASH_CHUNK_SIZE = 1024 * 1024
+EVICT_BATCH_SIZE = 500
+
+
+def file_sha256(file):
+    """
+    Hex SHA-256 of a path or a Django File, read in chunks.
+    """
+    digest = hashlib.sha256()
+    if isinstance(file, str):
+        with open(file, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    else:
+        for chunk in file.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        file.seek(0)
+    return digest.hexdigest()
+
+
+def text_sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def model_key(provider, kind):
+    """
+    ``"<provider>:<model>"`` for the model ``provider`` uses for ``kind``.
+    """
+    model = provider.transcription_model if kind == TRANSCRIPT else provider.analysis_model
+    return f"{provider.name or type(provider).__name__}:{model or ''}"
+
+
+def lookup(kind, input_sha256, model):
+    """
+    Returns the cached result or None, marking the entry as used.
+    """
+    entries = AIResultCache.objects.filter(kind=kind, input_sha256=input_sha256, model=model)
+    result = entries.values_list('result', flat=True).first()
+    if result is not None:
+        entries.update(hits=F('hits') + 1, last_used_at=timezone.now())
+    return result
+
+
+def store(kind, input_sha256, model, result):
+    size = len(json.dumps(result).encode('utf-8'))
+    AIResultCache.objects.update_or_create(
+        kind=kind, input_sha256=input_sha256, model=model,
+        defaults={'result': result, 'size_bytes': size, 'last_used_at': timezone.now()},
+    )
+    evict()
+
+
+def cached(kind, input_sha256, model, compute):
+    """
+    Returns ``(result, hit)``, calling ``compute()`` and storing its result on a miss.
+    """
+    result = lookup(kind, input_sha256, model)
+    if result is not None:
+        return result, True
+    result = compute()
+    store(kind, input_sha256, model, result)
+    return result, False
+
+
+def evict(max_bytes=None):
+    """
+    Deletes least recently used entries until the cache fits in ``max_bytes``
+    (MEETING_AI_CACHE_MAX_BYTES by default). Returns the number of entries deleted.
+    """
+    max_bytes = settings.MEETING_AI_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    total = AIResultCache.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+    if total <= max_bytes:
+        return 0
+
+    doomed = []
+    for entry_id, size in AIResultCache.objects.order_by('last_used_at', 'id').values_list('id', 'size_bytes').iterator():
+        if total <= max_bytes:
+            break
+        doomed.append(entry_id)
+        total -= size
+
+    for start in range(0, len(doomed), EVICT_BATCH_SIZE):
+        AIResultCache.objects.filter(id__in=doomed[start:start + EVICT_BATCH_SIZE]).delete()
+    logger.info("Evicted %s AI result cache entries", len(doomed))
+    return len(doomed)
@@ -0,0 +1,208 @@
+"""
+Background processing of meeting recordings.
+
+ProcessMeetingView only queues a ProcessingJob; the ``process_meeting_jobs`` worker
+claims queued jobs, transcribes and analyzes the recording with the configured
+provider (see ai_utils.get_provider) and records status and progress on the
+Recording so the frontend can poll it. Results are cached by input hash (see
+meetings.cache): a recording whose transcript and analysis are already cached is
+completed as soon as it is queued, without waiting for a worker.
+"""
+import datetime
+import logging
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from . import cache
+from .ai_utils import MeetingAIError, get_provider
+from .models import Recording, ProcessingJob, Transcript, ActionItem
+from .transcription import ChunkedTranscriber
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = [ProcessingJob.Status.QUEUED, ProcessingJob.Status.RUNNING]
+
+
+def enqueue_processing(recording, requested_by=None, provider=None):
+    """
+    Queues a processing run for ``recording`` unless one is already queued or running.
+    When both results are cached the job is created SUCCEEDED instead. Returns ``(job, created)``.
+    """
+    provider = provider or get_provider()
+    with transaction.atomic():
+        recording = Recording.objects.select_for_update().get(pk=recording.pk)
+        job = recording.jobs.filter(status__in=ACTIVE_STATUSES).first()
+        if job:
+            return job, False
+        results = cached_results(recording, provider)
+        if results:
+            save_results(recording, *results)
+            now = timezone.now()
+            job = ProcessingJob.objects.create(
+                recording=recording, requested_by=requested_by, status=ProcessingJob.Status.SUCCEEDED,
+                provider=provider_label(provider), started_at=now, finished_at=now,
+            )
+            return job, True
+        job = ProcessingJob.objects.create(recording=recording, requested_by=requested_by)
+        set_progress(recording, Recording.ProcessingStatus.QUEUED, 0, error='')
+    return job, True
+
+
+def provider_label(provider):
+    return provider.name or type(provider).__name__
+
+
+def cached_results(recording, provider):
+    """
+    ``(transcript_text, analysis)`` when both are cached for the recording's audio, else None.
+    Only uses the hash stored at upload; the worker hashes files uploaded without one.
+    """
+    if not recording.sha256:
+        return None
+    transcript_text = cache.lookup(cache.TRANSCRIPT, recording.sha256, cache.model_key(provider, cache.TRANSCRIPT))
+    if not transcript_text:
+        return None
+    analysis = cache.lookup(cache.ANALYSIS, cache.text_sha256(transcript_text), cache.model_key(provider, cache.ANALYSIS))
+    if analysis is None:
+        return None
+    return transcript_text, analysis
+
+
+def set_progress(recording, status, progress, error=None):
+    fields = {'processing_status': status, 'processing_progress': progress}
+    if error is not None:
+        fields['processing_error'] = error
+    Recording.objects.filter(pk=recording.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(recording, name, value)
+
+
+def release_stale_jobs(now=None):
+    """
+    Requeues jobs left RUNNING by a worker that died.
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(seconds=settings.MEETING_JOB_TIMEOUT_SECONDS)
+    return ProcessingJob.objects.filter(status=ProcessingJob.Status.RUNNING, started_at__lt=cutoff).update(
+        status=ProcessingJob.Status.QUEUED
+    )
+
+
+def claim_job():
+    """
+    Marks the oldest queued job RUNNING and returns it (None when the queue is empty).
+    """
+    with transaction.atomic():
+        queued = ProcessingJob.objects.filter(status=ProcessingJob.Status.QUEUED).order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        job_id = queued.values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = ProcessingJob.objects.filter(id=job_id, status=ProcessingJob.Status.QUEUED).update(
+            status=ProcessingJob.Status.RUNNING, started_at=timezone.now()
+        )
+    if not claimed:
+        return None
+    return ProcessingJob.objects.select_related('recording__meeting').get(id=job_id)
+
+
+def save_results(recording, transcript_text, analysis):
+    """
+    Stores the transcript, summary and action items. Action items already converted
+    to tasks are kept when a recording is processed again.
+    """
+    with transaction.atomic():
+        transcript, _ = Transcript.objects.get_or_create(recording=recording, defaults={'content': transcript_text})
+        transcript.content = transcript_text
+        transcript.summary = analysis.get('summary', '')
+        transcript.save()
+
+        transcript.action_items.filter(task__isnull=True).delete()
+        ActionItem.objects.bulk_create([
+            ActionItem(transcript=transcript, description=str(item)[:255])
+            for item in analysis.get('action_items', [])
+        ])
+
+        recording.processed = True
+        recording.save(update_fields=['processed'])
+        set_progress(recording, Recording.ProcessingStatus.DONE, 100, error='')
+    return transcript
+
+
+def transcribe(provider, recording):
+    transcript_text = ChunkedTranscriber(provider).transcribe(
+        recording.file.path,
+        progress=lambda done, total: set_progress(
+            recording, Recording.ProcessingStatus.TRANSCRIBING, 10 + 50 * done // total
+        ),
+    )
+    if not transcript_text:
+        raise MeetingAIError("Transcription returned no text")
+    return transcript_text
+
+
+def run_job(job, provider=None):
+    """
+    Transcribes and analyzes the job's recording. Failures are retried up to
+    MEETING_JOB_MAX_ATTEMPTS times before the job and recording are marked FAILED.
+    """
+    provider = provider or get_provider()
+    recording = job.recording
+    job.attempts += 1
+    job.provider = provider_label(provider)
+    ProcessingJob.objects.filter(pk=job.pk).update(attempts=job.attempts, provider=job.provider)
+
+    try:
+        if not recording.file:
+            raise MeetingAIError("Recording file is missing")
+
+        if not recording.sha256:
+            recording.sha256 = cache.file_sha256(recording.file.path)
+            Recording.objects.filter(pk=recording.pk).update(sha256=recording.sha256)
+
+        set_progress(recording, Recording.ProcessingStatus.TRANSCRIBING, 10)
+        transcript_text, _ = cache.cached(
+            cache.TRANSCRIPT, recording.sha256, cache.model_key(provider, cache.TRANSCRIPT),
+            lambda: transcribe(provider, recording),
+        )
+
+        set_progress(recording, Recording.ProcessingStatus.ANALYZING, 60)
+        analysis, _ = cache.cached(
+            cache.ANALYSIS, cache.text_sha256(transcript_text), cache.model_key(provider, cache.ANALYSIS),
+            lambda: provider.analyze(transcript_text) or {},
+        )
+
+        save_results(recording, transcript_text, analysis)
+    except Exception as e:
+        retry = job.attempts < settings.MEETING_JOB_MAX_ATTEMPTS
+        logger.warning("Meeting job %s failed (attempt %s): %s", job.pk, job.attempts, e)
+        job.status = ProcessingJob.Status.QUEUED if retry else ProcessingJob.Status.FAILED
+        job.error = str(e)[:2000]
+        job.finished_at = None if retry else timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        if retry:
+            set_progress(recording, Recording.ProcessingStatus.QUEUED, 0, error=job.error)
+        else:
+            set_progress(recording, Recording.ProcessingStatus.FAILED, recording.processing_progress, error=job.error)
+        return job
+
+    job.status = ProcessingJob.Status.SUCCEEDED
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def drain(provider=None, max_jobs=None):
+    """
+    Runs queued jobs until the queue is empty (or ``max_jobs`` have run). Returns the jobs run.
+    """
+    release_stale_jobs()
+    jobs = []
+    while max_jobs is None or len(jobs) < max_jobs:
+        job = claim_job()
+        if job is None:
+            break
+        jobs.append(run_job(job, provider))
+    return jobs
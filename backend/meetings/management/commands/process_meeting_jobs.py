@@ -0,0 +1,55 @@
+import time
+import threading
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from meetings.ai_utils import get_provider
+from meetings.jobs import drain
+
+
+class Command(BaseCommand):
+    help = 'Runs queued meeting transcription/analysis jobs; a long-lived worker unless --once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the queued jobs and exit')
+        parser.add_argument('--workers', type=int, default=1, help='Jobs processed in parallel (threads)')
+        parser.add_argument('--provider', help="Override MEETING_AI_PROVIDER, e.g. 'fake' for offline load tests")
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        provider = get_provider(options['provider'])
+        lock = threading.Lock()
+        totals = {'succeeded': 0, 'failed': 0}
+        start = time.perf_counter()
+
+        def work():
+            try:
+                while True:
+                    close_old_connections()
+                    jobs = drain(provider=provider)
+                    with lock:
+                        for job in jobs:
+                            # A failed attempt that will be retried comes back QUEUED
+                            if job.status == job.Status.SUCCEEDED:
+                                totals['succeeded'] += 1
+                            elif job.status == job.Status.FAILED:
+                                totals['failed'] += 1
+                            self.stdout.write(f"Job {job.pk}: {job.status}")
+                    if options['once']:
+                        return
+                    if not jobs:
+                        time.sleep(options['poll_interval'])
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(max(options['workers'], 1))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+        finished = totals['succeeded'] + totals['failed']
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['succeeded']} succeeded, {totals['failed']} failed in {elapsed:.2f}s "
+            f"({finished / elapsed if elapsed else 0:.2f} jobs/s)"
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from meetings.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes resumable recording uploads left unfinished for MEETING_UPLOAD_EXPIRY_HOURS (run periodically, e.g. hourly cron)'
+
+    def handle(self, *args, **options):
+        purged = purge_stale_uploads()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} stale upload(s)"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_processed_recordings_done(apps, schema_editor):
+    Recording = apps.get_model('meetings', 'Recording')
+    Recording.objects.filter(processed=True).update(processing_status='DONE', processing_progress=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0003_recording_transcript_actionitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recording',
+            name='processing_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='recording',
+            name='processing_progress',
+            field=models.PositiveSmallIntegerField(default=0, help_text='0-100'),
+        ),
+        migrations.AddField(
+            model_name='recording',
+            name='processing_status',
+            field=models.CharField(choices=[('IDLE', 'Not processed'), ('QUEUED', 'Queued'), ('TRANSCRIBING', 'Transcribing'), ('ANALYZING', 'Analyzing'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='IDLE', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('SUCCEEDED', 'Succeeded'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('provider', models.CharField(blank=True, max_length=50)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('recording', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='meetings.recording')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='meeting_job_queue_idx')],
+            },
+        ),
+        migrations.RunPython(mark_processed_recordings_done, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0004_processing_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recording',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='Hash of the audio file, keys the AI result cache', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='AIResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('TRANSCRIPT', 'Transcript'), ('ANALYSIS', 'Analysis')], max_length=10)),
+                ('input_sha256', models.CharField(max_length=64)),
+                ('model', models.CharField(max_length=100)),
+                ('result', models.JSONField()),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'input_sha256', 'model'), name='unique_ai_result')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:48
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0006_recording_uploads'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recording',
+            name='file',
+            field=models.FileField(storage=core.storage.get_blob_storage, upload_to='recordings/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0007_alter_recording_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordingupload',
+            name='writer',
+            field=models.UUIDField(blank=True, help_text='Request currently writing a chunk', null=True),
+        ),
+        migrations.AddField(
+            model_name='recordingupload',
+            name='writing_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
+from core.storage import blob_registry, get_blob_storage
 
 class Meeting(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -20,15 +22,109 @@ class Meeting(models.Model):
     def __str__(self):
         return f"{self.title} ({self.room_id})"
 
+@blob_registry.register('file')
 class Recording(models.Model):
+    class ProcessingStatus(models.TextChoices):
+        IDLE = 'IDLE', 'Not processed'
+        QUEUED = 'QUEUED', 'Queued'
+        TRANSCRIBING = 'TRANSCRIBING', 'Transcribing'
+        ANALYZING = 'ANALYZING', 'Analyzing'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
     meeting = models.OneToOneField(Meeting, on_delete=models.CASCADE, related_name='recording')
-    file = models.FileField(upload_to='recordings/')
+    file = models.FileField(upload_to='recordings/', storage=get_blob_storage)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     processed = models.BooleanField(default=False)
+    processing_status = models.CharField(max_length=20, choices=ProcessingStatus.choices, default=ProcessingStatus.IDLE)
+    processing_progress = models.PositiveSmallIntegerField(default=0, help_text="0-100")
+    processing_error = models.TextField(blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, help_text="Hash of the audio file, keys the AI result cache")
 
     def __str__(self):
         return f"Recording for {self.meeting.title}"
 
+class ProcessingJob(models.Model):
+    """
+    A queued transcription + analysis run for a recording, picked up by the process_meeting_jobs worker.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    recording = models.ForeignKey(Recording, on_delete=models.CASCADE, related_name='jobs')
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    provider = models.CharField(max_length=50, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='meeting_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Processing {self.recording} ({self.status})"
+
+class RecordingUpload(models.Model):
+    """
+    A resumable, chunked upload of a meeting recording. Chunks are written at their offset
+    into a partial file (see meetings.uploads) that becomes the Recording's file on completion.
+    """
+    class Status(models.TextChoices):
+        ACTIVE = 'ACTIVE', 'Receiving'
+        COMPLETE = 'COMPLETE', 'Complete'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='recording_uploads')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far")
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Expected hash, checked on completion")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.ACTIVE)
+    writer = models.UUIDField(null=True, blank=True, help_text="Request currently writing a chunk")
+    writing_since = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.offset}/{self.size})"
+
+class AIResultCache(models.Model):
+    """
+    A transcription or analysis result keyed by the SHA-256 of its input and the model that produced it.
+    Least recently used entries are evicted once the cache exceeds MEETING_AI_CACHE_MAX_BYTES.
+    """
+    class Kind(models.TextChoices):
+        TRANSCRIPT = 'TRANSCRIPT', 'Transcript'
+        ANALYSIS = 'ANALYSIS', 'Analysis'
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    input_sha256 = models.CharField(max_length=64)
+    model = models.CharField(max_length=100)
+    result = models.JSONField()
+    size_bytes = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'input_sha256', 'model'], name='unique_ai_result'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.input_sha256[:12]} ({self.model})"
+
 class Transcript(models.Model):
     recording = models.OneToOneField(Recording, on_delete=models.CASCADE, related_name='transcript')
     content = models.TextField()
@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Meeting, Recording, Transcript, ActionItem
+from tasks.models import Task
+from core.downloads import SignedDownloadURLField
+from .models import Meeting, Recording, Transcript, ActionItem, ProcessingJob, RecordingUpload
 
 class MeetingSerializer(serializers.ModelSerializer):
     host_name = serializers.CharField(source='host.get_full_name', read_only=True)
@@ -8,6 +10,7 @@ class MeetingSerializer(serializers.ModelSerializer):
         model = Meeting
         fields = ['id', 'host', 'host_name', 'title', 'room_id', 'created_at', 'is_active', 'daily_url']
         read_only_fields = ['id', 'host', 'room_id', 'created_at']
+        select_related = ['host']
 
 class ActionItemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -25,9 +28,65 @@ class TranscriptSerializer(serializers.ModelSerializer):
 
 class RecordingSerializer(serializers.ModelSerializer):
     transcript = TranscriptSerializer(read_only=True)
+    download_url = SignedDownloadURLField('recording-download', url_kwargs={'meeting_id': 'meeting_id'})
     
     class Meta:
         model = Recording
-        fields = ['id', 'meeting', 'file', 'uploaded_at', 'processed', 'transcript']
-        read_only_fields = ['id', 'uploaded_at', 'processed', 'transcript']
+        fields = ['id', 'meeting', 'file', 'download_url', 'uploaded_at', 'processed', 'processing_status', 'processing_progress', 'processing_error', 'transcript']
+        read_only_fields = ['id', 'uploaded_at', 'processed', 'processing_status', 'processing_progress', 'processing_error', 'transcript']
 
+class ProcessingJobSerializer(serializers.ModelSerializer):
+    recording_status = serializers.CharField(source='recording.processing_status', read_only=True)
+    progress = serializers.IntegerField(source='recording.processing_progress', read_only=True)
+
+    class Meta:
+        model = ProcessingJob
+        fields = ['id', 'recording', 'status', 'recording_status', 'progress', 'attempts', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+        select_related = ['recording']
+
+
+class RecordingUploadSerializer(serializers.ModelSerializer):
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+
+    class Meta:
+        model = RecordingUpload
+        fields = ['id', 'meeting', 'filename', 'size', 'offset', 'sha256', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'meeting', 'offset', 'status', 'created_at', 'updated_at']
+
+class ActionItemConversionSerializer(serializers.Serializer):
+    action_item = serializers.IntegerField()
+    assigned_to = serializers.IntegerField(required=False)
+    due_date = serializers.DateTimeField(required=False, input_formats=['iso-8601', '%Y-%m-%d'])
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False)
+
+class BulkActionItemConversionSerializer(serializers.Serializer):
+    """
+    ``items`` to convert; ``assigned_to``, ``due_date`` and ``priority`` given at the top level
+    apply to every item that does not set its own.
+    """
+    items = ActionItemConversionSerializer(many=True, allow_empty=False, max_length=500)
+    assigned_to = serializers.IntegerField(required=False)
+    due_date = serializers.DateTimeField(required=False, input_formats=['iso-8601', '%Y-%m-%d'])
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, default=Task.Priority.MEDIUM)
+
+    def validate(self, attrs):
+        conversions = []
+        errors = {}
+        for index, item in enumerate(attrs['items']):
+            conversion = {
+                'action_item': item['action_item'],
+                'assigned_to': item.get('assigned_to', attrs.get('assigned_to')),
+                'due_date': item.get('due_date', attrs.get('due_date')),
+                'priority': item.get('priority', attrs['priority']),
+            }
+            missing = [field for field in ('assigned_to', 'due_date') if conversion[field] is None]
+            if missing:
+                errors[index] = {field: "This field is required." for field in missing}
+            conversions.append(conversion)
+        ids = [conversion['action_item'] for conversion in conversions]
+        if len(set(ids)) != len(ids):
+            errors['items'] = "Each action item can only be converted once."
+        if errors:
+            raise serializers.ValidationError(errors)
+        return {'conversions': conversions}
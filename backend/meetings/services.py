@@ -0,0 +1,61 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from employees.models import Employee
+from tasks.models import Task
+from tasks.services import TaskService
+from .models import ActionItem
+
+
+class ActionItemService:
+    @staticmethod
+    def task_title(action_item):
+        return f"Task from Meeting: {action_item.description[:50]}..."
+
+    @classmethod
+    def convert_to_tasks(cls, conversions, assigned_by):
+        """
+        Turns action items into tasks in one transaction. ``conversions`` are dicts with
+        ``action_item``, ``assigned_to`` (employee id), ``due_date`` and ``priority``.
+        Tasks are inserted with TaskService.bulk_create, so their notifications, emails
+        and audit entries are written in bulk too. Returns ``[(action_item, task), ...]``.
+        """
+        with transaction.atomic():
+            ids = [conversion['action_item'] for conversion in conversions]
+            items = ActionItem.objects.select_for_update().in_bulk(ids)
+            errors = {}
+            missing = [item_id for item_id in ids if item_id not in items]
+            if missing:
+                errors['missing'] = missing
+            converted = [item_id for item_id, item in items.items() if item.task_id]
+            if converted:
+                errors['already_converted'] = sorted(converted)
+
+            employees = Employee.objects.select_related('user').in_bulk(
+                {conversion['assigned_to'] for conversion in conversions}
+            )
+            unknown = sorted({conversion['assigned_to'] for conversion in conversions} - set(employees))
+            if unknown:
+                errors['unknown_employees'] = unknown
+            if errors:
+                raise ValidationError(errors)
+
+            tasks = TaskService.bulk_create([
+                Task(
+                    title=cls.task_title(items[conversion['action_item']]),
+                    description=items[conversion['action_item']].description,
+                    assigned_to=employees[conversion['assigned_to']],
+                    assigned_by=assigned_by,
+                    due_date=conversion['due_date'],
+                    priority=conversion['priority'],
+                    status=Task.Status.TODO,
+                )
+                for conversion in conversions
+            ])
+
+            pairs = []
+            for conversion, task in zip(conversions, tasks):
+                item = items[conversion['action_item']]
+                item.task = task
+                pairs.append((item, task))
+            ActionItem.objects.bulk_update([item for item, _ in pairs], ['task'])
+        return pairs
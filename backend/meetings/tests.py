@@ -1,3 +1,390 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import uuid
+import wave
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from . import cache
+from .ai_utils import FakeProvider, MeetingAIError
+from .jobs import drain
+from .uploads import UploadError, write_chunk
+from .transcription import ChunkedTranscriber, overlap_words, segment_bounds, stitch
+from .models import Meeting, Recording, RecordingUpload, ProcessingJob, ActionItem, AIResultCache, Transcript
+from analytics.models import TaskDailyRollup
+from core.counters import get_counts
+from core.models import AuditLog, Notification, OutboxEmail
+from employees.models import Department, Employee
+from tasks.models import Task
 
-# Create your tests here.
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEETING_AI_PROVIDER='fake', MEETING_AI_FAKE_LATENCY=0)
+class MeetingProcessingJobTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='host',
+            email='host@test.com',
+            password='password123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.meeting = Meeting.objects.create(host=self.user, title='Sprint review')
+        self.recording = Recording.objects.create(
+            meeting=self.meeting,
+            file=SimpleUploadedFile('review.txt', b"We shipped the release. Action: update the changelog. TODO write the retro notes.")
+        )
+
+    def test_process_endpoint_queues_job_for_worker(self):
+        response = self.client.post(f'/api/meetings/{self.meeting.id}/process/')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data['job_id']
+        self.recording.refresh_from_db()
+        self.assertEqual(self.recording.processing_status, Recording.ProcessingStatus.QUEUED)
+        # A second request while the first is queued returns the same job
+        self.assertEqual(self.client.post(f'/api/meetings/{self.meeting.id}/process/').data['job_id'], job_id)
+
+        drain()
+
+        job = self.client.get(f'/api/meetings/jobs/{job_id}/').data
+        self.assertEqual((job['status'], job['progress']), (ProcessingJob.Status.SUCCEEDED, 100))
+        self.recording.refresh_from_db()
+        self.assertTrue(self.recording.processed)
+        self.assertEqual(self.recording.transcript.summary, 'We shipped the release.')
+        self.assertEqual(
+            sorted(ActionItem.objects.values_list('description', flat=True)),
+            ['update the changelog.', 'write the retro notes.']
+        )
+
+    def test_failing_provider_is_retried_then_fails(self):
+        class BrokenProvider(FakeProvider):
+            def analyze(self, transcript_text):
+                raise MeetingAIError("quota exceeded")
+
+        self.client.post(f'/api/meetings/{self.meeting.id}/process/')
+        with self.settings(MEETING_JOB_MAX_ATTEMPTS=2):
+            jobs = drain(provider=BrokenProvider())
+
+        self.assertEqual([job.status for job in jobs], [ProcessingJob.Status.QUEUED, ProcessingJob.Status.FAILED])
+        self.recording.refresh_from_db()
+        self.assertEqual(self.recording.processing_status, Recording.ProcessingStatus.FAILED)
+        self.assertIn('quota exceeded', self.recording.processing_error)
+
+
+class CountingProvider(FakeProvider):
+    def __init__(self):
+        super().__init__(latency=0)
+        self.calls = []
+
+    def transcribe(self, file_path):
+        self.calls.append('transcribe')
+        return super().transcribe(file_path)
+
+    def analyze(self, transcript_text):
+        self.calls.append('analyze')
+        return super().analyze(transcript_text)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEETING_AI_PROVIDER='fake', MEETING_AI_FAKE_LATENCY=0)
+class AIResultCacheTest(TestCase):
+    AUDIO = b"Budget approved. Action: book the venue."
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='host', email='host@test.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.provider = CountingProvider()
+
+    def upload(self, title):
+        meeting = Meeting.objects.create(host=self.user, title=title)
+        response = self.client.post(
+            f'/api/meetings/{meeting.id}/upload_recording/', {'file': SimpleUploadedFile('audio.txt', self.AUDIO)}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return meeting
+
+    def test_reprocessing_and_duplicate_uploads_skip_the_provider(self):
+        meeting = self.upload('Planning')
+        self.assertEqual(self.client.post(f'/api/meetings/{meeting.id}/process/').status_code, status.HTTP_202_ACCEPTED)
+        drain(provider=self.provider)
+        self.assertEqual(self.provider.calls, ['transcribe', 'analyze'])
+
+        # Reprocessing the same recording completes without a worker
+        response = self.client.post(f'/api/meetings/{meeting.id}/process/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ProcessingJob.Status.SUCCEEDED)
+
+        # So does the same audio uploaded to another meeting
+        duplicate = self.upload('Planning (copy)')
+        response = self.client.post(f'/api/meetings/{duplicate.id}/process/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(duplicate.recording.transcript.summary, 'Budget approved.')
+        self.assertEqual(list(duplicate.recording.transcript.action_items.values_list('description', flat=True)), ['book the venue.'])
+
+        self.assertEqual(drain(provider=self.provider), [])
+        self.assertEqual(self.provider.calls, ['transcribe', 'analyze'])
+        self.assertEqual(sorted(AIResultCache.objects.values_list('hits', flat=True)), [2, 2])
+
+    def test_evicts_least_recently_used_entries_over_the_size_limit(self):
+        for key in 'abc':
+            cache.store(cache.TRANSCRIPT, key * 64, 'fake:fake', 'x' * 98)
+        cache.lookup(cache.TRANSCRIPT, 'a' * 64, 'fake:fake')
+
+        self.assertEqual(cache.evict(max_bytes=250), 1)
+        self.assertIsNone(cache.lookup(cache.TRANSCRIPT, 'b' * 64, 'fake:fake'))
+        self.assertEqual(cache.lookup(cache.TRANSCRIPT, 'a' * 64, 'fake:fake'), 'x' * 98)
+
+
+class DroppedStream(io.BytesIO):
+    """
+    Request body whose connection drops after the first read.
+    """
+    def read(self, size=-1):
+        if self.tell():
+            raise ConnectionResetError("client went away")
+        return super().read(size)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEETING_UPLOAD_TEMP_DIR='')
+class ResumableUploadTest(TestCase):
+    DATA = bytes(range(256)) * 40
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='host', email='host@test.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.meeting = Meeting.objects.create(host=self.user, title='Town hall')
+
+    def start(self, **extra):
+        response = self.client.post(
+            f'/api/meetings/{self.meeting.id}/uploads/', {'filename': 'townhall.wav', 'size': len(self.DATA), **extra}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def put(self, upload_id, offset, data):
+        return self.client.put(
+            f'/api/meetings/uploads/{upload_id}/', data, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunks_resume_after_a_dropped_connection(self):
+        upload_id = self.start(sha256=hashlib.sha256(self.DATA).hexdigest())
+        self.assertEqual(self.put(upload_id, 0, self.DATA[:4000]).data['offset'], 4000)
+
+        # The connection drops part way through the next chunk; what arrived is kept
+        with self.assertRaises(ConnectionResetError):
+            write_chunk(upload_id, 4000, DroppedStream(self.DATA[4000:8000]))
+        offset = self.client.get(f'/api/meetings/uploads/{upload_id}/').data['offset']
+        self.assertGreater(offset, 4000)
+
+        # Resending from a stale offset is refused with the offset to resume from
+        response = self.put(upload_id, 4000, self.DATA[4000:])
+        self.assertEqual((response.status_code, response.data['offset']), (status.HTTP_409_CONFLICT, offset))
+        self.assertEqual(self.client.post(f'/api/meetings/uploads/{upload_id}/complete/').status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(self.put(upload_id, offset, self.DATA[offset:]).data['offset'], len(self.DATA))
+        response = self.client.post(f'/api/meetings/uploads/{upload_id}/complete/')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        recording = Recording.objects.get(meeting=self.meeting)
+        with recording.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.DATA)
+        self.assertEqual(recording.sha256, hashlib.sha256(self.DATA).hexdigest())
+        self.assertFalse(os.path.exists(os.path.join(MEDIA_ROOT, 'recordings', 'partial', f'{upload_id}.part')))
+
+    def test_chunks_stream_outside_a_transaction_under_a_lease(self):
+        upload_id = self.start()
+        outer_blocks = len(connection.atomic_blocks)
+        observed = []
+        test = self
+
+        class ObservedStream(io.BytesIO):
+            def read(self, size=-1):
+                if not observed:
+                    observed.append(len(connection.atomic_blocks))
+                    # A second request for the same chunk is turned away while this one streams
+                    with test.assertRaisesMessage(UploadError, 'still being written'):
+                        write_chunk(upload_id, 0, io.BytesIO(b'x'))
+                return super().read(size)
+
+        upload = write_chunk(upload_id, 0, ObservedStream(self.DATA[:4000]))
+
+        self.assertEqual(observed, [outer_blocks])
+        self.assertEqual((upload.offset, upload.writer, upload.writing_since), (4000, None, None))
+
+        # A lease left behind by a request that died expires
+        RecordingUpload.objects.filter(pk=upload_id).update(writer=uuid.uuid4(), writing_since=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.put(upload_id, 4000, self.DATA[4000:]).data['offset'], len(self.DATA))
+
+    def test_checksum_mismatch_and_oversized_chunks_are_rejected(self):
+        upload_id = self.start()
+        self.assertEqual(self.put(upload_id, 0, self.DATA + b'extra').status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        self.put(upload_id, 0, self.DATA)
+        response = self.client.post(f'/api/meetings/uploads/{upload_id}/complete/', {'sha256': '0' * 64}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(f'/api/meetings/uploads/{upload_id}/').data['offset'], 0)
+        self.assertFalse(Recording.objects.filter(meeting=self.meeting).exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BulkConvertActionItemsTest(TestCase):
+    def setUp(self):
+        self.host = User.objects.create_user(username='host', email='host@test.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.host)
+        department = Department.objects.create(name='Product')
+        self.employees = [
+            Employee.objects.create(
+                user=User.objects.create_user(username=f'dev{i}', email=f'dev{i}@test.com', password='password123'),
+                department=department, designation='Dev', joining_date=timezone.now().date()
+            )
+            for i in range(2)
+        ]
+        meeting = Meeting.objects.create(host=self.host, title='Planning')
+        recording = Recording.objects.create(meeting=meeting, file=SimpleUploadedFile('planning.txt', b'...'))
+        self.transcript = Transcript.objects.create(recording=recording, content='...')
+
+    def make_items(self, count):
+        return ActionItem.objects.bulk_create([
+            ActionItem(transcript=self.transcript, description=f'Follow up {i}') for i in range(count)
+        ])
+
+    def convert(self, items, **extra):
+        return self.client.post('/api/meetings/action_items/convert/', {
+            'items': [{'action_item': item.id, 'assigned_to': self.employees[i % 2].id} for i, item in enumerate(items)],
+            'due_date': '2030-01-31',
+            **extra,
+        }, format='json')
+
+    def test_converts_in_bulk_with_the_same_side_effects_as_single_saves(self):
+        items = self.make_items(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.convert(items, priority='HIGH')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        tasks = Task.objects.filter(pk__in=[entry['task_id'] for entry in response.data['tasks']])
+        self.assertEqual(sorted(tasks.values_list('priority', flat=True)), ['HIGH'] * 3)
+        self.assertEqual(ActionItem.objects.filter(task__isnull=False).count(), 3)
+
+        first, second = self.employees
+        self.assertEqual(Notification.objects.filter(recipient=first.user, title='New Task Assigned').count(), 2)
+        self.assertEqual(get_counts(first.user_id)['notifications'], 2)
+        self.assertEqual(get_counts(second.user_id)['notifications'], 1)
+        self.assertEqual(OutboxEmail.objects.filter(subject__startswith='New Task Assigned').count(), 3)
+        self.assertEqual(AuditLog.objects.filter(model_name='Task', action='CREATE').count(), 3)
+        self.assertEqual(
+            dict(TaskDailyRollup.objects.values_list('employee_id', 'count')), {first.id: 2, second.id: 1}
+        )
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        warm_up, few, many = self.make_items(2), self.make_items(2), self.make_items(20)
+        # The first conversion also creates the assignees' counter and rollup rows
+        self.convert(warm_up)
+        with CaptureQueriesContext(connection) as small:
+            self.convert(few)
+        with CaptureQueriesContext(connection) as large:
+            self.convert(many)
+        self.assertEqual(len(large), len(small))
+
+    def test_nothing_is_converted_when_an_item_is_invalid(self):
+        items = self.make_items(2)
+        self.convert(items[:1])
+
+        response = self.convert(items)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors']['already_converted'], [str(items[0].id)])
+        self.assertEqual(Task.objects.count(), 1)
+
+
+class SecondsTranscriber(FakeProvider):
+    """
+    Fake transcriber for WAV files whose samples in second N all equal N: says "wordN" per second.
+    Fails the first attempt of every segment when ``flaky`` is set.
+    """
+    def __init__(self, flaky=False):
+        super().__init__(latency=0)
+        self.flaky = flaky
+        self.attempted = set()
+
+    def transcribe(self, file_path):
+        with wave.open(file_path, 'rb') as audio:
+            rate = audio.getframerate()
+            frames = audio.readframes(audio.getnframes())
+        if self.flaky and frames[:rate] not in self.attempted:
+            self.attempted.add(frames[:rate])
+            raise MeetingAIError("timeout")
+        return ' '.join(f"word{frames[offset]}" for offset in range(0, len(frames) - rate + 1, rate))
+
+
+class ChunkedTranscriptionTest(TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, True)
+        self.path = os.path.join(self.workdir, 'meeting.wav')
+        rate = 100
+        with wave.open(self.path, 'wb') as audio:
+            audio.setparams((1, 1, rate, 0, 'NONE', 'not compressed'))
+            audio.writeframes(b''.join(bytes([second]) * rate for second in range(25)))
+
+    def test_segment_bounds_overlap(self):
+        self.assertEqual(segment_bounds(25, 10, 2), [(0.0, 10), (8.0, 18.0), (16.0, 25)])
+        self.assertEqual(segment_bounds(5, 10, 2), [(0.0, 5)])
+
+    def test_stitch_drops_repeated_overlap(self):
+        self.assertEqual(
+            stitch(['so we ship on friday.', 'we ship on Friday the release notes', 'the release notes are due']),
+            'so we ship on friday. the release notes are due'
+        )
+
+    def test_stitch_keeps_short_or_overlong_repeats(self):
+        # One repeated word is more likely speech than overlap
+        self.assertEqual(stitch(['the notes', 'notes are due']), 'the notes notes are due')
+        # A repeat longer than the overlap could hold is not the overlap either
+        self.assertEqual(
+            stitch(['a b c d e f', 'a b c d e f g'], max_overlap=overlap_words(1)),
+            'a b c d e f a b c d e f g'
+        )
+        self.assertEqual(overlap_words(1), 5)
+
+    def test_segments_are_transcribed_in_parallel_and_stitched_in_order(self):
+        progress = []
+        transcriber = ChunkedTranscriber(
+            SecondsTranscriber(flaky=True), max_workers=3, retries=1, chunk_seconds=10, overlap_seconds=3, retry_delay=0
+        )
+
+        text = transcriber.transcribe(self.path, progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(text, ' '.join(f"word{second}" for second in range(25)))
+        self.assertEqual(progress[-1], (4, 4))
+
+    def test_segment_failing_every_retry_fails_the_transcription(self):
+        class Down(FakeProvider):
+            def transcribe(self, file_path):
+                raise MeetingAIError("503")
+
+        transcriber = ChunkedTranscriber(Down(latency=0), retries=1, chunk_seconds=10, overlap_seconds=2, retry_delay=0)
+        with self.assertRaisesMessage(MeetingAIError, "503"):
+            transcriber.transcribe(self.path)
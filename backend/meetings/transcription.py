@@ -0,0 +1,216 @@
+"""
+Chunked, parallel transcription of long recordings.
+
+A recording longer than MEETING_TRANSCRIBE_CHUNK_SECONDS is split into segments
+that overlap by MEETING_TRANSCRIBE_OVERLAP_SECONDS, the segments are transcribed
+concurrently on a bounded thread pool (each retried on its own), and the texts
+are stitched back in order with the words repeated in the overlaps removed.
+
+WAV files are split with the standard library; other formats are split with
+ffmpeg when it is installed and are otherwise sent whole.
+"""
+import logging
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from .ai_utils import MeetingAIError
+
+logger = logging.getLogger(__name__)
+
+# Longest run of words looked at when removing the text repeated by an overlap
+MAX_OVERLAP_WORDS = 60
+# Shorter repeats are as likely to be someone saying the same word twice as overlap
+MIN_OVERLAP_WORDS = 3
+# Upper bound on speech rate, used to size the overlap in words from its duration
+MAX_WORDS_PER_SECOND = 5
+
+
+class Segment:
+    def __init__(self, index, start, end, path):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.path = path
+
+    def __repr__(self):
+        return f"Segment({self.index}, {self.start:.1f}-{self.end:.1f}s)"
+
+
+def segment_bounds(duration, chunk_seconds, overlap_seconds):
+    """
+    ``[(start, end), ...]`` covering ``duration`` in chunks of ``chunk_seconds`` where each
+    chunk after the first starts ``overlap_seconds`` before the previous one ended.
+    """
+    if duration <= chunk_seconds:
+        return [(0.0, duration)]
+    step = chunk_seconds - overlap_seconds
+    if step <= 0:
+        raise ValueError("Chunk length must be longer than the overlap")
+    bounds = []
+    start = 0.0
+    while start < duration:
+        end = min(start + chunk_seconds, duration)
+        bounds.append((start, end))
+        if end >= duration:
+            break
+        start += step
+    return bounds
+
+
+def _split_wav(path, bounds, workdir):
+    segments = []
+    with wave.open(path, 'rb') as source:
+        params = source.getparams()
+        rate = source.getframerate()
+        for index, (start, end) in enumerate(bounds):
+            source.setpos(int(start * rate))
+            frames = source.readframes(int((end - start) * rate))
+            segment_path = os.path.join(workdir, f"segment-{index:04d}.wav")
+            with wave.open(segment_path, 'wb') as target:
+                target.setparams(params)
+                target.writeframes(frames)
+            segments.append(Segment(index, start, end, segment_path))
+    return segments
+
+
+def _split_ffmpeg(path, bounds, workdir):
+    extension = os.path.splitext(path)[1] or '.mp3'
+    segments = []
+    for index, (start, end) in enumerate(bounds):
+        segment_path = os.path.join(workdir, f"segment-{index:04d}{extension}")
+        subprocess.run(
+            ['ffmpeg', '-v', 'error', '-y', '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}",
+             '-i', path, '-c', 'copy', segment_path],
+            check=True, capture_output=True
+        )
+        segments.append(Segment(index, start, end, segment_path))
+    return segments
+
+
+def _is_wav(path):
+    try:
+        with wave.open(path, 'rb'):
+            return True
+    except (wave.Error, EOFError):
+        return False
+
+
+def audio_duration(path):
+    """
+    Duration in seconds, or None when it cannot be determined without decoding tools.
+    """
+    if _is_wav(path):
+        with wave.open(path, 'rb') as audio:
+            return audio.getnframes() / float(audio.getframerate())
+    if shutil.which('ffprobe'):
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True
+        )
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def split_recording(path, workdir, chunk_seconds=None, overlap_seconds=None):
+    """
+    Splits ``path`` into overlapping segment files inside ``workdir``. Recordings that are
+    short enough, or that cannot be split here, come back as a single segment of the original file.
+    """
+    chunk_seconds = chunk_seconds or settings.MEETING_TRANSCRIBE_CHUNK_SECONDS
+    overlap_seconds = settings.MEETING_TRANSCRIBE_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+    duration = audio_duration(path)
+    if duration is None or duration <= chunk_seconds:
+        return [Segment(0, 0.0, duration or 0.0, path)]
+
+    bounds = segment_bounds(duration, chunk_seconds, overlap_seconds)
+    if _is_wav(path):
+        return _split_wav(path, bounds, workdir)
+    if shutil.which('ffmpeg'):
+        return _split_ffmpeg(path, bounds, workdir)
+    logger.warning("Cannot split %s without ffmpeg; transcribing it in one request", path)
+    return [Segment(0, 0.0, duration, path)]
+
+
+def overlap_words(overlap_seconds):
+    """
+    The most words an overlap of ``overlap_seconds`` can repeat.
+    """
+    return min(math.ceil(overlap_seconds * MAX_WORDS_PER_SECOND), MAX_OVERLAP_WORDS)
+
+
+def stitch(texts, max_overlap=MAX_OVERLAP_WORDS, min_overlap=MIN_OVERLAP_WORDS):
+    """
+    Joins segment transcripts in order, dropping the words at the start of each segment
+    that repeat the end of the previous one (the overlap was transcribed twice). Only a
+    repeat of ``min_overlap`` to ``max_overlap`` words counts as overlap; anything
+    shorter is kept, since a duplicated word loses less than a dropped one.
+    """
+    words = []
+    for text in texts:
+        next_words = (text or '').split()
+        longest = min(len(words), len(next_words), max_overlap)
+        overlap = 0
+        for size in range(longest, min_overlap - 1, -1):
+            tail = [w.strip('.,!?;:').lower() for w in words[-size:]]
+            head = [w.strip('.,!?;:').lower() for w in next_words[:size]]
+            if tail == head:
+                overlap = size
+                break
+        words.extend(next_words[overlap:])
+    return ' '.join(words)
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes a recording segment by segment with ``provider.transcribe``.
+    """
+
+    def __init__(self, provider, max_workers=None, retries=None, chunk_seconds=None, overlap_seconds=None, retry_delay=1.0):
+        self.provider = provider
+        self.max_workers = max_workers or settings.MEETING_TRANSCRIBE_WORKERS
+        self.retries = settings.MEETING_TRANSCRIBE_CHUNK_RETRIES if retries is None else retries
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.retry_delay = retry_delay
+
+    def transcribe_segment(self, segment):
+        for attempt in range(self.retries + 1):
+            try:
+                return self.provider.transcribe(segment.path)
+            except MeetingAIError as e:
+                if attempt == self.retries:
+                    raise MeetingAIError(f"Segment {segment.index} ({segment.start:.0f}s) failed: {e}") from e
+                logger.info("Retrying segment %s after: %s", segment.index, e)
+                time.sleep(self.retry_delay * 2 ** attempt)
+
+    def transcribe(self, file_path, progress=None):
+        """
+        Returns the stitched transcript. ``progress(done, total)`` is called as segments finish.
+        """
+        with tempfile.TemporaryDirectory(prefix='meeting-segments-') as workdir:
+            segments = split_recording(file_path, workdir, self.chunk_seconds, self.overlap_seconds)
+            texts = [None] * len(segments)
+            done = 0
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(segments))) as pool:
+                futures = {pool.submit(self.transcribe_segment, segment): segment for segment in segments}
+                try:
+                    for future in as_completed(futures):
+                        texts[futures[future].index] = future.result()
+                        done += 1
+                        if progress:
+                            progress(done, len(segments))
+                except Exception:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+        overlap_seconds = settings.MEETING_TRANSCRIBE_OVERLAP_SECONDS if self.overlap_seconds is None else self.overlap_seconds
+        return stitch(texts, max_overlap=overlap_words(overlap_seconds))
@@ -0,0 +1,198 @@
+"""
+Resumable, chunked uploads of meeting recordings.
+
+The client starts an upload with the file's name and size (and optionally its
+SHA-256), then PUTs the bytes in order, each request carrying the offset it
+starts at. Chunks are streamed from the request straight into a partial file at
+that offset, so nothing is buffered in memory and a dropped connection only
+loses the chunk in flight: the client asks for the current offset and carries
+on from there. Completing the upload verifies size and checksum and moves the
+partial file into storage as the meeting's Recording.
+
+Streaming a chunk can take as long as the client's connection needs, so it happens
+outside any transaction. The row is locked only briefly, to claim the chunk (a lease
+that keeps a second request from writing at the same time) and to record the new offset.
+"""
+import datetime
+import hashlib
+import logging
+import os
+import uuid
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from .models import Recording, RecordingUpload
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """
+    Rejected upload request; ``status_code`` is the HTTP status to answer with.
+    """
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PartialFile(File):
+    """
+    A finished partial upload. FileSystemStorage moves files that have a
+    ``temporary_file_path`` instead of copying them.
+    """
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def partial_dir():
+    return settings.MEETING_UPLOAD_TEMP_DIR or os.path.join(settings.MEDIA_ROOT, 'recordings', 'partial')
+
+
+def partial_path(upload):
+    return os.path.join(partial_dir(), f"{upload.pk}.part")
+
+
+def start_upload(meeting, user, filename, size, sha256=''):
+    if size > settings.MEETING_UPLOAD_MAX_BYTES:
+        raise UploadError(f"Recordings are limited to {settings.MEETING_UPLOAD_MAX_BYTES} bytes", status_code=413)
+    upload = RecordingUpload.objects.create(
+        meeting=meeting, created_by=user, filename=os.path.basename(filename), size=size, sha256=sha256.lower()
+    )
+    os.makedirs(partial_dir(), exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+    return upload
+
+
+def _lock_active(upload_id):
+    upload = RecordingUpload.objects.select_for_update().get(pk=upload_id)
+    if upload.status != RecordingUpload.Status.ACTIVE:
+        raise UploadError("Upload is already complete", status_code=409)
+    if upload.writer and upload.writing_since > timezone.now() - datetime.timedelta(
+        seconds=settings.MEETING_UPLOAD_CHUNK_LEASE_SECONDS
+    ):
+        raise UploadError("Another chunk of this upload is still being written", status_code=409)
+    return upload
+
+
+def _claim_chunk(upload_id, offset):
+    with transaction.atomic():
+        upload = _lock_active(upload_id)
+        if offset != upload.offset:
+            raise UploadError(f"Expected offset {upload.offset}", status_code=409)
+        upload.writer = uuid.uuid4()
+        upload.writing_since = timezone.now()
+        upload.save(update_fields=['writer', 'writing_since', 'updated_at'])
+    return upload
+
+
+def _release_chunk(upload, written):
+    with transaction.atomic():
+        current = RecordingUpload.objects.select_for_update().get(pk=upload.pk)
+        if current.writer != upload.writer:
+            # The lease ran out and another request has taken over the upload
+            raise UploadError("Chunk took too long and was superseded", status_code=409)
+        current.offset = upload.offset + written
+        current.writer = current.writing_since = None
+        current.save(update_fields=['offset', 'writer', 'writing_since', 'updated_at'])
+    return current
+
+
+def write_chunk(upload_id, offset, stream):
+    """
+    Appends the bytes read from ``stream`` at ``offset``, which must equal the bytes
+    received so far. The offset is advanced by whatever was written, even when the
+    stream breaks off, so the client can resume from there.
+    """
+    upload = _claim_chunk(upload_id, offset)
+    remaining = upload.size - offset
+    written = 0
+    error = None
+    try:
+        with open(partial_path(upload), 'r+b') as partial:
+            partial.seek(offset)
+            partial.truncate()
+            while stream is not None:
+                data = stream.read(min(READ_SIZE, remaining - written + 1))
+                if not data:
+                    break
+                if written + len(data) > remaining:
+                    raise UploadError(f"Chunk runs past the declared size of {upload.size} bytes", status_code=413)
+                partial.write(data)
+                written += len(data)
+    except Exception as e:
+        # Keep what arrived before the client went away (or overran the size)
+        logger.info("Upload %s interrupted at %s bytes: %s", upload.pk, offset + written, e)
+        error = e
+    upload = _release_chunk(upload, written)
+    if error:
+        raise error
+    return upload
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as partial:
+        for data in iter(lambda: partial.read(READ_SIZE), b''):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def complete_upload(upload_id, sha256=''):
+    """
+    Checks the size and checksum and stores the file as the meeting's recording.
+    A checksum mismatch discards the received bytes so the client starts over.
+    """
+    with transaction.atomic():
+        upload = _lock_active(upload_id)
+        if upload.offset != upload.size:
+            raise UploadError(f"Received {upload.offset} of {upload.size} bytes", status_code=409)
+
+        path = partial_path(upload)
+        digest = file_sha256(path)
+        expected = (sha256 or upload.sha256).lower()
+        if expected and expected != digest:
+            open(path, 'wb').close()
+            upload.offset = 0
+            upload.save(update_fields=['offset', 'updated_at'])
+            recording = None
+        else:
+            recording = _store_recording(upload, path, digest)
+    if recording is None:
+        raise UploadError("Checksum mismatch, the upload has been reset")
+    if os.path.exists(path):
+        os.remove(path)
+    return recording
+
+
+def _store_recording(upload, path, digest):
+    recording, _ = Recording.objects.get_or_create(meeting=upload.meeting)
+    with open(path, 'rb') as partial:
+        recording.file.save(upload.filename, PartialFile(partial), save=False)
+    recording.sha256 = digest
+    recording.save()
+
+    upload.sha256 = digest
+    upload.status = RecordingUpload.Status.COMPLETE
+    upload.save(update_fields=['sha256', 'status', 'updated_at'])
+    return recording
+
+
+def purge_stale_uploads(now=None):
+    """
+    Deletes unfinished uploads idle for MEETING_UPLOAD_EXPIRY_HOURS along with their partial files.
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(hours=settings.MEETING_UPLOAD_EXPIRY_HOURS)
+    stale = RecordingUpload.objects.filter(status=RecordingUpload.Status.ACTIVE, updated_at__lt=cutoff)
+    count = 0
+    for upload in stale.iterator():
+        try:
+            os.remove(partial_path(upload))
+        except FileNotFoundError:
+            pass
+        upload.delete()
+        count += 1
+    return count
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MeetingViewSet, RecordingUploadView, ProcessMeetingView, ConvertActionItemToTaskView
+from .views import MeetingViewSet, RecordingUploadView, RecordingUploadStartView, RecordingUploadChunkView, RecordingUploadCompleteView, RecordingDownloadView, ProcessMeetingView, ProcessingJobView, ConvertActionItemToTaskView, BulkConvertActionItemsView
 
 router = DefaultRouter()
 router.register(r'', MeetingViewSet, basename='meetings')
@@ -8,6 +8,12 @@ router.register(r'', MeetingViewSet, basename='meetings')
 urlpatterns = [
     path('', include(router.urls)),
     path('<uuid:meeting_id>/upload_recording/', RecordingUploadView.as_view(), name='upload-recording'),
+    path('<uuid:meeting_id>/uploads/', RecordingUploadStartView.as_view(), name='recording-upload-start'),
+    path('uploads/<uuid:upload_id>/', RecordingUploadChunkView.as_view(), name='recording-upload'),
+    path('uploads/<uuid:upload_id>/complete/', RecordingUploadCompleteView.as_view(), name='recording-upload-complete'),
+    path('<uuid:meeting_id>/recording/', RecordingDownloadView.as_view(), name='recording-download'),
     path('<uuid:meeting_id>/process/', ProcessMeetingView.as_view(), name='process-meeting'),
+    path('jobs/<uuid:job_id>/', ProcessingJobView.as_view(), name='meeting-processing-job'),
+    path('action_items/convert/', BulkConvertActionItemsView.as_view(), name='bulk-convert-action-items'),
     path('action_items/<int:action_item_id>/convert/', ConvertActionItemToTaskView.as_view(), name='convert-action-item'),
 ]
@@ -4,13 +4,22 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.shortcuts import get_object_or_404
-from .models import Meeting, Recording, Transcript, ActionItem
-from .serializers import MeetingSerializer, RecordingSerializer, ActionItemSerializer
-from .ai_utils import transcribe_audio, analyze_meeting
+from django.conf import settings
+from .models import Meeting, Recording, Transcript, ActionItem, ProcessingJob, RecordingUpload
+from .serializers import (
+    MeetingSerializer, RecordingSerializer, ActionItemSerializer, ProcessingJobSerializer, RecordingUploadSerializer,
+    BulkActionItemConversionSerializer,
+)
+from .jobs import enqueue_processing
+from .services import ActionItemService
+from .cache import file_sha256
+from core.downloads import DOWNLOAD_AUTHENTICATION_CLASSES, serve_file
+from .uploads import UploadError, start_upload, write_chunk, complete_upload
 from tasks.models import Task
 import os
+from core.prefetch import SerializerRelationsMixin
 
-class MeetingViewSet(viewsets.ModelViewSet):
+class MeetingViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     queryset = Meeting.objects.all()
     serializer_class = MeetingSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -74,13 +83,80 @@ class RecordingUploadView(APIView):
         
         recording, created = Recording.objects.get_or_create(meeting=meeting)
         recording.file = request.data['file']
+        recording.sha256 = file_sha256(recording.file)
         recording.save()
         
-        serializer = RecordingSerializer(recording)
+        serializer = RecordingSerializer(recording, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+class RecordingUploadStartView(APIView):
+    def post(self, request, meeting_id):
+        """
+        Starts a resumable upload: ``{"filename", "size", "sha256"?}``. Send the bytes with
+        PUT to the returned upload, then POST to its ``complete/``.
+        """
+        meeting = get_object_or_404(Meeting, id=meeting_id)
+        serializer = RecordingUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = start_upload(meeting, request.user, **serializer.validated_data)
+        except UploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        data = RecordingUploadSerializer(upload).data
+        data['chunk_size'] = settings.MEETING_UPLOAD_CHUNK_BYTES
+        return Response(data, status=status.HTTP_201_CREATED)
+
+class RecordingUploadChunkView(APIView):
+    """
+    GET reports how many bytes have arrived (to resume after a dropped connection).
+    PUT streams a raw chunk starting at the ``Upload-Offset`` header.
+    """
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(RecordingUpload, id=upload_id, created_by=request.user)
+
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        return Response(RecordingUploadSerializer(upload).data, headers={'Upload-Offset': str(upload.offset)})
+
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({"error": "Upload-Offset header is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Read the body as a stream; request.data would buffer it through a parser
+            upload = write_chunk(upload.id, offset, request.stream)
+        except UploadError as e:
+            upload.refresh_from_db()
+            return Response({"error": str(e), "offset": upload.offset}, status=e.status_code, headers={'Upload-Offset': str(upload.offset)})
+        return Response({"offset": upload.offset}, headers={'Upload-Offset': str(upload.offset)})
+
+class RecordingUploadCompleteView(APIView):
+    def post(self, request, upload_id):
+        upload = get_object_or_404(RecordingUpload, id=upload_id, created_by=request.user)
+        try:
+            recording = complete_upload(upload.id, request.data.get('sha256', ''))
+        except UploadError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        return Response(RecordingSerializer(recording, context={'request': request}).data, status=status.HTTP_201_CREATED)
+
+class RecordingDownloadView(APIView):
+    authentication_classes = DOWNLOAD_AUTHENTICATION_CLASSES
+
+    def get(self, request, meeting_id):
+        recording = get_object_or_404(Recording, meeting_id=meeting_id)
+        if not recording.file:
+            return Response({"error": "Recording file is missing"}, status=status.HTTP_404_NOT_FOUND)
+        return serve_file(request, recording.file, filename=f"{recording.meeting.title}{os.path.splitext(recording.file.name)[1]}")
+
 class ProcessMeetingView(APIView):
     def post(self, request, meeting_id):
+        """
+        Queues transcription and analysis of the meeting's recording and returns the job.
+        Poll the job (or the recording's processing_status) for progress. Recordings whose
+        results are already cached are processed immediately (200 with a SUCCEEDED job).
+        """
         meeting = get_object_or_404(Meeting, id=meeting_id)
         
         try:
@@ -90,31 +166,18 @@ class ProcessMeetingView(APIView):
             
         if not recording.file:
             return Response({"error": "Recording file is missing"}, status=status.HTTP_400_BAD_REQUEST)
-            
-        # 1. Transcribe
-        transcript_text = transcribe_audio(recording.file.path)
-        if not transcript_text:
-             return Response({"error": "Transcription failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-             
-        # 2. Save Transcript
-        transcript, _ = Transcript.objects.get_or_create(recording=recording)
-        transcript.content = transcript_text
-        transcript.save()
-        
-        # 3. Analyze
-        analysis = analyze_meeting(transcript_text)
-        if analysis:
-            transcript.summary = analysis.get('summary', '')
-            transcript.save()
-            
-            # 4. Save Action Items
-            for item in analysis.get('action_items', []):
-                ActionItem.objects.create(transcript=transcript, description=item)
-                
-        recording.processed = True
-        recording.save()
-        
-        return Response({"message": "Meeting processed successfully"}, status=status.HTTP_200_OK)
+
+        job, created = enqueue_processing(recording, requested_by=request.user)
+        done = job.status == ProcessingJob.Status.SUCCEEDED
+        return Response(
+            {"job_id": job.id, "status": job.status, "created": created},
+            status=status.HTTP_200_OK if done else status.HTTP_202_ACCEPTED
+        )
+
+class ProcessingJobView(generics.RetrieveAPIView):
+    queryset = ProcessingJob.objects.select_related('recording')
+    serializer_class = ProcessingJobSerializer
+    lookup_url_kwarg = 'job_id'
 
 class ConvertActionItemToTaskView(APIView):
     def post(self, request, action_item_id):
@@ -136,7 +199,7 @@ class ConvertActionItemToTaskView(APIView):
         assigned_to = get_object_or_404(Employee, id=assigned_to_id)
 
         task = Task.objects.create(
-            title=f"Task from Meeting: {action_item.description[:50]}...",
+            title=ActionItemService.task_title(action_item),
             description=action_item.description,
             assigned_to=assigned_to,
             assigned_by=request.user,
@@ -150,3 +213,17 @@ class ConvertActionItemToTaskView(APIView):
         action_item.save()
         
         return Response({"message": "Task created", "task_id": task.id}, status=status.HTTP_201_CREATED)
+
+class BulkConvertActionItemsView(APIView):
+    def post(self, request):
+        """
+        Converts many action items to tasks in one transaction. Nothing is converted
+        if any item is missing, already converted or assigned to an unknown employee.
+        """
+        serializer = BulkActionItemConversionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pairs = ActionItemService.convert_to_tasks(serializer.validated_data['conversions'], request.user)
+        return Response({
+            "created": len(pairs),
+            "tasks": [{"action_item": item.id, "task_id": task.id} for item, task in pairs],
+        }, status=status.HTTP_201_CREATED)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MessagingConfig(AppConfig):
     name = 'messaging'
+
+    def ready(self):
+        import messaging.signals
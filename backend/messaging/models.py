@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from core.storage import blob_registry, get_blob_storage
 
 User = get_user_model()
 
@@ -16,14 +17,20 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Inbox and sent folders are paged newest first on (timestamp, id)
+            models.Index(fields=['recipient', 'is_archived', '-timestamp', '-id'], name='message_inbox_idx'),
+            models.Index(fields=['sender', 'is_archived', '-timestamp', '-id'], name='message_sent_idx'),
+        ]
 
     def __str__(self):
         recipient_display = self.recipient if self.recipient else self.recipient_email
         return f"From {self.sender} to {recipient_display}: {self.subject}"
 
+@blob_registry.register('file')
 class MessageAttachment(models.Model):
     message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name='attachments')
-    file = models.FileField(upload_to='message_attachments/')
+    file = models.FileField(upload_to='message_attachments/', storage=get_blob_storage)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -1,11 +1,14 @@
 from rest_framework import serializers
 from .models import Message, MessageAttachment
 from users.serializers import UserSerializer
+from core.downloads import SignedDownloadURLField
 
 class MessageAttachmentSerializer(serializers.ModelSerializer):
+    download_url = SignedDownloadURLField('message-attachment-download')
+
     class Meta:
         model = MessageAttachment
-        fields = ['id', 'file', 'uploaded_at']
+        fields = ['id', 'file', 'download_url', 'uploaded_at']
 
 class MessageSerializer(serializers.ModelSerializer):
     sender_details = UserSerializer(source='sender', read_only=True)
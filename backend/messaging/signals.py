@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core import realtime
+from .models import Message
+
+@receiver(post_save, sender=Message, dispatch_uid='push_message')
+def push_message(sender, instance, created, **kwargs):
+    # External (email-only) messages have no recipient to push to
+    if not instance.recipient_id:
+        return
+    if created:
+        realtime.push(instance.recipient_id, 'message', realtime.message_payload(instance))
+    else:
+        realtime.push_unread(instance.recipient_id)
+
+@receiver(post_delete, sender=Message, dispatch_uid='push_message_deleted')
+def push_message_deleted(sender, instance, **kwargs):
+    if instance.recipient_id and not instance.is_read:
+        realtime.push_unread(instance.recipient_id)
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import MessageViewSet
+from .views import MessageViewSet, AttachmentDownloadView
 
 router = DefaultRouter()
 router.register(r'', MessageViewSet, basename='message')
 
 urlpatterns = [
+    path('attachments/<int:pk>/download/', AttachmentDownloadView.as_view(), name='message-attachment-download'),
     path('', include(router.urls)),
 ]
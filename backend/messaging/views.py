@@ -1,13 +1,22 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Q
-from .models import Message
+from .models import Message, MessageAttachment
 from .serializers import MessageSerializer
+from core.pagination import TimestampKeysetPagination
+from core.counters import get_counts
+from core.outbox import enqueue_email
+from core.downloads import DOWNLOAD_AUTHENTICATION_CLASSES, serve_file
+from core.prefetch import SerializerRelationsMixin
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampKeysetPagination
 
     def get_queryset(self):
         """
@@ -18,24 +27,17 @@ class MessageViewSet(viewsets.ModelViewSet):
         return Message.objects.filter(recipient=user, is_archived=False)
 
     def perform_create(self, serializer):
-        # Save the message first
-        message = serializer.save(sender=self.request.user)
-        
-        # If external email, send via SMTP
-        if message.recipient_email:
-            from django.core.mail import send_mail
-            try:
-                send_mail(
+        with transaction.atomic():
+            message = serializer.save(sender=self.request.user)
+
+            # External recipients get an email, queued with the message and sent by the outbox worker
+            if message.recipient_email:
+                enqueue_email(
                     subject=message.subject,
-                    message=message.body,
-                    from_email=self.request.user.email, # Or settings.DEFAULT_FROM_EMAIL
-                    recipient_list=[message.recipient_email],
-                    fail_silently=False,
+                    body=message.body,
+                    to=message.recipient_email,
+                    from_email=self.request.user.email,
                 )
-            except Exception as e:
-                # Log error but don't crash the request? Or return warning?
-                print(f"Failed to send email: {e}")
-                # Optional: Update message body to indicate failure or status
 
     @action(detail=False, methods=['get'])
     def sent(self, request):
@@ -43,7 +45,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         Return messages sent by the current user.
         """
         user = request.user
-        messages = Message.objects.filter(sender=user, is_archived=False)
+        messages = self.filter_queryset(Message.objects.filter(sender=user, is_archived=False))
         page = self.paginate_queryset(messages)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -63,5 +65,18 @@ class MessageViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        count = Message.objects.filter(recipient=request.user, is_read=False, is_archived=False).count()
+        count = get_counts(request.user.pk)['messages']
         return Response({'count': count})
+
+class AttachmentDownloadView(APIView):
+    """
+    Streams an attachment to the sender or recipient of its message.
+    """
+    authentication_classes = DOWNLOAD_AUTHENTICATION_CLASSES
+
+    def get(self, request, pk):
+        attachment = get_object_or_404(
+            MessageAttachment.objects.filter(Q(message__sender=request.user) | Q(message__recipient=request.user)),
+            pk=pk
+        )
+        return serve_file(request, attachment.file)
@@ -9,3 +9,4 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = '__all__'
         read_only_fields = ['assigned_by']
+        select_related = ['assigned_to__user', 'assigned_by']
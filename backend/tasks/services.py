@@ -0,0 +1,58 @@
+from django.db import transaction
+from analytics.rollups import ROLLUPS
+from core.audit import audit_registry
+from core.models import Notification
+from core.outbox import enqueue_emails
+from core.services import NotificationService
+from .models import Task
+
+
+def assignment_email(task):
+    """
+    ``(subject, body, to)`` of the email telling the assignee about a new task.
+    """
+    subject = f"New Task Assigned: {task.title}"
+    assigner_role = task.assigned_by.role.replace('_', ' ').title() if hasattr(task.assigned_by, 'role') else 'Admin'
+
+    message = f"""
+        Hello {task.assigned_to.user.first_name},
+
+        You have been assigned a new task by {assigner_role}, {task.assigned_by.get_full_name()}.
+
+        Task: {task.title}
+        Priority: {task.get_priority_display()}
+        Due Date: {task.due_date}
+
+        Description:
+        {task.description}
+
+        Please log in to the dashboard to view more details.
+        """
+    return subject, message, task.assigned_to.user.email
+
+
+def assignment_notification(task):
+    return Notification(
+        recipient_id=task.assigned_to.user_id,
+        title="New Task Assigned",
+        message=f"You have been assigned a new task: {task.title}",
+        link=f"/tasks/{task.id}"
+    )
+
+
+class TaskService:
+    @staticmethod
+    def bulk_create(tasks):
+        """
+        Inserts unsaved tasks with one bulk_create and emits the side effects a single
+        save gets from signals (notification, assignment email, audit entry, task rollup)
+        in bulk as well. ``assigned_to`` (with its user) and ``assigned_by`` should be
+        loaded on each task to avoid per-row queries. Returns the saved tasks.
+        """
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(tasks)
+            NotificationService.notify_each(assignment_notification(task) for task in tasks)
+            enqueue_emails(assignment_email(task) for task in tasks)
+            audit_registry.log_bulk_create(Task, tasks)
+            ROLLUPS[Task].apply_created(tasks)
+        return tasks
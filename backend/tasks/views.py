@@ -1,9 +1,11 @@
 from rest_framework import viewsets, permissions
+from django.db import transaction
 from .models import Task
 from .serializers import TaskSerializer
 from users.permissions import IsAdmin, IsManager, IsAdminOrManager
+from core.prefetch import SerializerRelationsMixin
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     
     def get_permissions(self):
@@ -51,4 +53,6 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Task.objects.none()
 
     def perform_create(self, serializer):
-        serializer.save(assigned_by=self.request.user)
+        # The assignment email is queued by a post_save signal; keep it in the task's transaction
+        with transaction.atomic():
+            serializer.save(assigned_by=self.request.user)
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from core.audit import audit_registry
 
+@audit_registry.register(redact=['password'])
 class User(AbstractUser):
     class Roles(models.TextChoices):
         # Administration
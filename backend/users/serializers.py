@@ -11,6 +11,7 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'email', 'username', 'first_name', 'last_name', 'role', 'is_active', 'employee_id']
         read_only_fields = ['role', 'is_active', 'employee_id']
+        select_related = ['employee_profile']
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -4,6 +4,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer, RegisterSerializer, CustomTokenObtainPairSerializer, ChangePasswordSerializer
+from core.prefetch import SerializerRelationsMixin
 
 User = get_user_model()
 
@@ -40,7 +41,7 @@ class UserProfileView(APIView):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
 
-class UserListView(generics.ListAPIView):
+class UserListView(SerializerRelationsMixin, generics.ListAPIView):
     queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -2,9 +2,11 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from core.audit import audit_registry
 
 User = get_user_model()
 
+@audit_registry.register
 class ApprovalRequest(models.Model):
     class Status(models.TextChoices):
         PENDING = 'PENDING', 'Pending'
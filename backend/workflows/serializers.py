@@ -9,3 +9,4 @@ class ApprovalRequestSerializer(serializers.ModelSerializer):
         model = ApprovalRequest
         fields = '__all__'
         read_only_fields = ('requester', 'status', 'created_at', 'updated_at')
+        select_related = ['requester', 'approver']
@@ -3,8 +3,9 @@ from rest_framework.response import Response
 from .models import ApprovalRequest
 from .serializers import ApprovalRequestSerializer
 from users.permissions import IsAdminOrHR, IsManager
+from core.prefetch import SerializerRelationsMixin
 
-class ApprovalRequestViewSet(viewsets.ModelViewSet):
+class ApprovalRequestViewSet(SerializerRelationsMixin, viewsets.ModelViewSet):
     serializer_class = ApprovalRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -1,16 +1,25 @@
-import React, { createContext, useContext, useState, useEffect } from 'react';
+import React, { createContext, useContext, useState, useEffect, useRef } from 'react';
 import axios from '../api/axios';
 import { useAuth } from '../auth/AuthContext';
 
 const NotificationContext = createContext();
 
+// ws://host:8000/ws/notifications/ next to the REST API (http://host:8000/api)
+const socketUrl = (token) => {
+    const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+    const base = import.meta.env.VITE_WS_URL || apiUrl.replace(/^http/, 'ws').replace(/\/api\/?$/, '');
+    return `${base}/ws/notifications/?token=${encodeURIComponent(token)}`;
+};
+
 export const useNotifications = () => useContext(NotificationContext);
 
 export const NotificationProvider = ({ children }) => {
     const { user } = useAuth();
     const [notifications, setNotifications] = useState([]);
     const [unreadCount, setUnreadCount] = useState(0);
+    const [unreadMessages, setUnreadMessages] = useState(0);
     const [loading, setLoading] = useState(false);
+    const socketRef = useRef(null);
 
     const fetchNotifications = async () => {
         if (!user) return;
@@ -54,22 +63,82 @@ export const NotificationProvider = ({ children }) => {
         }
     };
 
-    // Poll every 30 seconds
+    const applyUnread = (unread) => {
+        if (!unread) return;
+        setUnreadCount(unread.notifications);
+        setUnreadMessages(unread.messages);
+    };
+
+    const handleEvent = (event) => {
+        applyUnread(event.unread);
+        if (event.type === 'notification' && event.data) {
+            setNotifications(prev => [event.data, ...prev.filter(n => n.id !== event.data.id)].slice(0, 10));
+        } else if (event.type === 'message') {
+            window.dispatchEvent(new CustomEvent('cloudops:message', { detail: event.data }));
+        }
+    };
+
+    // Server pushes new notifications and unread counters; poll only while the socket is down
     useEffect(() => {
-        if (user) {
-            fetchNotifications();
-            const interval = setInterval(fetchNotifications, 30000);
-            return () => clearInterval(interval);
-        } else {
+        if (!user) {
             setNotifications([]);
             setUnreadCount(0);
+            setUnreadMessages(0);
+            return;
         }
+
+        let closed = false;
+        let retry = 0;
+        let pollTimer = null;
+        let reconnectTimer = null;
+
+        const startPolling = () => {
+            if (!pollTimer) pollTimer = setInterval(fetchNotifications, 30000);
+        };
+        const stopPolling = () => {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        };
+
+        const connect = () => {
+            const token = localStorage.getItem('access_token');
+            if (!token || typeof WebSocket === 'undefined') {
+                startPolling();
+                return;
+            }
+            const socket = new WebSocket(socketUrl(token));
+            socketRef.current = socket;
+            socket.onopen = () => {
+                retry = 0;
+                stopPolling();
+                fetchNotifications();
+            };
+            socket.onmessage = (message) => handleEvent(JSON.parse(message.data));
+            socket.onclose = () => {
+                if (closed) return;
+                startPolling();
+                // Back off up to a minute; the token may have been refreshed meanwhile
+                retry = Math.min(retry + 1, 6);
+                reconnectTimer = setTimeout(connect, 1000 * 2 ** (retry - 1));
+            };
+        };
+
+        fetchNotifications();
+        connect();
+
+        return () => {
+            closed = true;
+            stopPolling();
+            clearTimeout(reconnectTimer);
+            if (socketRef.current) socketRef.current.close();
+        };
     }, [user]);
 
     return (
         <NotificationContext.Provider value={{
             notifications,
             unreadCount,
+            unreadMessages,
             fetchNotifications,
             markAsRead,
             markAllAsRead
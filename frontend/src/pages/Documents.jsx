@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useContext } from 'react';
 import api from '../api/axios';
 import { AuthContext } from '../auth/AuthContext';
-import { FileText, Upload, Trash2, Download, Eye } from 'lucide-react';
+import { FileText, Upload, Trash2, Download, Eye, Search } from 'lucide-react';
 
 const Documents = () => {
     const { user } = useContext(AuthContext);
@@ -9,14 +9,17 @@ const Documents = () => {
     const [loading, setLoading] = useState(true);
     const [showModal, setShowModal] = useState(false);
     const [uploadData, setUploadData] = useState({ title: '', file: null, description: '' });
+    const [query, setQuery] = useState('');
 
     useEffect(() => {
-        fetchDocuments();
-    }, []);
+        // Searches file contents on the server; wait for typing to pause
+        const timer = setTimeout(fetchDocuments, query ? 300 : 0);
+        return () => clearTimeout(timer);
+    }, [query]);
 
     const fetchDocuments = async () => {
         try {
-            const response = await api.get('/documents/');
+            const response = await api.get('/documents/', { params: query.trim() ? { q: query.trim() } : {} });
             setDocuments(Array.isArray(response.data) ? response.data : response.data.results || []);
         } catch (error) {
             console.error("Failed to fetch documents", error);
@@ -85,6 +88,17 @@ const Documents = () => {
                 )}
             </div>
 
+            <div className="relative">
+                <Search size={18} className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400" />
+                <input
+                    type="search"
+                    value={query}
+                    onChange={(e) => setQuery(e.target.value)}
+                    placeholder="Search titles, descriptions and file contents..."
+                    className="w-full pl-10 pr-4 py-2 border border-gray-200 rounded-lg focus:outline-none focus:ring-2 focus:ring-indigo-500"
+                />
+            </div>
+
             <div className="bg-white rounded-xl shadow-sm border border-gray-100 overflow-hidden">
                 <table className="w-full text-left border-collapse">
                     <thead className="bg-gray-50 border-b border-gray-100">
@@ -117,7 +131,7 @@ const Documents = () => {
                                     <td className="p-4 text-sm text-gray-600">{doc.uploaded_by?.email}</td>
                                     <td className="p-4 text-sm text-gray-600">{new Date(doc.created_at).toLocaleDateString()}</td>
                                     <td className="p-4 flex gap-2">
-                                        <a href={doc.file} target="_blank" rel="noopener noreferrer" className="p-2 text-gray-400 hover:text-indigo-600 transition-colors" title="View">
+                                        <a href={doc.download_url || doc.file} target="_blank" rel="noopener noreferrer" className="p-2 text-gray-400 hover:text-indigo-600 transition-colors" title="View">
                                             <Eye size={18} />
                                         </a>
                                         {canDelete(doc) && (
@@ -1,7 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import api from '../api/axios';
-import { FileAudio, Upload, Play, CheckCircle, FileText, List, ArrowLeft, Loader2 } from 'lucide-react';
+import { Sha256 } from '../utils/sha256';
+import { FileAudio, Upload, Play, CheckCircle, FileText, List, ArrowLeft, Loader2, Clock } from 'lucide-react';
+
+const JOB_POLL_INTERVAL_MS = 2000;
+// Polling stops after this long; the job keeps running on the server and can be checked again
+const JOB_WAIT_TIMEOUT_MS = 10 * 60 * 1000;
 
 const MeetingDetails = () => {
     const { meetingId } = useParams();
@@ -12,6 +17,8 @@ const MeetingDetails = () => {
     const [loading, setLoading] = useState(true);
     const [uploading, setUploading] = useState(false);
     const [processing, setProcessing] = useState(false);
+    const [jobStatus, setJobStatus] = useState(null);
+    const [stillQueued, setStillQueued] = useState(false);
     const [taskCreating, setTaskCreating] = useState(null); // ID of action item being converted
 
     useEffect(() => {
@@ -35,19 +42,69 @@ const MeetingDetails = () => {
         }
     };
 
+    // Recordings are sent in chunks; after a network error the upload resumes from the last byte the server has.
+    // The file is hashed alongside, a chunk ahead of the upload, and the server checks the hash on completion.
+    const uploadInChunks = async (file) => {
+        const resumeKey = `recording-upload:${meetingId}:${file.name}:${file.size}:${file.lastModified}`;
+        let uploadId = localStorage.getItem(resumeKey);
+        let offset = 0;
+        let chunkSize = 8 * 1024 * 1024;
+
+        if (uploadId) {
+            try {
+                const { data } = await api.get(`/meetings/uploads/${uploadId}/`);
+                offset = data.offset;
+            } catch {
+                uploadId = null;
+            }
+        }
+        if (!uploadId) {
+            const { data } = await api.post(`/meetings/${meetingId}/uploads/`, { filename: file.name, size: file.size });
+            uploadId = data.id;
+            chunkSize = data.chunk_size;
+            localStorage.setItem(resumeKey, uploadId);
+        }
+
+        const hasher = new Sha256();
+        let hashed = 0;
+        const hashUpTo = async (end) => {
+            while (hashed < end) {
+                const next = Math.min(end, hashed + chunkSize);
+                hasher.update(await file.slice(hashed, next).arrayBuffer());
+                hashed = next;
+            }
+        };
+
+        let failures = 0;
+        while (offset < file.size) {
+            await hashUpTo(Math.min(offset + chunkSize, file.size));
+            try {
+                const { data } = await api.put(`/meetings/uploads/${uploadId}/`, file.slice(offset, offset + chunkSize), {
+                    headers: { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': String(offset) },
+                });
+                offset = data.offset;
+                failures = 0;
+            } catch (error) {
+                if (++failures > 5) throw error;
+                await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** failures));
+                const { data } = await api.get(`/meetings/uploads/${uploadId}/`);
+                offset = data.offset;
+            }
+        }
+
+        await hashUpTo(file.size);
+        const res = await api.post(`/meetings/uploads/${uploadId}/complete/`, { sha256: hasher.hexdigest() });
+        localStorage.removeItem(resumeKey);
+        return res.data;
+    };
+
     const handleFileUpload = async (event) => {
         const file = event.target.files[0];
         if (!file) return;
 
-        const formData = new FormData();
-        formData.append('file', file);
-
         setUploading(true);
         try {
-            const res = await api.post(`/meetings/${meetingId}/upload_recording/`, formData, {
-                headers: { 'Content-Type': 'multipart/form-data' },
-            });
-            setRecording(res.data);
+            setRecording(await uploadInChunks(file));
             alert("Recording uploaded successfully!");
         } catch (error) {
             console.error("Upload failed", error);
@@ -57,20 +114,48 @@ const MeetingDetails = () => {
         }
     };
 
+    // Processing runs in a background job; poll it until it finishes or the deadline passes.
+    // Returns false when the job is still queued or running at the deadline.
+    const waitForJob = async (jobId) => {
+        const deadline = Date.now() + JOB_WAIT_TIMEOUT_MS;
+        while (Date.now() < deadline) {
+            const { data } = await api.get(`/meetings/jobs/${jobId}/`);
+            setJobStatus(data.status);
+            setRecording(prev => prev ? { ...prev, processing_status: data.recording_status, processing_progress: data.progress } : prev);
+            if (data.status === 'SUCCEEDED') return true;
+            if (data.status === 'FAILED') throw new Error(data.error || 'Processing failed');
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+        return false;
+    };
+
     const processRecording = async () => {
         setProcessing(true);
+        setStillQueued(false);
         try {
+            // Requesting again while a job is queued or running returns that same job
             const res = await api.post(`/meetings/${meetingId}/process/`);
-            alert("Processing complete!");
-            fetchMeetingDetails(); // Refresh to get transcript/AI insights
+            if (await waitForJob(res.data.job_id)) {
+                alert("Processing complete!");
+                fetchMeetingDetails(); // Refresh to get transcript/AI insights
+            } else {
+                setStillQueued(true);
+            }
         } catch (error) {
             console.error("Processing failed", error);
             alert("Failed to process recording.");
         } finally {
             setProcessing(false);
+            setJobStatus(null);
         }
     };
 
+    const processingLabel = () => {
+        if (!processing) return stillQueued ? 'Check Again' : 'Generate Insights';
+        if (jobStatus === 'QUEUED') return 'Queued...';
+        return `Processing... ${recording.processing_progress || 0}%`;
+    };
+
     const convertToTask = async (actionItem) => {
         setTaskCreating(actionItem.id);
 
@@ -162,7 +247,7 @@ const MeetingDetails = () => {
                                         className="bg-green-600 text-white px-4 py-2 rounded-lg hover:bg-green-700 flex items-center gap-2"
                                     >
                                         {processing ? <Loader2 className="animate-spin" size={18} /> : <Play size={18} />}
-                                        {processing ? 'Processing...' : 'Generate Insights'}
+                                        {processingLabel()}
                                     </button>
                                 )}
                                 {recording.processed && (
@@ -173,6 +258,12 @@ const MeetingDetails = () => {
                                 )}
                             </div>
                         </div>
+                        {stillQueued && !processing && (
+                            <div className="flex items-center gap-2 p-3 bg-amber-50 border border-amber-200 rounded-lg text-sm text-amber-800">
+                                <Clock size={16} />
+                                Still {recording.processing_status === 'QUEUED' ? 'queued' : 'processing'}. The insights will appear here once the job finishes; check again later.
+                            </div>
+                        )}
                     </div>
                 )}
             </div>